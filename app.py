@@ -1,64 +1,375 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, url_for, Response, stream_with_context, g
 import os
-import tempfile
-from werkzeug.utils import secure_filename
+import json
+import time
+import cProfile
+import uuid
+import hashlib
+import threading
 
-# Importer nos modules de transcription et de synthèse
-from speech_to_text import transcribe_audio
-from text_summarizer import summarize_text
+# Les modules de transcription et de synthèse (speech_recognition, pydub, NumPy) sont
+# importés à la première utilisation : le serveur démarre sans les charger (voir warm_up)
+import metrics
+from jobs import JobQueueFull, DEFAULT_JOB_WORKERS, DEFAULT_JOB_EXECUTOR
 
 app = Flask(__name__)
 
 # Configuration
+# Les uploads sont décodés en mémoire : ce dossier ne sert qu'aux copies faites par
+# spool_upload (fichiers volumineux traités après la fin de la requête)
 UPLOAD_FOLDER = '/tmp/audio_uploads'
 ALLOWED_EXTENSIONS = {'mp3', 'wav', 'ogg', 'm4a', 'flac'}
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16 MB max
+# Taille maximale d'un upload (par défaut 2 Go, soit plusieurs heures d'audio)
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('STT_MAX_UPLOAD_MB', '2048')) * 1024 * 1024
+# Au-delà de ce seuil, l'upload est traité par fenêtres à mémoire constante
+app.config['LARGE_UPLOAD_THRESHOLD'] = int(os.environ.get('STT_LARGE_UPLOAD_MB', '16')) * 1024 * 1024
+app.config['STT_BACKEND'] = os.environ.get('STT_BACKEND', 'google')
+app.config['JOB_WORKERS'] = DEFAULT_JOB_WORKERS
+app.config['JOB_EXECUTOR'] = DEFAULT_JOB_EXECUTOR  # 'thread' ou 'process'
+app.config['MAX_BATCH_ITEMS'] = int(os.environ.get('SUMMARY_MAX_BATCH_ITEMS', '10000'))
+# Profilage cProfile à la demande (paramètre ?profile=1 ou en-tête X-Profile: 1)
+app.config['PROFILING_ENABLED'] = os.environ.get('STT_PROFILING', '0') == '1'
+app.config['PROFILE_DIR'] = os.environ.get('STT_PROFILE_DIR', '/tmp/stt_profiles')
+# Indexation des transcriptions réussies pour la recherche (/search, voir transcript_store.py)
+app.config['TRANSCRIPT_STORE_ENABLED'] = os.environ.get('STT_STORE', '1') == '1'
+app.config['MAX_SEARCH_RESULTS'] = 100
 
-# Créer le dossier d'upload s'il n'existe pas
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+# Routes dont la réponse porte l'en-tête Server-Timing
+SERVER_TIMING_ENDPOINTS = {'transcribe', 'summarize', 'process', 'search'}
 
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-@app.route('/')
-def index():
-    return render_template('index.html')
+def form_flag(name):
+    return request.form.get(name, '').lower() in ('1', 'true', 'on')
 
-@app.route('/transcribe', methods=['POST'])
-def transcribe():
+def get_upload():
+    """
+    Vérifie le fichier audio envoyé et le backend de reconnaissance demandé.
+    Retourne (fichier, backend, None), ou (None, None, réponse d'erreur).
+    """
     # Vérifier si un fichier a été envoyé
     if 'file' not in request.files:
-        return jsonify({'error': 'Aucun fichier trouvé'}), 400
+        return None, None, (jsonify({'error': 'Aucun fichier trouvé'}), 400)
     
     file = request.files['file']
     
     # Vérifier si un fichier a été sélectionné
     if file.filename == '':
-        return jsonify({'error': 'Aucun fichier sélectionné'}), 400
+        return None, None, (jsonify({'error': 'Aucun fichier sélectionné'}), 400)
     
     # Vérifier si le fichier est autorisé
     if not allowed_file(file.filename):
-        return jsonify({'error': 'Type de fichier non autorisé'}), 400
+        return None, None, (jsonify({'error': 'Type de fichier non autorisé'}), 400)
+    
+    # Backend de reconnaissance : paramètre de la requête ou configuration
+    from recognizer_backends import BACKENDS
+    backend = (request.form.get('backend') or app.config['STT_BACKEND']).lower()
+    if backend not in BACKENDS:
+        return None, None, (jsonify({'error': f'Backend de reconnaissance inconnu: {backend}'}), 400)
+    
+    return file, backend, None
+
+def is_large_upload():
+    """
+    Indique si l'upload doit être traité par fenêtres : taille au-delà du seuil
+    configuré, ou mode demandé explicitement par le client (champ `large`).
+    """
+    return form_flag('large') or (request.content_length or 0) > app.config['LARGE_UPLOAD_THRESHOLD']
+
+def spool_upload(file):
+    """
+    Copie l'upload par blocs dans le dossier d'upload (pour un traitement après la fin
+    de la requête) et retourne le chemin du fichier.
+    """
+    extension = file.filename.rsplit('.', 1)[1].lower()
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    path = os.path.join(app.config['UPLOAD_FOLDER'], f"{uuid.uuid4().hex}.{extension}")
+    file.save(path)
+    return path
+
+def upload_key(file):
+    """
+    Empreinte SHA-256 du contenu de l'upload, qui identifie la transcription dans l'index
+    de recherche (deux fichiers de même nom ne se confondent pas). Le flux est relu
+    par blocs puis rembobiné.
+    """
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.stream.read(1024 * 1024), b''):
+        digest.update(chunk)
+    file.stream.seek(0)
+    return digest.hexdigest()
+
+def store_transcript(key, filename, segments, backend):
+    """
+    Confie une transcription réussie à l'indexation en arrière-plan, si elle est activée :
+    la requête n'attend ni l'écriture du journal ni la fusion de l'index.
+    """
+    if not app.config['TRANSCRIPT_STORE_ENABLED']:
+        return
+    from transcript_store import get_store
+    try:
+        if not get_store().add_async(key, segments, {'filename': filename, 'backend': backend,
+                                                     'created_at': round(time.time(), 3)}):
+            app.logger.warning("Indexation de %s abandonnée : file d'attente pleine", filename)
+    except Exception as e:
+        app.logger.warning("Indexation de %s impossible: %s", filename, e)
+
+# Pool de transcription asynchrone, créé à la première utilisation
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+def get_job_manager():
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            from jobs import TranscriptionJobManager
+            _job_manager = TranscriptionJobManager(workers=app.config['JOB_WORKERS'],
+                                                   executor=app.config['JOB_EXECUTOR'])
+        return _job_manager
+
+def warm_up():
+    """
+    Charge les modules de traitement, le backend configuré (modèle Vosk...) et localise
+    ffmpeg une fois pour toutes. À appeler dans le processus maître avant de créer les
+    workers (voir wsgi.py) : ceux-ci héritent de tout ce qui a été chargé.
+    Retourne la durée de chaque étape, en secondes.
+    """
+    timings = {}
+    
+    start = time.perf_counter()
+    import speech_to_text, text_summarizer, pipeline, jobs
+    timings['imports'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    from recognizer_backends import get_backend
+    get_backend(app.config['STT_BACKEND'])
+    timings['backend'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    from pydub.utils import which, get_prober_name
+    from pydub import AudioSegment
+    AudioSegment.converter = which(AudioSegment.converter) or AudioSegment.converter
+    get_prober_name()
+    timings['ffmpeg'] = time.perf_counter() - start
+    
+    # Premiers appels NumPy et regex compilées, hors du chemin des requêtes
+    start = time.perf_counter()
+    from audio_preprocessing import preprocess_audio
+    preprocess_audio(AudioSegment.silent(duration=100, frame_rate=44100))
+    text_summarizer.summarize_text("Phrase de préchauffage du résumeur de texte. " * 5, num_sentences=1)
+    timings['kernels'] = time.perf_counter() - start
+    return timings
+
+@app.route('/health', methods=['GET'])
+def health():
+    # Sonde de disponibilité : ne charge aucun module de traitement
+    return jsonify({'status': 'ok'})
+
+@app.before_request
+def start_request_metrics():
+    metrics.start_request()
+    
+    # Profilage de la requête si activé dans la configuration et demandé par le client
+    if app.config['PROFILING_ENABLED'] and (request.args.get('profile') == '1'
+                                            or request.headers.get('X-Profile') == '1'):
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+@app.after_request
+def add_request_metrics(response):
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        os.makedirs(app.config['PROFILE_DIR'], exist_ok=True)
+        profile_path = os.path.join(app.config['PROFILE_DIR'],
+                                    f"{request.endpoint}-{time.strftime('%Y%m%d-%H%M%S')}-{id(profiler):x}.prof")
+        profiler.dump_stats(profile_path)
+        response.headers['X-Profile-File'] = profile_path
+    
+    timings = metrics.current_request()
+    if timings is not None and request.endpoint in SERVER_TIMING_ENDPOINTS:
+        response.headers['Server-Timing'] = timings.server_timing()
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics_route():
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/')
+def index():
+    return render_template('index.html')
+
+@app.route('/transcribe', methods=['POST'])
+def transcribe():
+    file, backend, error = get_upload()
+    if error:
+        return error
+    
+    from speech_to_text import transcribe_audio, transcribe_audio_segments, join_segments
     
     try:
-        # Sauvegarder le fichier temporairement
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        # Le fichier est décodé en mémoire, sans passer par le disque
+        audio_format = file.filename.rsplit('.', 1)[1].lower()
         
-        # Transcrire l'audio
-        transcription = transcribe_audio(filepath)
+        # Fichier volumineux : l'upload, déjà mis en attente sur disque par Werkzeug,
+        # est décodé et transcrit par fenêtres sans être chargé en entier
+        windowed = is_large_upload()
+        
+        # Mode asynchrone : le job est mis en file et son identifiant retourné immédiatement
+        if form_flag('async'):
+            # La transcription est indexée sous l'identifiant du job, connu du client
+            filename = file.filename
+            on_done = lambda job_id, segments: store_transcript(job_id, filename, segments, backend)
+            if windowed:
+                job_id = get_job_manager().submit(spool_upload(file), delete_source=True, on_done=on_done,
+                                                  windowed=True, backend=backend, format=audio_format)
+            else:
+                job_id = get_job_manager().submit(file.read(), on_done=on_done, backend=backend,
+                                                  format=audio_format)
+            return jsonify({
+                'job_id': job_id,
+                'status': 'queued',
+                'status_url': url_for('job_status', job_id=job_id),
+            }), 202
         
-        # Supprimer le fichier après traitement
-        os.remove(filepath)
+        # Mode segmenté : découpage et reconnaissance parallèle des segments
+        key = upload_key(file)
+        if form_flag('segmented') or windowed:
+            segments = transcribe_audio_segments(file.stream, backend=backend, format=audio_format,
+                                                 windowed=windowed)
+            store_transcript(key, file.filename, segments, backend)
+            return jsonify({'transcription': join_segments(segments), 'segments': segments})
+        
+        # Transcrire l'audio
+        transcription = transcribe_audio(file.stream, backend=backend, format=audio_format)
+        if not transcription.startswith('Erreur'):
+            # Sans segmentation, la transcription est indexée comme un seul passage sans horodatage de fin
+            store_transcript(key, file.filename, [{'start': 0.0, 'end': None, 'text': transcription}], backend)
         
         return jsonify({'transcription': transcription})
     
+    except JobQueueFull as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': f'Erreur lors de la transcription: {str(e)}'}), 500
 
+@app.route('/process', methods=['POST'])
+def process():
+    file, backend, error = get_upload()
+    if error:
+        return error
+    
+    try:
+        num_sentences = int(request.form.get('num_sentences', 3))
+    except ValueError:
+        return jsonify({'error': 'Nombre de phrases invalide'}), 400
+    
+    from pipeline import process_audio
+    
+    try:
+        # Transcription et synthèse en une seule requête : le texte n'est ni renvoyé
+        # au client ni retokenisé entre les deux étapes
+        audio_format = file.filename.rsplit('.', 1)[1].lower()
+        key = upload_key(file)
+        result = process_audio(file.stream, num_sentences=num_sentences, backend=backend,
+                               format=audio_format, windowed=is_large_upload(),
+                               timings=metrics.current_request())
+        if 'error' in result:
+            return jsonify(result), 422
+        store_transcript(key, file.filename, result['segments'], backend)
+        return jsonify(result)
+    
+    except Exception as e:
+        return jsonify({'error': f'Erreur lors du traitement: {str(e)}'}), 500
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.route('/transcribe/stream', methods=['POST'])
+def transcribe_stream():
+    file, backend, error = get_upload()
+    if error:
+        return error
+    
+    from speech_to_text import iter_transcribed_segments, join_segments
+    from text_summarizer import IncrementalSummarizer
+    from pipeline import iter_processed_segments, finish_summary
+    
+    # Avec `num_sentences`, les segments sont tokenisés au fil de l'eau et
+    # l'événement `done` contient aussi la synthèse
+    try:
+        num_sentences = int(request.form['num_sentences']) if request.form.get('num_sentences') else None
+    except ValueError:
+        return jsonify({'error': 'Nombre de phrases invalide'}), 400
+    summarizer = IncrementalSummarizer(num_sentences) if num_sentences else None
+    
+    # Un upload volumineux est copié sur disque puis lu par fenêtres pendant le flux
+    # (le fichier temporaire de la requête est fermé avant la fin de la réponse)
+    windowed = is_large_upload()
+    key = upload_key(file)
+    data = spool_upload(file) if windowed else file.read()
+    audio_format = file.filename.rsplit('.', 1)[1].lower()
+    filename = file.filename
+    
+    # Chaque segment est envoyé comme événement SSE dès qu'il est reconnu
+    def generate():
+        segments = []
+        try:
+            options = {'backend': backend, 'format': audio_format, 'windowed': windowed}
+            if summarizer is not None:
+                iterator = iter_processed_segments(data, summarizer, **options)
+            else:
+                iterator = iter_transcribed_segments(data, **options)
+            for index, segment in enumerate(iterator):
+                segments.append(segment)
+                yield sse_event('segment', dict(segment, index=index))
+            done = {'transcription': join_segments(segments)}
+            if summarizer is not None and done['transcription']:
+                done['summary'] = finish_summary(summarizer)
+            if done['transcription']:
+                store_transcript(key, filename, segments, backend)
+            yield sse_event('done', done)
+        except Exception as e:
+            yield sse_event('error', {'error': f'Erreur lors de la transcription: {str(e)}'})
+        finally:
+            if windowed:
+                os.remove(data)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job introuvable'}), 404
+    return jsonify(job)
+
+@app.route('/search', methods=['GET'])
+def search():
+    # Mots recherchés dans les transcriptions indexées (paramètre `q`)
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Aucune recherche trouvée'}), 400
+    
+    try:
+        limit = int(request.args.get('limit', 10))
+    except ValueError:
+        return jsonify({'error': 'Nombre de résultats invalide'}), 400
+    limit = max(1, min(limit, app.config['MAX_SEARCH_RESULTS']))
+    
+    try:
+        # Transcriptions classées par pertinence (BM25), avec les passages horodatés qui correspondent
+        from transcript_store import get_store
+        results = get_store().search(query, limit=limit)
+        return jsonify({'query': query, 'results': results})
+    
+    except Exception as e:
+        return jsonify({'error': f'Erreur lors de la recherche: {str(e)}'}), 500
+
 @app.route('/summarize', methods=['POST'])
 def summarize():
     # Vérifier si le texte a été envoyé
@@ -76,6 +387,7 @@ def summarize():
         num_sentences = request.json.get('num_sentences', 3)
         
         # Synthétiser le texte
+        from text_summarizer import summarize_text
         summary = summarize_text(text, num_sentences=num_sentences)
         
         return jsonify({'summary': summary})
@@ -83,5 +395,29 @@ def summarize():
     except Exception as e:
         return jsonify({'error': f'Erreur lors de la synthèse: {str(e)}'}), 500
 
+@app.route('/summarize/batch', methods=['POST'])
+def summarize_batch_route():
+    # Liste de textes, ou d'objets {'text', 'num_sentences'}
+    if not request.json or not isinstance(request.json.get('items'), list):
+        return jsonify({'error': 'Aucune liste de textes trouvée'}), 400
+    
+    items = request.json['items']
+    if len(items) > app.config['MAX_BATCH_ITEMS']:
+        return jsonify({'error': f"Le lot dépasse {app.config['MAX_BATCH_ITEMS']} textes"}), 400
+    
+    try:
+        # Nombre de phrases par défaut pour les éléments qui ne le précisent pas
+        num_sentences = request.json.get('num_sentences', 3)
+        
+        # Les erreurs sont signalées élément par élément, sans faire échouer tout le lot
+        from text_summarizer import summarize_batch
+        results = summarize_batch(items, num_sentences=num_sentences)
+        
+        return jsonify({'results': results})
+    
+    except Exception as e:
+        return jsonify({'error': f'Erreur lors de la synthèse: {str(e)}'}), 500
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # Serveur de développement ; en production, utiliser wsgi.py (voir README)
+    app.run(host='0.0.0.0', port=5000, debug=os.environ.get('FLASK_DEBUG', '1') == '1')
@@ -0,0 +1,236 @@
+import io
+import os
+import shutil
+import threading
+import subprocess
+import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pydub import AudioSegment
+import metrics
+from audio_preprocessing import TARGET_SAMPLE_RATE, TARGET_SAMPLE_WIDTH, audio_to_samples, resample, samples_to_audio
+from audio_windows import read_wav_layout
+
+# Nombre de processus décodeurs permanents (0 : décodage dans le processus appelant)
+DEFAULT_DECODER_WORKERS = int(os.environ.get('STT_DECODER_WORKERS', '2'))
+
+# Signatures des formats, pour les sources sans nom de fichier
+_MAGIC_NUMBERS = (
+    (b'RIFF', 'wav'),
+    (b'fLaC', 'flac'),
+    (b'OggS', 'ogg'),
+    (b'ID3', 'mp3'),
+    (b'\xff\xfb', 'mp3'),
+    (b'\xff\xf3', 'mp3'),
+    (b'\xff\xf2', 'mp3'),
+)
+
+def sniff_format(data):
+    """
+    Devine le format d'un fichier audio à partir de ses premiers octets (None si inconnu).
+    """
+    for magic, format in _MAGIC_NUMBERS:
+        if data.startswith(magic):
+            return format
+    if data[4:8] == b'ftyp':
+        return 'm4a'
+    return None
+
+def _to_target_pcm(samples, sample_rate):
+    """
+    Convertit un signal float mono en PCM 16 bits à 16 kHz.
+    """
+    return samples_to_audio(resample(samples, sample_rate), TARGET_SAMPLE_RATE).raw_data
+
+def _decode_wav(data, format):
+    """
+    Décodeur natif du WAV PCM : lecture directe des échantillons, sans processus externe.
+    """
+    layout = read_wav_layout(data)
+    if layout is None:
+        raise ValueError("WAV non PCM")
+    frame_size = layout.channels * layout.sample_width
+    end = layout.data_offset + layout.data_size - layout.data_size % frame_size
+    audio = AudioSegment(data[layout.data_offset:end], frame_rate=layout.sample_rate,
+                         sample_width=layout.sample_width, channels=layout.channels)
+    return _to_target_pcm(audio_to_samples(audio), layout.sample_rate)
+
+def _decode_soundfile(data, format):
+    """
+    Décodeur libsndfile (paquet soundfile, optionnel) : FLAC, OGG Vorbis, et MP3 selon la version.
+    """
+    import soundfile
+    samples, sample_rate = soundfile.read(io.BytesIO(data), dtype='float32', always_2d=True)
+    return _to_target_pcm(samples.mean(axis=1), sample_rate)
+
+def _decode_av(data, format):
+    """
+    Décodeur libav dans le processus (paquet av, optionnel) : tous les formats gérés par ffmpeg,
+    rééchantillonnés directement en mono 16 kHz.
+    """
+    import av
+    chunks = []
+    with av.open(io.BytesIO(data), format=None if format == 'm4a' else format) as container:
+        resampler = av.AudioResampler(format='s16', layout='mono', rate=TARGET_SAMPLE_RATE)
+        for frame in container.decode(audio=0):
+            chunks.extend(out.to_ndarray().tobytes() for out in resampler.resample(frame))
+        chunks.extend(out.to_ndarray().tobytes() for out in resampler.resample(None))
+    return b''.join(chunks)
+
+def _decode_ffmpeg(data, format):
+    """
+    Décodage par ffmpeg à travers des pipes (aucun fichier temporaire), directement en mono 16 kHz.
+    """
+    converter = shutil.which(AudioSegment.converter) or AudioSegment.converter
+    command = [converter, '-nostdin', '-loglevel', 'error']
+    if format:
+        command += ['-f', 'mp4' if format == 'm4a' else format]
+    command += ['-i', 'pipe:0', '-f', 's16le', '-ac', '1', '-ar', str(TARGET_SAMPLE_RATE), 'pipe:1']
+    process = subprocess.run(command, input=data, capture_output=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"Échec du décodage ffmpeg: {process.stderr.decode(errors='replace').strip()}")
+    return process.stdout
+
+def _module_available(name):
+    # Vérifie la présence du paquet sans l'importer (démarrage rapide, voir app.warm_up)
+    return importlib.util.find_spec(name) is not None
+
+# Décodeurs par ordre de préférence : (nom, formats gérés ou None pour tous, fonction, disponible)
+DECODERS = (
+    ('wav', {'wav'}, _decode_wav, True),
+    ('soundfile', {'wav', 'flac', 'ogg', 'mp3'}, _decode_soundfile, _module_available('soundfile')),
+    ('av', None, _decode_av, _module_available('av')),
+    ('ffmpeg', None, _decode_ffmpeg, True),
+)
+
+# Formats décodés dans le processus appelant : un décodeur natif rapide existe,
+# l'aller-retour vers un processus décodeur coûterait plus que le décodage lui-même
+NATIVE_FORMATS = {'wav'} | ({'flac'} if _module_available('soundfile') else set())
+
+# Décodeurs qui travaillent dans le processus décodeur lui-même ; ffmpeg lance de toute façon
+# un processus par fichier, il est donc toujours lancé depuis le processus appelant
+# (voir DecoderPool.decode_pcm), le passer par le pool n'ajouterait que l'aller-retour des données
+IN_PROCESS_DECODERS = {'wav', 'soundfile', 'av'}
+
+def select_decoder(format):
+    """
+    Retourne le nom du premier décodeur disponible pour un format (voir DECODERS).
+    """
+    for name, formats, _, available in DECODERS:
+        if available and (formats is None or format in formats):
+            return name
+
+def decode_to_pcm(data, format=None, allow_ffmpeg=True):
+    """
+    Décode un fichier audio (octets) en PCM 16 bits mono 16 kHz avec le premier décodeur
+    disponible pour son format (voir DECODERS).
+
+    Args:
+        data (bytes): Contenu du fichier
+        format (str): Format du fichier (deviné à partir des octets si absent)
+        allow_ffmpeg (bool): False pour n'essayer que les décodeurs dans le processus
+            (IN_PROCESS_DECODERS) : utilisé dans les processus décodeurs, qui ne lancent pas ffmpeg
+
+    Returns:
+        tuple: (PCM, nom du décodeur utilisé)
+    """
+    format = format or sniff_format(data)
+    errors = []
+    for name, formats, decoder, available in DECODERS:
+        if not available or (formats is not None and format not in formats):
+            continue
+        if not allow_ffmpeg and name not in IN_PROCESS_DECODERS:
+            continue
+        try:
+            return decoder(data, format), name
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+    raise RuntimeError(f"Aucun décodeur n'a pu lire le fichier ({format}): {'; '.join(errors)}")
+
+def _init_worker():
+    # Les bibliothèques de décodage sont chargées une fois par processus décodeur
+    for name, _, _, available in DECODERS:
+        if available and name in ('soundfile', 'av'):
+            try:
+                __import__(name)
+            except (ImportError, OSError):
+                pass
+
+class DecoderPool:
+    def __init__(self, workers=DEFAULT_DECODER_WORKERS):
+        """
+        Pool de processus décodeurs permanents : les fichiers leur sont transmis par pipe
+        et le PCM (mono 16 kHz) revient par le même chemin. Les décodeurs natifs
+        (NATIVE_FORMATS) restent dans le processus appelant, de même que ffmpeg : il est
+        utilisé lorsqu'aucun décodeur dans le processus (soundfile, av) ne gère le format,
+        ou en repli lorsque ceux-ci échouent dans le processus décodeur. Les processus
+        décodeurs ne lancent jamais ffmpeg.
+
+        Args:
+            workers (int): Nombre de processus décodeurs (0 pour tout décoder dans le processus appelant)
+        """
+        self.workers = workers
+        self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) if workers else None
+
+    def decode_pcm(self, data, format=None):
+        """
+        Décode un fichier audio (octets) en PCM 16 bits mono 16 kHz.
+
+        Returns:
+            tuple: (PCM, nom du décodeur utilisé)
+        """
+        format = format or sniff_format(data)
+        if (self._executor is None or format in NATIVE_FORMATS
+                or select_decoder(format) not in IN_PROCESS_DECODERS):
+            pcm, decoder = decode_to_pcm(data, format)
+        else:
+            try:
+                pcm, decoder = self._executor.submit(decode_to_pcm, data, format, False).result()
+            except Exception as e:
+                # Repli sur ffmpeg dans le processus appelant
+                try:
+                    pcm, decoder = _decode_ffmpeg(data, format), 'ffmpeg'
+                except Exception as ffmpeg_error:
+                    raise RuntimeError(f"{e}; ffmpeg: {ffmpeg_error}") from ffmpeg_error
+        metrics.increment('stt_decoder_calls_total', decoder=decoder)
+        return pcm, decoder
+
+    def decode(self, data, format=None):
+        """
+        Décode un fichier audio (octets) et retourne un AudioSegment mono 16 kHz 16 bits.
+        """
+        pcm, _ = self.decode_pcm(data, format)
+        return AudioSegment(pcm, frame_rate=TARGET_SAMPLE_RATE, sample_width=TARGET_SAMPLE_WIDTH, channels=1)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+def get_decoder_pool():
+    """
+    Retourne le pool de décodeurs partagé par le processus (créé à la première utilisation).
+    Un processus déjà lancé par un pool (transcription par lots, jobs en mode 'process')
+    décode lui-même, sans créer de processus décodeurs supplémentaires.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            in_pool = multiprocessing.parent_process() is not None
+            _default_pool = DecoderPool(0 if in_pool else DEFAULT_DECODER_WORKERS)
+        return _default_pool
+
+def decode_audio(audio_source, format=None):
+    """
+    Décode un chemin, des octets ou un objet fichier en AudioSegment mono 16 kHz 16 bits.
+    """
+    if isinstance(audio_source, str):
+        with open(audio_source, 'rb') as f:
+            data = f.read()
+    elif isinstance(audio_source, (bytes, bytearray)):
+        data = bytes(audio_source)
+    else:
+        data = audio_source.read()
+    return get_decoder_pool().decode(data, format)
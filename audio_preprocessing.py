@@ -0,0 +1,326 @@
+import os
+from math import gcd
+import numpy as np
+from pydub import AudioSegment
+
+# Format transmis au recognizer : mono, 16 kHz, 16 bits
+TARGET_SAMPLE_RATE = 16000
+TARGET_SAMPLE_WIDTH = 2
+
+# Paramètres de l'analyse d'énergie
+FRAME_MS = 30                    # Durée d'une trame d'analyse
+NOISE_PERCENTILE = 10            # Percentile des énergies pris comme niveau de bruit de fond
+THRESHOLD_FACTOR = 3.0           # Seuil = bruit de fond x facteur (environ +10 dB)
+MIN_ENERGY_THRESHOLD = 10 ** (-50 / 20)  # Seuil minimal (-50 dBFS)
+
+# Paramètres de compression des silences
+MAX_SILENCE_MS = 300             # Durée maximale conservée d'un silence interne
+EDGE_SILENCE_MS = 100            # Silence conservé avant la première et après la dernière parole
+
+# Détection d'activité vocale (modifiable via la variable d'environnement STT_VAD)
+DEFAULT_VAD = os.environ.get('STT_VAD', '1') == '1'
+VAD_FFT_SIZE = 512               # Taille minimale de la FFT de chaque trame
+VAD_BAND_HZ = (80, 4000)         # Bande de fréquences de la voix analysée
+TONAL_PEAK_RATIO = 0.9           # Part de l'énergie autour du pic du spectre au-delà de laquelle la trame est un son pur
+FLATNESS_THRESHOLD = 0.3         # Platitude spectrale maximale d'une trame voisée (bruit blanc : environ 0,56)
+ZCR_THRESHOLD = 0.25             # Taux de passages par zéro des consonnes sourdes (s, f, ch)
+STATIONARITY_LAG_MS = 90         # Écart entre les deux trames dont les spectres sont comparés
+STATIONARITY_WINDOW_MS = 210     # Fenêtre sur laquelle la similarité médiane est calculée
+STATIONARY_SIMILARITY = 0.97     # Similarité médiane au-delà de laquelle le son est stationnaire (tonalités, musique)
+UNVOICED_ENERGY_FACTOR = 0.5     # Énergie minimale d'une consonne sourde, relative au seuil de parole
+VAD_HANGOVER_MS = 150            # Pauses plus courtes rattachées à la parole qui les entoure
+MIN_SPEECH_MS = 120              # Durée minimale d'une zone de parole
+VAD_BLOCK_FRAMES = 4096          # Trames analysées ensemble (mémoire bornée sur les longs fichiers)
+
+def audio_to_samples(audio):
+    """
+    Convertit un AudioSegment en tableau NumPy float32 mono, normalisé entre -1 et 1.
+    """
+    if audio.sample_width not in (1, 2, 4):
+        audio = audio.set_sample_width(2)
+
+    if audio.sample_width == 1:
+        samples = (np.frombuffer(audio.raw_data, dtype=np.uint8).astype(np.float32) - 128) / 128
+    else:
+        dtype = np.int16 if audio.sample_width == 2 else np.int32
+        samples = np.frombuffer(audio.raw_data, dtype=dtype).astype(np.float32)
+        samples /= float(1 << (8 * audio.sample_width - 1))
+
+    # Mixage en mono : moyenne des canaux
+    if audio.channels > 1:
+        samples = samples.reshape(-1, audio.channels).mean(axis=1)
+    return samples
+
+def samples_to_audio(samples, sample_rate):
+    """
+    Convertit un tableau NumPy float mono en AudioSegment PCM 16 bits.
+    """
+    pcm = np.clip(np.round(samples * 32768), -32768, 32767).astype('<i2')
+    return AudioSegment(pcm.tobytes(), frame_rate=sample_rate, sample_width=TARGET_SAMPLE_WIDTH, channels=1)
+
+def resample(samples, orig_rate, target_rate=TARGET_SAMPLE_RATE):
+    """
+    Rééchantillonne un signal mono. Utilise scipy (filtre polyphase) s'il est installé,
+    sinon un filtre moyenneur anti-repliement suivi d'une interpolation linéaire.
+    """
+    if orig_rate == target_rate or len(samples) == 0:
+        return samples
+
+    try:
+        from scipy.signal import resample_poly
+        divisor = gcd(orig_rate, target_rate)
+        return resample_poly(samples, target_rate // divisor, orig_rate // divisor).astype(np.float32)
+    except ImportError:
+        pass
+
+    # Interpolation linéaire sur une grille régulière : indices calculés directement
+    # (np.interp ferait une recherche dichotomique par échantillon)
+    n_out = int(round(len(samples) * target_rate / orig_rate))
+    positions = np.arange(n_out) * (orig_rate / target_rate)
+    index = np.minimum(positions.astype(np.intp), len(samples) - 1)
+    next_index = np.minimum(index + 1, len(samples) - 1)
+    fraction = positions - index
+
+    width = int(round(orig_rate / target_rate))
+    if target_rate < orig_rate and width > 1 and len(samples) >= width:
+        # Moyenne glissante centrée (anti-repliement), évaluée uniquement aux positions
+        # utilisées, à partir de la somme cumulée (O(n))
+        cumsum = np.empty(len(samples) + 1)
+        cumsum[0] = 0.0
+        np.cumsum(samples, out=cumsum[1:])
+
+        def smoothed(positions):
+            start = np.clip(positions - width // 2, 0, len(samples) - width)
+            return (cumsum[start + width] - cumsum[start]) / width
+
+        values, next_values = smoothed(index), smoothed(next_index)
+    else:
+        values, next_values = samples[index], samples[next_index]
+    return (values * (1 - fraction) + next_values * fraction).astype(np.float32)
+
+def frame_energies(samples, sample_rate, frame_ms=FRAME_MS):
+    """
+    Calcule l'énergie RMS de chaque trame (la dernière trame est complétée par des zéros).
+    Retourne un tuple (énergies, nombre d'échantillons par trame).
+    """
+    frame_length = max(1, int(sample_rate * frame_ms / 1000))
+    frames = _frames(samples, frame_length)
+    return np.sqrt(np.mean(np.square(frames), axis=1)), frame_length
+
+def _frames(samples, frame_length):
+    # Trames consécutives sans recouvrement, la dernière complétée par des zéros
+    n_frames = -(-len(samples) // frame_length)
+    return np.pad(samples, (0, n_frames * frame_length - len(samples))).reshape(n_frames, frame_length)
+
+def estimate_energy_threshold(energies):
+    """
+    Estime le seuil d'énergie séparant la parole du bruit de fond, à partir du
+    niveau de bruit (percentile bas des énergies des trames).
+    """
+    if len(energies) == 0:
+        return MIN_ENERGY_THRESHOLD
+    noise_floor = np.percentile(energies, NOISE_PERCENTILE)
+    # Sur un enregistrement sans pause, ne pas classer la parole faible comme silence
+    threshold = min(noise_floor * THRESHOLD_FACTOR, 0.5 * np.median(energies))
+    return max(float(threshold), MIN_ENERGY_THRESHOLD)
+
+def find_runs(mask):
+    """
+    Retourne les bornes (début, fin exclue) des suites de valeurs vraies d'un tableau booléen.
+    """
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+def frame_features(samples, sample_rate, frame_length):
+    """
+    Calcule les caractéristiques spectrales de chaque trame (mêmes trames que frame_energies) :
+    - taux de passages par zéro ;
+    - tonalité : part de l'énergie de la bande vocale concentrée autour du pic du spectre
+      (proche de 1 pour un son pur, plus faible pour la voix dont l'énergie se répartit
+      sur les harmoniques et les formants) ;
+    - platitude spectrale : moyenne géométrique sur moyenne arithmétique du spectre
+      (proche de 0 pour un son harmonique, élevée pour un bruit) ;
+    - similarité : cosinus entre le spectre de la trame et celui des trames situées
+      STATIONARITY_LAG_MS plus tôt et plus tard, le plus élevé des deux (proche de 1 pour
+      un son stable : tonalités DTMF, signal carré, notes tenues, y compris à leur début
+      et à leur fin ; plus faible pour la voix, dont la hauteur et les formants changent sans cesse).
+    Retourne un tuple (passages par zéro, tonalité, platitude, similarité).
+    """
+    frames = _frames(samples, frame_length)
+    zero_crossings = np.count_nonzero(np.diff(np.signbit(frames), axis=1), axis=1) / frame_length
+
+    n_fft = max(VAD_FFT_SIZE, 1 << (frame_length - 1).bit_length())
+    frequencies = np.fft.rfftfreq(n_fft, 1 / sample_rate)
+    band = (frequencies >= VAD_BAND_HZ[0]) & (frequencies <= VAD_BAND_HZ[1])
+    window = np.hanning(frame_length).astype(np.float32)
+    tonality = np.zeros(len(frames))
+    flatness = np.ones(len(frames))
+    similarity = np.full(len(frames), np.nan)
+    lag = max(1, int(round(STATIONARITY_LAG_MS * sample_rate / 1000 / frame_length)))
+    # Spectres normalisés des dernières trames du bloc précédent
+    previous = np.zeros((0, np.count_nonzero(band)))
+    for first in range(0, len(frames), VAD_BLOCK_FRAMES):
+        power = np.square(np.abs(np.fft.rfft(frames[first:first + VAD_BLOCK_FRAMES] * window, n_fft, axis=1)))
+        power = power[:, band]
+        # Énergie du lobe principal de la fenêtre (pic +/- 2 raies), par sommes cumulées
+        cumulative = np.zeros((len(power), power.shape[1] + 1))
+        np.cumsum(power, axis=1, out=cumulative[:, 1:])
+        peak = power.argmax(axis=1)
+        rows = np.arange(len(power))
+        peak_energy = cumulative[rows, np.minimum(peak + 3, power.shape[1])] - cumulative[rows, np.maximum(peak - 2, 0)]
+        total = cumulative[:, -1]
+        np.divide(peak_energy, total, out=tonality[first:first + len(power)], where=total > 0)
+        geometric_mean = np.exp(np.mean(np.log(power + 1e-12), axis=1))
+        np.divide(geometric_mean, total / power.shape[1], out=flatness[first:first + len(power)], where=total > 0)
+
+        magnitude = np.sqrt(power)
+        magnitude /= np.maximum(np.linalg.norm(magnitude, axis=1, keepdims=True), 1e-12)
+        extended = np.concatenate((previous, magnitude))
+        if len(extended) > lag:
+            # La ligne i de `extended` est la trame first - len(previous) + i
+            similarity[first - len(previous) + lag:first + len(power)] = np.einsum(
+                'ij,ij->i', extended[lag:], extended[:-lag])
+        previous = extended[-lag:]
+    # Similarité avec la trame précédente ou la suivante, la plus élevée des deux
+    following = np.full(len(frames), np.nan)
+    following[:-lag] = similarity[lag:]
+    similarity = np.nan_to_num(np.fmax(similarity, following))
+    return zero_crossings, tonality, flatness, similarity
+
+def detect_speech_frames(samples, sample_rate, energies, frame_length, threshold):
+    """
+    Détection d'activité vocale vectorisée : une trame est voisée si elle est plus énergique
+    que le bruit de fond et que son spectre est harmonique sans être celui d'un son pur
+    (bips) ni rester stable sur environ 200 ms (tonalités à plusieurs fréquences comme le DTMF,
+    signaux carrés, musique d'attente) ; les trames un peu moins énergiques avec de nombreux
+    passages par zéro (consonnes sourdes) comptent aussi comme parole à proximité d'une trame voisée.
+    Les pauses courtes sont rattachées à la parole ; les zones trop courtes sont écartées.
+    Retourne un tableau booléen, une valeur par trame.
+    """
+    zero_crossings, tonality, flatness, similarity = frame_features(samples, sample_rate, frame_length)
+    frame_ms = frame_length * 1000 / sample_rate
+
+    # Similarité médiane sur la fenêtre centrée sur chaque trame : un changement de note
+    # isolé ne suffit pas à faire passer une musique pour de la parole
+    half = max(1, int(STATIONARITY_WINDOW_MS / frame_ms) // 2)
+    padded = np.pad(similarity, half, mode='edge')
+    stationary = np.median(np.lib.stride_tricks.sliding_window_view(padded, 2 * half + 1), axis=1) > STATIONARY_SIMILARITY
+
+    not_tonal = (tonality < TONAL_PEAK_RATIO) & ~stationary
+    voiced = (energies > threshold) & not_tonal & (flatness < FLATNESS_THRESHOLD)
+    if not voiced.any():
+        return voiced
+
+    # Consonnes sourdes : seulement au voisinage d'une trame voisée (un bruit de fond
+    # a lui aussi beaucoup de passages par zéro)
+    reach = int(VAD_HANGOVER_MS / frame_ms)
+    near_voiced = np.convolve(voiced, np.ones(2 * reach + 1), mode='same') > 0
+    unvoiced = (energies > threshold * UNVOICED_ENERGY_FACTOR) & (zero_crossings > ZCR_THRESHOLD) & not_tonal
+    speech = voiced | (unvoiced & near_voiced)
+
+    starts, ends = find_runs(~speech)
+    inner = (starts > 0) & (ends < len(speech)) & ((ends - starts) * frame_ms < VAD_HANGOVER_MS)
+    for start, end in zip(starts[inner], ends[inner]):
+        speech[start:end] = True
+
+    starts, ends = find_runs(speech)
+    rejected = (ends - starts) * frame_ms < MIN_SPEECH_MS
+    for start, end in zip(starts[rejected], ends[rejected]):
+        speech[start:end] = False
+    return speech
+
+def detect_speech(audio):
+    """
+    Repère les zones de parole d'un AudioSegment (voir detect_speech_frames).
+    Retourne une liste de couples [début_ms, fin_ms], vide si l'audio ne contient pas de parole.
+    """
+    samples = resample(audio_to_samples(audio), audio.frame_rate)
+    energies, frame_length = frame_energies(samples, TARGET_SAMPLE_RATE)
+    speech = detect_speech_frames(samples, TARGET_SAMPLE_RATE, energies, frame_length,
+                                  estimate_energy_threshold(energies))
+    starts, ends = find_runs(speech)
+    return [[int(start) * FRAME_MS, min(int(end) * FRAME_MS, len(audio))] for start, end in zip(starts, ends)]
+
+def detect_silences(audio, min_silence_ms, frame_ms=10):
+    """
+    Détecte les silences d'un AudioSegment d'au moins `min_silence_ms`.
+    Équivalent vectorisé de pydub.silence.detect_silence, avec un seuil estimé sur le bruit de fond.
+    Retourne une liste de couples [début_ms, fin_ms].
+    """
+    samples = audio_to_samples(audio)
+    energies, _ = frame_energies(samples, audio.frame_rate, frame_ms)
+    silent = energies <= estimate_energy_threshold(energies)
+    starts, ends = find_runs(silent)
+    long_enough = (ends - starts) * frame_ms >= min_silence_ms
+    return [[int(start) * frame_ms, min(int(end) * frame_ms, len(audio))]
+            for start, end in zip(starts[long_enough], ends[long_enough])]
+
+def compress_silences(samples, sample_rate, energies, frame_length, threshold,
+                      max_silence_ms=MAX_SILENCE_MS, edge_silence_ms=EDGE_SILENCE_MS, speech=None):
+    """
+    Supprime les silences de début et de fin et raccourcit les silences internes.
+    `speech` (une valeur par trame, voir detect_speech_frames) remplace le seuil d'énergie
+    pour décider des trames de parole : les zones sans parole sont alors traitées comme des silences.
+    Retourne un tuple (échantillons conservés, portions conservées), les portions étant
+    des couples (début_ms, fin_ms) dans le signal d'origine. Sans parole, la liste est vide.
+    """
+    if speech is None:
+        speech = energies > threshold
+    if not speech.any():
+        return samples[:0], []
+
+    frame_ms = frame_length * 1000 / sample_rate
+    max_frames = max(1, int(max_silence_ms / frame_ms))
+    edge_frames = int(edge_silence_ms / frame_ms)
+    n_frames = len(energies)
+
+    keep = speech.copy()
+    starts, ends = find_runs(~speech)
+    for start, end in zip(starts, ends):
+        if start == 0:
+            keep[max(start, end - edge_frames):end] = True
+        elif end == n_frames:
+            keep[start:min(end, start + edge_frames)] = True
+        elif end - start <= max_frames:
+            keep[start:end] = True
+        else:
+            # Garder le début et la fin du silence pour ne pas coller les mots
+            half = max_frames // 2
+            keep[start:start + half] = True
+            keep[end - (max_frames - half):end] = True
+
+    keep_starts, keep_ends = find_runs(keep)
+    pieces = [samples[start * frame_length:end * frame_length] for start, end in zip(keep_starts, keep_ends)]
+    spans = [(int(round(start * frame_ms)), int(round(end * frame_ms))) for start, end in zip(keep_starts, keep_ends)]
+    return np.concatenate(pieces), spans
+
+def preprocess_audio(audio, target_rate=TARGET_SAMPLE_RATE, compress=True, vad=DEFAULT_VAD):
+    """
+    Prépare un AudioSegment pour la reconnaissance : mixage mono, rééchantillonnage
+    à 16 kHz 16 bits, calibration du seuil de bruit et compression des silences.
+    Avec `vad`, seules les zones de parole sont conservées (détection d'activité vocale,
+    voir detect_speech_frames) : musique d'attente et bips sont retirés comme les silences.
+
+    Retourne un tuple (AudioSegment préparé, portions conservées en ms dans l'audio d'origine).
+    L'AudioSegment est vide si aucune parole n'a été détectée : il n'y a rien à envoyer au recognizer.
+    """
+    samples = resample(audio_to_samples(audio), audio.frame_rate, target_rate)
+    if not compress:
+        return samples_to_audio(samples, target_rate), [(0, len(audio))]
+
+    energies, frame_length = frame_energies(samples, target_rate)
+    threshold = estimate_energy_threshold(energies)
+    speech = detect_speech_frames(samples, target_rate, energies, frame_length, threshold) if vad else None
+    samples, spans = compress_silences(samples, target_rate, energies, frame_length, threshold, speech=speech)
+    return samples_to_audio(samples, target_rate), spans
+
+def to_original_time(position_ms, spans):
+    """
+    Convertit une position (ms) dans l'audio préparé en position dans l'audio d'origine.
+    """
+    offset = 0
+    for start, end in spans:
+        if position_ms <= offset + (end - start):
+            return start + (position_ms - offset)
+        offset += end - start
+    return spans[-1][1] if spans else position_ms
@@ -0,0 +1,225 @@
+import io
+import mmap
+import wave
+import struct
+import shutil
+import threading
+import subprocess
+import importlib.util
+from pydub import AudioSegment
+
+# Taille des blocs lus à chaque itération (la mémoire utilisée ne dépend que de cette taille)
+DEFAULT_BLOCK_MS = 10000
+# Format de sortie de ffmpeg pour le décodage en flux : mono 16 kHz 16 bits
+STREAM_SAMPLE_RATE = 16000
+STREAM_SAMPLE_WIDTH = 2
+
+# Formats WAV lisibles directement : PCM entier et WAVE_FORMAT_EXTENSIBLE
+_WAVE_FORMAT_PCM = 1
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+class WavLayout:
+    def __init__(self, channels, sample_rate, sample_width, data_offset, data_size):
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.data_offset = data_offset
+        self.data_size = data_size
+
+def read_wav_layout(buffer):
+    """
+    Lit les chunks RIFF d'un fichier WAV (mmap ou octets) et retourne le format et la position
+    des données PCM, ou None si le fichier n'est pas un WAV PCM lisible directement.
+    """
+    if len(buffer) < 12 or buffer[0:4] != b'RIFF' or buffer[8:12] != b'WAVE':
+        return None
+
+    fmt = None
+    position = 12
+    while position + 8 <= len(buffer):
+        chunk_id = buffer[position:position + 4]
+        chunk_size = struct.unpack('<I', buffer[position + 4:position + 8])[0]
+        body = position + 8
+        if chunk_id == b'fmt ':
+            format_tag, channels, sample_rate = struct.unpack('<HHI', buffer[body:body + 8])
+            bits = struct.unpack('<H', buffer[body + 14:body + 16])[0]
+            if format_tag not in (_WAVE_FORMAT_PCM, _WAVE_FORMAT_EXTENSIBLE) or bits % 8:
+                return None
+            fmt = (channels, sample_rate, bits // 8)
+        elif chunk_id == b'data' and fmt is not None:
+            # Taille 0 ou erronée (enregistrement en flux) : les données vont jusqu'à la fin du fichier
+            data_size = chunk_size if 0 < chunk_size <= len(buffer) - body else len(buffer) - body
+            return WavLayout(*fmt, data_offset=body, data_size=data_size)
+        position = body + chunk_size + (chunk_size & 1)
+    return None
+
+def _fileno(fileobj):
+    try:
+        return fileobj.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+def _iter_wav_mmap(fileobj, block_ms):
+    """
+    Lit un WAV par blocs à travers un mmap du fichier : seul le bloc courant est copié en mémoire.
+    Retourne None si le fichier ne peut pas être lu ainsi.
+    """
+    fileno = _fileno(fileobj)
+    if fileno is None:
+        return None
+    try:
+        mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        return None
+
+    layout = read_wav_layout(mapped)
+    if layout is None:
+        mapped.close()
+        return None
+
+    def blocks():
+        try:
+            frame_size = layout.channels * layout.sample_width
+            block_size = max(1, int(layout.sample_rate * block_ms / 1000)) * frame_size
+            end = layout.data_offset + layout.data_size - layout.data_size % frame_size
+            for offset in range(layout.data_offset, end, block_size):
+                yield AudioSegment(mapped[offset:min(offset + block_size, end)],
+                                   frame_rate=layout.sample_rate, sample_width=layout.sample_width,
+                                   channels=layout.channels)
+        finally:
+            mapped.close()
+
+    return blocks()
+
+def _iter_wav_frames(fileobj, block_ms):
+    """
+    Lit un WAV par blocs avec le module wave (sources sans descripteur de fichier).
+    """
+    with wave.open(fileobj, 'rb') as wav:
+        frames_per_block = max(1, int(wav.getframerate() * block_ms / 1000))
+        while True:
+            data = wav.readframes(frames_per_block)
+            if not data:
+                break
+            yield AudioSegment(data, frame_rate=wav.getframerate(), sample_width=wav.getsampwidth(),
+                               channels=wav.getnchannels())
+
+def _iter_soundfile(source, block_ms):
+    """
+    Lit un FLAC par blocs avec libsndfile (paquet soundfile, optionnel), dans le processus.
+    """
+    import soundfile
+    from audio_preprocessing import samples_to_audio
+    with soundfile.SoundFile(source) as f:
+        frames_per_block = max(1, int(f.samplerate * block_ms / 1000))
+        for block in f.blocks(blocksize=frames_per_block, dtype='float32', always_2d=True):
+            yield samples_to_audio(block.mean(axis=1), f.samplerate)
+
+def _iter_ffmpeg(source, format, block_ms):
+    """
+    Décode n'importe quel format avec un processus ffmpeg dont la sortie PCM
+    (mono 16 kHz) est lue par blocs au fil du décodage.
+    """
+    converter = shutil.which(AudioSegment.converter) or AudioSegment.converter
+    command = [converter, '-nostdin', '-loglevel', 'error']
+    if format:
+        command += ['-f', format]
+
+    feeder = None
+    if isinstance(source, str):
+        command += ['-i', source]
+        stdin = subprocess.DEVNULL
+    elif _fileno(source) is not None:
+        # Le processus lit directement le fichier (par exemple l'upload mis en attente sur disque)
+        command = [arg for arg in command if arg != '-nostdin'] + ['-i', 'pipe:0']
+        stdin = source
+    elif hasattr(source, 'read'):
+        command = [arg for arg in command if arg != '-nostdin'] + ['-i', 'pipe:0']
+        stdin = subprocess.PIPE
+    else:
+        raise TypeError(f"Source audio non lisible: {type(source).__name__}")
+    command += ['-f', 's16le', '-ac', '1', '-ar', str(STREAM_SAMPLE_RATE), 'pipe:1']
+
+    process = subprocess.Popen(command, stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    # Erreur de lecture de la source dans le thread d'alimentation, relancée côté consommateur
+    feed_errors = []
+    if stdin is subprocess.PIPE:
+        def feed():
+            try:
+                for chunk in iter(lambda: source.read(64 * 1024), b''):
+                    process.stdin.write(chunk)
+            except BrokenPipeError:
+                # ffmpeg s'est arrêté avant la fin de l'entrée : son code de retour fait foi
+                pass
+            except Exception as e:
+                feed_errors.append(e)
+            finally:
+                try:
+                    process.stdin.close()
+                except OSError:
+                    pass
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+
+    block_size = int(STREAM_SAMPLE_RATE * block_ms / 1000) * STREAM_SAMPLE_WIDTH
+    try:
+        while True:
+            data = process.stdout.read(block_size)
+            if not data:
+                break
+            data = data[:len(data) - len(data) % STREAM_SAMPLE_WIDTH]
+            yield AudioSegment(data, frame_rate=STREAM_SAMPLE_RATE, sample_width=STREAM_SAMPLE_WIDTH, channels=1)
+        if feeder is not None:
+            feeder.join()
+        if feed_errors:
+            raise feed_errors[0]
+        if process.wait() != 0:
+            raise RuntimeError(f"Échec du décodage ffmpeg: {process.stderr.read().decode(errors='replace').strip()}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+        if feeder is not None:
+            feeder.join(timeout=1)
+
+def iter_audio_blocks(audio_source, format=None, block_ms=DEFAULT_BLOCK_MS):
+    """
+    Décode un fichier audio par blocs de `block_ms` sans jamais le charger en entier.
+    `audio_source` est un chemin ou un objet fichier (par exemple un upload mis en attente sur disque).
+    Les WAV PCM sont lus par mmap, les FLAC par libsndfile si le paquet soundfile est installé ;
+    les autres formats passent par un processus ffmpeg en flux.
+    """
+    if format is None:
+        name = audio_source if isinstance(audio_source, str) else getattr(audio_source, 'name', None)
+        if isinstance(name, str) and '.' in name:
+            format = name.rsplit('.', 1)[1].lower()
+
+    if format == 'wav':
+        fileobj = open(audio_source, 'rb') if isinstance(audio_source, str) else audio_source
+        try:
+            blocks = _iter_wav_mmap(fileobj, block_ms)
+            if blocks is None:
+                start = fileobj.tell()
+                try:
+                    with wave.open(fileobj, 'rb'):
+                        pass
+                    readable = True
+                except (wave.Error, EOFError):
+                    readable = False
+                fileobj.seek(start)
+                if readable:
+                    blocks = _iter_wav_frames(fileobj, block_ms)
+            if blocks is not None:
+                yield from blocks
+                return
+        finally:
+            if isinstance(audio_source, str):
+                fileobj.close()
+
+    if format == 'flac' and importlib.util.find_spec('soundfile') is not None:
+        yield from _iter_soundfile(audio_source, block_ms)
+        return
+
+    yield from _iter_ffmpeg(audio_source, format, block_ms)
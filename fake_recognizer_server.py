@@ -0,0 +1,107 @@
+import io
+import json
+import time
+import wave
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+class FakeRecognizerServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.05, jitter=0.0, slow_rate=0.0, slow_latency=2.0,
+                 error_rate=0.0, error_status=503, seed=None):
+        """
+        Service de reconnaissance factice pour tester le client (recognizer_client) :
+        répond à POST /recognize (WAV) par {"text": ...} en injectant des délais et des erreurs.
+
+        Args:
+            address (tuple): Adresse d'écoute (hôte, port ; port 0 pour un port libre)
+            latency (float): Latence de base de chaque réponse, en secondes
+            jitter (float): Variation aléatoire ajoutée à la latence, en secondes
+            slow_rate (float): Proportion des réponses très lentes (traînardes)
+            slow_latency (float): Latence des réponses lentes, en secondes
+            error_rate (float): Proportion des requêtes en erreur
+            error_status (int): Code HTTP des erreurs (503, 429...)
+            seed (int): Graine du générateur aléatoire (résultats reproductibles)
+        """
+        super().__init__(address, _RecognizeHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/recognize"
+
+    def draw(self):
+        """
+        Tire le comportement d'une requête : (latence, erreur ou non).
+        """
+        with self._lock:
+            self.requests += 1
+            delay = self.slow_latency if self.random.random() < self.slow_rate else self.latency
+            delay += self.random.uniform(0, self.jitter)
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+            return delay, failed
+
+class _RecognizeHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        delay, failed = self.server.draw()
+        time.sleep(delay)
+
+        if failed:
+            self.send_response(self.server.error_status)
+            self.end_headers()
+            return
+
+        with wave.open(io.BytesIO(body), 'rb') as wav:
+            duration = wav.getnframes() / wav.getframerate()
+        payload = json.dumps({'text': f"segment de {duration:.2f} secondes"}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_fake_server(host='127.0.0.1', port=0, **options):
+    """
+    Démarre le service factice dans un thread et retourne le serveur (server.url, server.shutdown()).
+    """
+    server = FakeRecognizerServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Service de reconnaissance factice (délais et erreurs injectés)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--slow-rate', type=float, default=0.0)
+    parser.add_argument('--slow-latency', type=float, default=2.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    server = FakeRecognizerServer((args.host, args.port), latency=args.latency, jitter=args.jitter,
+                                  slow_rate=args.slow_rate, slow_latency=args.slow_latency,
+                                  error_rate=args.error_rate, error_status=args.error_status, seed=args.seed)
+    print(f"Service de reconnaissance factice sur {server.url}")
+    server.serve_forever()
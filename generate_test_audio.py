@@ -1,8 +1,27 @@
 import os
-import wave
+import io
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import resource
+import subprocess
+import tracemalloc
 import numpy as np
 from pydub import AudioSegment
 from pydub.generators import Sine
+from audio_preprocessing import samples_to_audio
+
+# Vocabulaire des textes synthétiques pour les benchmarks de synthèse
+BENCHMARK_WORDS = [
+    'transition', 'énergie', 'solaire', 'réseau', 'électrique', 'stockage', 'batterie',
+    'hydrogène', 'éolienne', 'climat', 'émissions', 'gouvernement', 'coût', 'production',
+    'mobilité', 'véhicule', 'infrastructure', 'population', 'défi', 'croissance',
+    'le', 'la', 'les', 'des', 'et', 'de', 'pour', 'dans', 'avec', 'sur',
+]
+BENCHMARK_SUBJECTS = ['Les experts', 'Le rapport', 'La ministre', 'Les entreprises', 'Le client', 'Notre équipe']
 
 def generate_test_audio(output_path, text="Ceci est un message test pour vérifier la transcription vocale", duration_ms=3000, sample_rate=44100):
     """
@@ -31,7 +50,412 @@ def generate_test_audio(output_path, text="Ceci est un message test pour vérifi
     
     return output_path
 
+def _voiced_burst(duration_ms, f0, sample_rate, volume, rng):
+    """
+    Salve voisée synthétique : harmoniques d'une fondamentale qui varie lentement, modulées
+    au rythme des syllabes. Contrairement à un son pur, elle est reconnue comme de la parole
+    par la détection d'activité vocale (voir audio_preprocessing.detect_speech_frames).
+    """
+    t = np.arange(int(sample_rate * duration_ms / 1000)) / sample_rate
+    pitch = f0 * (1 + 0.1 * np.sin(2 * np.pi * rng.uniform(0.5, 2) * t))
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    harmonics = np.arange(1, int(4000 / f0) + 1)
+    signal = (np.sin(np.outer(phase, harmonics)) / np.sqrt(harmonics)).sum(axis=1)
+    signal *= 0.55 - 0.45 * np.cos(2 * np.pi * 4 * t)
+    signal *= 10 ** (volume / 20) / max(np.abs(signal).max(), 1e-9)
+    return samples_to_audio(signal, sample_rate)
+
+def generate_benchmark_audio(duration_ms=60000, sample_rate=44100, silence_ratio=0.3, channels=1, seed=0):
+    """
+    Génère un enregistrement synthétique pour les benchmarks : des salves voisées
+    (fondamentales et durées variables) séparées par des silences.
+    `silence_ratio` est la part approximative de silence dans l'enregistrement.
+    """
+    rng = random.Random(seed)
+    audio = AudioSegment.silent(duration=0, frame_rate=sample_rate)
+    while len(audio) < duration_ms:
+        burst_ms = rng.randint(800, 4000)
+        audio += _voiced_burst(burst_ms, rng.choice([110, 150, 180, 220, 260]), sample_rate,
+                               -rng.uniform(6, 18), rng)
+        if silence_ratio > 0:
+            pause_ms = int(burst_ms * silence_ratio / (1 - silence_ratio))
+            audio += AudioSegment.silent(duration=pause_ms, frame_rate=sample_rate)
+    return audio[:duration_ms].set_channels(channels)
+
+def generate_benchmark_corpus(output_dir, count=5, duration_ms=60000, sample_rate=44100,
+                              format="wav", silence_ratio=0.3):
+    """
+    Génère un corpus de fichiers audio synthétiques dans `output_dir` et retourne leurs chemins.
+    Les formats autres que WAV (mp3, ogg, flac) nécessitent ffmpeg.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for index in range(count):
+        audio = generate_benchmark_audio(duration_ms, sample_rate, silence_ratio, seed=index)
+        path = os.path.join(output_dir, f"bench_{index:03d}_{duration_ms // 1000}s_{sample_rate}.{format}")
+        audio.export(path, format=format)
+        paths.append(path)
+    return paths
+
+def generate_long_text(num_sentences=1000, seed=0):
+    """
+    Génère un texte synthétique en français de `num_sentences` phrases pour le benchmark de synthèse.
+    """
+    rng = random.Random(seed)
+    sentences = []
+    for _ in range(num_sentences):
+        words = [rng.choice(BENCHMARK_WORDS) for _ in range(rng.randint(6, 20))]
+        sentences.append(f"{rng.choice(BENCHMARK_SUBJECTS)} {' '.join(words)}.")
+    return ' '.join(sentences)
+
+def _peak_allocated_mb(func, item):
+    """
+    Pic des allocations faites par un appel (mesuré avec tracemalloc, qui suit aussi les tableaux
+    NumPy), en Mo au-delà de la mémoire déjà allouée avant l'appel. Contrairement à ru_maxrss,
+    qui ne fait que croître pour tout le processus, la mesure est propre à l'étape.
+    """
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        func(item)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return (peak - baseline) / (1024 * 1024)
+
+def _max_rss_mb(who=resource.RUSAGE_SELF):
+    """
+    Pic de mémoire résidente (ru_maxrss) du processus, ou de ses processus enfants terminés
+    (ffmpeg...) avec RUSAGE_CHILDREN, en Mo.
+    """
+    # ru_maxrss est en Ko sous Linux et en octets sous macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(who).ru_maxrss / scale
+
+def time_stage(name, func, inputs, repeat=1, units=None):
+    """
+    Mesure une étape isolée du pipeline sur chaque entrée.
+
+    Args:
+        name (str): Nom de l'étape
+        func (callable): Fonction appelée avec chaque entrée
+        inputs (list): Entrées de l'étape
+        repeat (int): Nombre de passages sur les entrées
+        units (callable): Quantité traitée par entrée (par exemple la durée audio en secondes),
+            utilisée pour le débit ; par défaut une unité par entrée
+
+    Returns:
+        dict: Latences p50/p95 (ms), débit, pic des allocations de l'étape (tracemalloc) et pic de
+            mémoire résidente (ru_maxrss) du processus et de ses enfants à la fin de l'étape (Mo)
+    """
+    latencies = []
+    processed = 0.0
+    for _ in range(repeat):
+        for item in inputs:
+            start = time.perf_counter()
+            func(item)
+            latencies.append(time.perf_counter() - start)
+            processed += units(item) if units else 1
+    total = sum(latencies)
+    # ru_maxrss ne fait que croître : c'est le pic du processus jusqu'à cette étape incluse,
+    # qui compte aussi la mémoire allouée hors de Python (bibliothèques C, processus enfants)
+    peak_rss = _max_rss_mb()
+    children_peak_rss = _max_rss_mb(resource.RUSAGE_CHILDREN)
+    # Allocations propres à l'étape, mesurées dans un passage séparé : tracemalloc ralentit les allocations
+    peak_alloc = max((_peak_allocated_mb(func, item) for item in inputs), default=0.0)
+    return {
+        'stage': name,
+        'runs': len(latencies),
+        'p50_ms': float(np.percentile(latencies, 50)) * 1000,
+        'p95_ms': float(np.percentile(latencies, 95)) * 1000,
+        'throughput': processed / total if total else 0.0,
+        'peak_alloc_mb': peak_alloc,
+        'peak_rss_mb': peak_rss,
+        'children_peak_rss_mb': children_peak_rss,
+    }
+
+def run_benchmark(corpus_dir="/tmp/stt_benchmark", count=5, duration_ms=60000, sample_rate=44100,
+                  format="wav", silence_ratio=0.3, text_sentences=5000, repeat=3, fake_latency=0.05):
+    """
+    Génère un corpus synthétique puis mesure chaque étape du pipeline isolément :
+    décodage, conversion en PCM pour le recognizer, calibration (prétraitement NumPy),
+    reconnaissance avec le backend factice, et synthèse.
+    La conversion mesure la préparation du PCM au format attendu par le recognizer (WAV 16 kHz 16 bits).
+    Le débit des étapes audio est exprimé en secondes d'audio traitées par seconde.
+    """
+    from speech_to_text import load_audio, audio_to_audio_data, transcribe_audio_segments
+    from audio_preprocessing import preprocess_audio
+    from recognizer_backends import FakeBackend
+    from text_summarizer import summarize_text
+
+    paths = generate_benchmark_corpus(corpus_dir, count, duration_ms, sample_rate, format, silence_ratio)
+    encoded = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            encoded.append(f.read())
+    decoded = [load_audio(data, format) for data in encoded]
+    preprocessed = [preprocess_audio(audio)[0] for audio in decoded]
+    audio_seconds = duration_ms / 1000
+    backend = FakeBackend(latency=fake_latency)
+    text = generate_long_text(text_sentences)
+
+    stages = [
+        time_stage('decode', lambda data: load_audio(data, format), encoded, repeat,
+                   units=lambda _: audio_seconds),
+        time_stage('convert', lambda audio: audio_to_audio_data(audio).get_wav_data(
+            convert_rate=16000, convert_width=2), decoded, repeat, units=lambda _: audio_seconds),
+        time_stage('calibrate', preprocess_audio, decoded, repeat, units=lambda _: audio_seconds),
+        time_stage('recognize', lambda audio: transcribe_audio_segments(
+            audio, backend=backend, use_cache=False, preprocess=False), preprocessed, repeat,
+            units=lambda _: audio_seconds),
+        time_stage('summarize', lambda text: summarize_text(text, num_sentences=5), [text], repeat,
+                   units=lambda text: len(text) / 1024),
+    ]
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'config': {
+            'count': count, 'duration_ms': duration_ms, 'sample_rate': sample_rate, 'format': format,
+            'silence_ratio': silence_ratio, 'text_sentences': text_sentences, 'repeat': repeat,
+            'fake_latency': fake_latency,
+        },
+        'stages': stages,
+    }
+
+def compare_benchmarks(current, baseline, tolerance=0.10, min_delta_ms=1.0):
+    """
+    Compare deux résultats de benchmark (p95 par étape) et retourne les régressions
+    dépassant la tolérance relative. Les écarts inférieurs à `min_delta_ms` sont
+    considérés comme du bruit de mesure.
+    """
+    previous = {stage['stage']: stage for stage in baseline['stages']}
+    regressions = []
+    for stage in current['stages']:
+        reference = previous.get(stage['stage'])
+        if not reference or not reference['p95_ms']:
+            continue
+        if stage['p95_ms'] - reference['p95_ms'] < min_delta_ms:
+            continue
+        if stage['p95_ms'] > reference['p95_ms'] * (1 + tolerance):
+            regressions.append({
+                'stage': stage['stage'],
+                'baseline_p95_ms': reference['p95_ms'],
+                'p95_ms': stage['p95_ms'],
+                'ratio': stage['p95_ms'] / reference['p95_ms'],
+            })
+    return regressions
+
+def benchmark_main(argv):
+    parser = argparse.ArgumentParser(description="Benchmark du pipeline de transcription et de synthèse")
+    parser.add_argument('--corpus-dir', default='/tmp/stt_benchmark')
+    parser.add_argument('--count', type=int, default=5, help="Nombre de fichiers audio générés")
+    parser.add_argument('--duration', type=float, default=60, help="Durée de chaque fichier (secondes)")
+    parser.add_argument('--sample-rate', type=int, default=44100)
+    parser.add_argument('--format', default='wav', choices=['wav', 'mp3', 'ogg', 'flac'])
+    parser.add_argument('--silence-ratio', type=float, default=0.3)
+    parser.add_argument('--text-sentences', type=int, default=5000, help="Taille du texte à résumer")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--fake-latency', type=float, default=0.05, help="Latence du backend factice (s)")
+    parser.add_argument('--output', help="Fichier JSON où écrire les résultats")
+    parser.add_argument('--compare', help="Résultats JSON de référence pour détecter les régressions")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.corpus_dir, args.count, int(args.duration * 1000), args.sample_rate,
+                            args.format, args.silence_ratio, args.text_sentences, args.repeat,
+                            args.fake_latency)
+
+    print(f"{'étape':<10} {'p50 (ms)':>10} {'p95 (ms)':>10} {'débit':>10} {'alloc. (Mo)':>12} "
+          f"{'RSS (Mo)':>10} {'RSS enfants (Mo)':>17}")
+    for stage in results['stages']:
+        print(f"{stage['stage']:<10} {stage['p50_ms']:>10.2f} {stage['p95_ms']:>10.2f} "
+              f"{stage['throughput']:>10.2f} {stage['peak_alloc_mb']:>12.1f} "
+              f"{stage['peak_rss_mb']:>10.1f} {stage['children_peak_rss_mb']:>17.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare_benchmarks(results, json.load(f))
+        for regression in regressions:
+            print(f"Régression sur {regression['stage']}: p95 {regression['baseline_p95_ms']:.2f} ms "
+                  f"-> {regression['p95_ms']:.2f} ms (x{regression['ratio']:.2f})")
+        return 1 if regressions else 0
+    return 0
+
+def _encode_benchmark_audio(audio, format):
+    """
+    Encode un enregistrement de benchmark dans le format demandé (None si aucun encodeur n'est disponible).
+    """
+    buffer = io.BytesIO()
+    try:
+        audio.export(buffer, format='ipod' if format == 'm4a' else format)
+        return buffer.getvalue()
+    except Exception:
+        pass
+    try:
+        import soundfile
+        from audio_preprocessing import audio_to_samples
+        soundfile.write(buffer, audio_to_samples(audio), audio.frame_rate, format=format.upper())
+        return buffer.getvalue()
+    except Exception:
+        return None
+
+def benchmark_decoders(formats=('wav', 'flac', 'ogg', 'mp3', 'm4a'), count=5, duration_ms=30000,
+                       sample_rate=44100, repeat=3, workers=2):
+    """
+    Compare le débit de décodage par format : pydub (un processus ffmpeg et un WAV
+    intermédiaire par fichier pour les formats compressés, puis conversion en mono 16 kHz)
+    contre le sous-système de décodage (décodeurs natifs ou pool de processus décodeurs permanents).
+
+    Returns:
+        list: Par format et par méthode, décodeur utilisé, latences p50/p95 (ms)
+            et débit (secondes d'audio par seconde)
+    """
+    from audio_decoding import DecoderPool
+    from audio_preprocessing import TARGET_SAMPLE_RATE
+
+    def decode_pydub(item):
+        data, format = item
+        AudioSegment.from_file(io.BytesIO(data), format=format).set_channels(1).set_frame_rate(TARGET_SAMPLE_RATE)
+
+    pool = DecoderPool(workers)
+    results = []
+    try:
+        for format in formats:
+            inputs = []
+            for index in range(count):
+                data = _encode_benchmark_audio(generate_benchmark_audio(duration_ms, sample_rate, seed=index), format)
+                if data is None:
+                    break
+                inputs.append((data, format))
+            if not inputs:
+                results.append({'format': format, 'method': None, 'error': "aucun encodeur disponible"})
+                continue
+
+            # Décodeurs réellement utilisés par le sous-système (wav, soundfile, av ou ffmpeg)
+            used = set()
+
+            def decode_pool(item):
+                used.add(pool.decode_pcm(*item)[1])
+
+            # pydub lit le WAV lui-même et passe par un processus ffmpeg pour les autres formats
+            pydub_decoder = 'pydub' if format == 'wav' else 'ffmpeg'
+            for method, func in (('pydub', decode_pydub), ('decoder', decode_pool)):
+                try:
+                    func(inputs[0])  # Préchauffage (processus décodeurs, imports)
+                    stage = time_stage(method, func, inputs, repeat, units=lambda item: duration_ms / 1000)
+                except Exception as e:
+                    results.append({'format': format, 'method': method, 'error': str(e)})
+                    continue
+                results.append({'format': format, 'method': method,
+                                'decoder': pydub_decoder if method == 'pydub' else '+'.join(sorted(used)),
+                                'p50_ms': stage['p50_ms'], 'p95_ms': stage['p95_ms'],
+                                'throughput': stage['throughput']})
+    finally:
+        pool.shutdown()
+    return results
+
+def decoders_main(argv):
+    parser = argparse.ArgumentParser(description="Comparaison du débit de décodage par format")
+    parser.add_argument('--formats', default='wav,flac,ogg,mp3,m4a')
+    parser.add_argument('--count', type=int, default=5)
+    parser.add_argument('--duration', type=float, default=30, help="Durée de chaque fichier (secondes)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=2, help="Nombre de processus décodeurs")
+    parser.add_argument('--output', help="Fichier JSON où écrire les résultats")
+    args = parser.parse_args(argv)
+
+    results = benchmark_decoders(args.formats.split(','), args.count, int(args.duration * 1000),
+                                 repeat=args.repeat, workers=args.workers)
+    print(f"{'format':<8} {'méthode':<10} {'décodeur':<10} {'p50 (ms)':>10} {'p95 (ms)':>10} {'audio s/s':>10}")
+    for result in results:
+        if 'error' in result:
+            print(f"{result['format']:<8} {result['method'] or '-':<10} indisponible ({result['error'][:60]})")
+            continue
+        print(f"{result['format']:<8} {result['method']:<10} {result['decoder']:<10} {result['p50_ms']:>10.2f} "
+              f"{result['p95_ms']:>10.2f} {result['throughput']:>10.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+# Scripts exécutés dans un nouvel interpréteur pour chaque mesure de démarrage.
+# Chacun affiche en JSON les durées mesurées (secondes) et la mémoire résidente (Mo).
+_STARTUP_SCRIPT = """
+import io, json, os, resource, sys, time
+start = time.perf_counter()
+mode = sys.argv[1]
+if mode == 'preload':
+    import wsgi
+    app = wsgi.app
+else:
+    from app import app
+ready = time.perf_counter() - start
+client = app.test_client()
+client.get('/health')
+health = time.perf_counter() - start
+with open(sys.argv[2], 'rb') as f:
+    response = client.post('/transcribe', data={'file': (f, 'bench.wav'), 'backend': 'fake'})
+assert response.status_code == 200, response.data
+first = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({'ready': ready, 'health': health, 'first_request': first, 'rss_mb': rss}))
+"""
+
+def benchmark_startup(runs=5, audio_path="/tmp/stt_startup.wav"):
+    """
+    Mesure le démarrage du serveur dans des processus neufs, sans et avec préchargement
+    (wsgi.py) : délai avant que l'application soit prête, avant la première réponse de
+    /health et avant la première transcription (backend factice).
+
+    Returns:
+        dict: Médianes par mode, en millisecondes, et mémoire résidente (Mo)
+    """
+    if not os.path.exists(audio_path):
+        generate_test_audio(audio_path, duration_ms=2000)
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, STT_FAKE_LATENCY='0', STT_CACHE_DIR='', PYTHONPATH=root)
+    results = {}
+    for mode in ('lazy', 'preload'):
+        samples = []
+        for _ in range(runs):
+            output = subprocess.run([sys.executable, '-c', _STARTUP_SCRIPT, mode, audio_path], cwd=root, env=env,
+                                    capture_output=True, text=True, check=True).stdout
+            samples.append(json.loads(output.strip().splitlines()[-1]))
+        results[mode] = {key: float(np.median([sample[key] for sample in samples])) * (1 if key == 'rss_mb' else 1000)
+                         for key in samples[0]}
+    return results
+
+def startup_main(argv):
+    parser = argparse.ArgumentParser(description="Benchmark du démarrage du serveur")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--output', help="Fichier JSON où écrire les résultats")
+    args = parser.parse_args(argv)
+
+    results = benchmark_startup(args.runs)
+    print(f"{'mode':<10} {'prêt (ms)':>10} {'/health (ms)':>13} {'1re transcription (ms)':>23} {'RSS (Mo)':>10}")
+    for mode, result in results.items():
+        print(f"{mode:<10} {result['ready']:>10.1f} {result['health']:>13.1f} "
+              f"{result['first_request']:>23.1f} {result['rss_mb']:>10.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
 if __name__ == "__main__":
+    # python generate_test_audio.py benchmark --help pour lancer les benchmarks
+    if len(sys.argv) > 1 and sys.argv[1] == 'benchmark':
+        sys.exit(benchmark_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'startup':
+        sys.exit(startup_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'decoders':
+        sys.exit(decoders_main(sys.argv[2:]))
+
     output_dir = "/home/ubuntu/app_transcription_vocale/test_files"
     os.makedirs(output_dir, exist_ok=True)
     
@@ -0,0 +1,18 @@
+import os
+
+# Configuration de production (gunicorn -c gunicorn.conf.py wsgi:app)
+bind = os.environ.get('STT_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('STT_WEB_WORKERS', '4'))
+threads = int(os.environ.get('STT_WEB_THREADS', '4'))
+timeout = int(os.environ.get('STT_WEB_TIMEOUT', '300'))
+
+# L'application (et le préchargement de wsgi.py) est chargée une seule fois dans le
+# processus maître ; les workers sont ensuite créés par fork et partagent ces pages mémoire
+preload_app = True
+
+def post_fork(server, worker):
+    # Les pools de threads et de processus sont créés à la première utilisation, dans chaque
+    # worker : aucun n'existe avant le fork. Le générateur aléatoire est réinitialisé par worker
+    # (gigue des nouvelles tentatives du client de reconnaissance).
+    import random
+    random.seed()
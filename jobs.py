@@ -0,0 +1,177 @@
+import os
+import time
+import uuid
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Configuration par défaut du pool de transcription asynchrone
+DEFAULT_JOB_WORKERS = int(os.environ.get('STT_JOB_WORKERS', '2'))
+DEFAULT_JOB_EXECUTOR = os.environ.get('STT_JOB_EXECUTOR', 'thread')  # 'thread' ou 'process'
+DEFAULT_MAX_QUEUED_JOBS = int(os.environ.get('STT_MAX_QUEUED_JOBS', '100'))
+DEFAULT_JOB_TTL = int(os.environ.get('STT_JOB_TTL', '3600'))  # Conservation des jobs terminés
+
+# États possibles d'un job
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+ERROR = 'error'
+
+class JobQueueFull(Exception):
+    """
+    Levée lorsque la file d'attente des jobs est pleine.
+    """
+
+def _transcribe_in_process(data, options):
+    """
+    Transcription complète exécutée dans un processus du pool (mode 'process').
+    """
+    from speech_to_text import iter_transcribed_segments
+    return list(iter_transcribed_segments(data, **options))
+
+# Les fonctions de transcription sont importées à la première utilisation :
+# importer ce module (constantes, JobQueueFull) ne charge pas speech_recognition ni pydub
+
+class TranscriptionJobManager:
+    def __init__(self, workers=DEFAULT_JOB_WORKERS, executor=DEFAULT_JOB_EXECUTOR,
+                 max_queued=DEFAULT_MAX_QUEUED_JOBS, ttl=DEFAULT_JOB_TTL):
+        """
+        Gère une file de transcriptions traitées par un pool borné de workers.
+
+        Args:
+            workers (int): Nombre de transcriptions traitées simultanément
+            executor (str): 'thread' (résultats partiels segment par segment)
+                ou 'process' (résultat disponible à la fin du job)
+            max_queued (int): Nombre maximal de jobs en attente
+            ttl (int): Durée de conservation d'un job terminé, en secondes
+        """
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"Type de pool inconnu: {executor}")
+        self.executor = executor
+        self.ttl = ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._process_pool = ProcessPoolExecutor(max_workers=workers) if executor == 'process' else None
+        self._threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, data, delete_source=False, on_done=None, **options):
+        """
+        Ajoute une transcription à la file et retourne immédiatement l'identifiant du job.
+
+        Args:
+            data (bytes | str): Contenu du fichier audio, ou chemin du fichier (uploads volumineux)
+            delete_source (bool): Supprimer le fichier `data` une fois le job terminé
+            on_done (callable): Appelée avec l'identifiant du job et les segments lorsque la transcription réussit
+            **options: Options de iter_transcribed_segments (format, backend, language, windowed...)
+
+        Returns:
+            str: Identifiant du job
+        """
+        self._purge()
+        job_id = uuid.uuid4().hex
+        job = {
+            'id': job_id,
+            'status': QUEUED,
+            'segments': [],
+            'transcription': None,
+            'error': None,
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+        try:
+            self._queue.put_nowait((job_id, data, delete_source, on_done, options))
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job_id]
+            raise JobQueueFull("Trop de transcriptions en attente, réessayez plus tard.")
+        return job_id
+
+    def get(self, job_id):
+        """
+        Retourne l'état d'un job (statut, segments déjà transcrits, durées), ou None s'il est inconnu.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            status = dict(job, segments=list(job['segments']))
+
+        now = time.time()
+        started_at = status['started_at']
+        finished_at = status['finished_at']
+        status['timings'] = {
+            'queued_seconds': (started_at or now) - status['created_at'],
+            'processing_seconds': ((finished_at or now) - started_at) if started_at else 0.0,
+        }
+        if status['transcription'] is None:
+            from speech_to_text import join_segments
+            status['partial_transcription'] = join_segments(status['segments'])
+        return status
+
+    def _worker(self):
+        while True:
+            job_id, data, delete_source, on_done, options = self._queue.get()
+            try:
+                self._run(job_id, data, options, on_done)
+            finally:
+                if delete_source:
+                    try:
+                        os.remove(data)
+                    except OSError:
+                        pass
+                self._queue.task_done()
+
+    def _run(self, job_id, data, options, on_done=None):
+        from speech_to_text import iter_transcribed_segments, join_segments
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job['status'] = RUNNING
+            job['started_at'] = time.time()
+
+        try:
+            if self._process_pool is not None:
+                segments = self._process_pool.submit(_transcribe_in_process, data, options).result()
+                with self._lock:
+                    job['segments'] = segments
+            else:
+                for segment in iter_transcribed_segments(data, **options):
+                    with self._lock:
+                        job['segments'].append(segment)
+
+            with self._lock:
+                text = join_segments(job['segments'])
+                errors = [segment['error'] for segment in job['segments'] if 'error' in segment]
+                if text:
+                    job['transcription'] = text
+                    job['status'] = DONE
+                else:
+                    job['error'] = f"Erreur: {errors[0]}" if errors else "Erreur: La parole n'a pas pu être reconnue."
+                    job['status'] = ERROR
+            if on_done is not None and text:
+                on_done(job_id, list(job['segments']))
+        except Exception as e:
+            with self._lock:
+                job['error'] = f"Erreur lors de la transcription: {e}"
+                job['status'] = ERROR
+        finally:
+            with self._lock:
+                job['finished_at'] = time.time()
+
+    def _purge(self):
+        """
+        Supprime les jobs terminés depuis plus longtemps que la durée de conservation.
+        """
+        limit = time.time() - self.ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job['finished_at'] and job['finished_at'] < limit]
+            for job_id in expired:
+                del self._jobs[job_id]
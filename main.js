@@ -14,6 +14,13 @@ document.addEventListener('DOMContentLoaded', function() {
     
     let selectedFile = null;
     let transcriptionText = '';
+    let summaryText = '';
+    
+    // Nombre de phrases de la synthèse, calculée par le serveur avec la transcription
+    const SUMMARY_SENTENCES = 3;
+    
+    // Intervalle d'interrogation de l'état d'une transcription asynchrone
+    const JOB_POLL_INTERVAL_MS = 1000;
     
     // Événements pour la sélection de fichier
     selectFileBtn.addEventListener('click', () => {
@@ -112,6 +119,7 @@ document.addEventListener('DOMContentLoaded', function() {
         transcriptionResult.textContent = '';
         summaryResult.textContent = '';
         transcriptionText = '';
+        summaryText = '';
     }
     
     // Événement pour le bouton de transcription
@@ -124,24 +132,21 @@ document.addEventListener('DOMContentLoaded', function() {
         // Créer un objet FormData pour envoyer le fichier
         const formData = new FormData();
         formData.append('file', selectedFile);
+        formData.append('num_sentences', SUMMARY_SENTENCES);
         
-        // Envoyer la requête au serveur
-        fetch('/transcribe', {
-            method: 'POST',
-            body: formData
-        })
-        .then(response => {
-            if (!response.ok) {
-                throw new Error('Erreur lors de la transcription');
-            }
-            return response.json();
-        })
-        .then(data => {
+        // Transcription et synthèse en une seule requête, segments affichés au fil de l'eau
+        // si le navigateur lit les réponses en flux ; sinon transcription asynchrone interrogée
+        // périodiquement (aucune requête ne reste bloquée pendant toute la transcription)
+        const processing = window.ReadableStream ? streamTranscription(formData) : submitJob(formData);
+        
+        processing
+        .then(result => {
             // Cacher le loader
             loader.style.display = 'none';
             
-            // Afficher la transcription
-            transcriptionText = data.transcription;
+            // Afficher la transcription ; la synthèse est gardée pour le bouton de synthèse
+            transcriptionText = result.transcription;
+            summaryText = result.summary || '';
             transcriptionResult.textContent = transcriptionText;
             transcriptionBox.classList.remove('hidden');
             
@@ -157,17 +162,146 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
     
+    // Lire les événements SSE de /transcribe/stream et afficher chaque segment dès sa réception
+    function streamTranscription(formData) {
+        return fetch('/transcribe/stream', {
+            method: 'POST',
+            body: formData
+        })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error('Erreur lors de la transcription');
+            }
+            
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            const texts = [];
+            let buffer = '';
+            
+            transcriptionResult.textContent = '';
+            transcriptionBox.classList.remove('hidden');
+            
+            function handleEvent(rawEvent) {
+                let event = 'message';
+                let data = '';
+                rawEvent.split('\n').forEach(line => {
+                    if (line.startsWith('event: ')) {
+                        event = line.slice(7);
+                    } else if (line.startsWith('data: ')) {
+                        data += line.slice(6);
+                    }
+                });
+                const payload = JSON.parse(data);
+                
+                if (event === 'segment') {
+                    if (payload.text) {
+                        texts.push(payload.text);
+                        transcriptionResult.textContent = texts.join(' ');
+                    }
+                } else if (event === 'error') {
+                    throw new Error(payload.error);
+                } else if (event === 'done') {
+                    if (!payload.transcription) {
+                        throw new Error("La parole n'a pas pu être reconnue.");
+                    }
+                    return payload;
+                }
+                return null;
+            }
+            
+            function read() {
+                return reader.read().then(({ done, value }) => {
+                    if (done) {
+                        throw new Error('Transcription interrompue');
+                    }
+                    buffer += decoder.decode(value, { stream: true });
+                    
+                    // Les événements SSE sont séparés par une ligne vide
+                    let separator;
+                    while ((separator = buffer.indexOf('\n\n')) !== -1) {
+                        const rawEvent = buffer.slice(0, separator);
+                        buffer = buffer.slice(separator + 2);
+                        const result = handleEvent(rawEvent);
+                        if (result !== null) {
+                            reader.cancel();
+                            return result;
+                        }
+                    }
+                    return read();
+                });
+            }
+            
+            return read();
+        });
+    }
+    
+    // Envoyer le fichier en transcription asynchrone puis attendre la fin du job ;
+    // la synthèse sera demandée à /summarize par le bouton de synthèse
+    function submitJob(formData) {
+        formData.append('async', '1');
+        
+        return fetch('/transcribe', {
+            method: 'POST',
+            body: formData
+        })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error('Erreur lors de la transcription');
+            }
+            return response.json();
+        })
+        .then(data => pollJob(data.status_url))
+        .then(job => ({ transcription: job.transcription, summary: null }));
+    }
+    
+    // Interroger l'état du job jusqu'à la fin, en affichant les résultats partiels
+    function pollJob(statusUrl) {
+        return new Promise((resolve, reject) => {
+            function check() {
+                fetch(statusUrl)
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error('Erreur lors de la transcription');
+                    }
+                    return response.json();
+                })
+                .then(job => {
+                    if (job.status === 'done') {
+                        resolve(job);
+                    } else if (job.status === 'error') {
+                        reject(new Error(job.error));
+                    } else {
+                        if (job.partial_transcription) {
+                            transcriptionResult.textContent = job.partial_transcription;
+                            transcriptionBox.classList.remove('hidden');
+                        }
+                        setTimeout(check, JOB_POLL_INTERVAL_MS);
+                    }
+                })
+                .catch(reject);
+            }
+            check();
+        });
+    }
+    
     // Événement pour le bouton de synthèse
     summarizeBtn.addEventListener('click', function() {
         if (!transcriptionText) return;
         
+        // Synthèse déjà calculée par le serveur avec la transcription : aucun aller-retour
+        if (summaryText) {
+            summaryResult.textContent = summaryText;
+            summaryBox.classList.remove('hidden');
+            return;
+        }
+        
         // Afficher le loader
         loader.style.display = 'block';
         
         // Préparer les données pour la requête
         const data = {
             text: transcriptionText,
-            num_sentences: 3
+            num_sentences: SUMMARY_SENTENCES
         };
         
         // Envoyer la requête au serveur
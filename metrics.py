@@ -0,0 +1,145 @@
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Bornes des histogrammes de durée (secondes)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# Description des métriques exposées (format Prometheus)
+METRICS_HELP = {
+    'stt_stage_duration_seconds': ('histogram', "Durée de chaque étape du traitement"),
+    'stt_audio_seconds_total': ('counter', "Durée audio traitée, en secondes"),
+    'stt_decoded_bytes_total': ('counter', "Octets de PCM décodés"),
+    'stt_cache_hits_total': ('counter', "Transcriptions servies par le cache"),
+    'stt_cache_misses_total': ('counter', "Transcriptions absentes du cache"),
+    'stt_errors_total': ('counter', "Erreurs par étape"),
+    'stt_decoder_calls_total': ('counter', "Fichiers décodés par décodeur"),
+    'stt_no_speech_total': ('counter', "Audios sans parole détectée, non transmis au moteur de reconnaissance"),
+    'stt_recognizer_retries_total': ('counter', "Nouvelles tentatives d'appel au moteur de reconnaissance"),
+    'stt_recognizer_hedges_total': ('counter', "Requêtes dupliquées envoyées au moteur de reconnaissance"),
+    'stt_recognizer_circuit_open_total': ('counter', "Ouvertures du disjoncteur du moteur de reconnaissance"),
+    'stt_index_dropped_total': ('counter', "Transcriptions non indexées, file d'indexation pleine"),
+}
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+
+# Durées cumulées par étape pour la requête en cours (en-tête Server-Timing)
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+class RequestTimings:
+    """
+    Durées cumulées par étape pendant le traitement d'une requête.
+    Partagé avec les threads de reconnaissance via le contexte copié.
+    """
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def server_timing(self):
+        """
+        Formate les durées pour l'en-tête HTTP Server-Timing (en millisecondes).
+        """
+        with self._lock:
+            stages = dict(self.stages)
+        stages['total'] = time.perf_counter() - self.started_at
+        return ', '.join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in stages.items())
+
+def start_request():
+    """
+    Commence le suivi des durées d'une requête et retourne l'objet RequestTimings associé.
+    """
+    timings = RequestTimings()
+    _request_timings.set(timings)
+    return timings
+
+def current_request():
+    return _request_timings.get()
+
+def _key(labels):
+    return tuple(sorted(labels.items()))
+
+def increment(name, value=1, **labels):
+    """
+    Incrémente un compteur.
+    """
+    key = (name, _key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def observe(stage, seconds):
+    """
+    Enregistre la durée d'une étape dans l'histogramme et dans la requête en cours.
+    """
+    key = ('stt_stage_duration_seconds', _key({'stage': stage}))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {'buckets': [0] * len(DURATION_BUCKETS), 'sum': 0.0, 'count': 0}
+        for index, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                histogram['buckets'][index] += 1
+        histogram['sum'] += seconds
+        histogram['count'] += 1
+
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+@contextmanager
+def timed(stage, expected=()):
+    """
+    Mesure la durée du bloc et l'enregistre pour l'étape donnée.
+    Une exception dans le bloc incrémente le compteur d'erreurs de l'étape,
+    sauf si elle fait partie des exceptions `expected` (résultats normaux).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except expected:
+        raise
+    except Exception:
+        increment('stt_errors_total', stage=stage)
+        raise
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+def render_prometheus():
+    """
+    Retourne toutes les métriques au format texte de Prometheus.
+    """
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: dict(value, buckets=list(value['buckets'])) for key, value in _histograms.items()}
+
+    lines = []
+    names = sorted({name for name, _ in counters} | {name for name, _ in histograms})
+    for name in names:
+        kind, description = METRICS_HELP.get(name, ('counter', name))
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (metric, labels), histogram in sorted(histograms.items()):
+            if metric != name:
+                continue
+            for bound, count in zip(DURATION_BUCKETS, histogram['buckets']):
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {count}")
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {histogram['count']}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram['sum']}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram['count']}")
+    return '\n'.join(lines) + '\n'
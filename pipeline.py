@@ -0,0 +1,57 @@
+import time
+import metrics
+from speech_to_text import iter_transcribed_segments, join_segments
+from text_summarizer import IncrementalSummarizer
+
+def iter_processed_segments(audio_source, summarizer, **options):
+    """
+    Transcrit un fichier audio par segments (voir iter_transcribed_segments) et ajoute
+    chaque segment à `summarizer` (IncrementalSummarizer) dès qu'il est reconnu :
+    la tokenisation se fait pendant la reconnaissance des segments suivants,
+    et ses résultats restent en mémoire pour la synthèse finale.
+    """
+    for segment in iter_transcribed_segments(audio_source, **options):
+        if segment['text']:
+            with metrics.timed('tokenize'):
+                summarizer.append(segment['text'])
+        yield segment
+
+def finish_summary(summarizer):
+    """
+    Intègre la dernière phrase et retourne le résumé (scores calculés sur la tokenisation déjà faite).
+    """
+    with metrics.timed('summarize'):
+        summarizer.flush()
+        return summarizer.summary()
+
+def process_audio(audio_source, num_sentences=3, timings=None, **options):
+    """
+    Transcrit et résume un fichier audio en une seule passe.
+
+    Args:
+        audio_source: Chemin, octets ou objet fichier
+        num_sentences (int): Nombre de phrases du résumé
+        timings (metrics.RequestTimings): Suivi des durées de la requête en cours (par exemple
+            celui de la requête Flask) ; par défaut un suivi propre à cet appel
+        **options: Options de iter_transcribed_segments (backend, language, format, windowed...)
+
+    Returns:
+        dict: Transcription, résumé, segments et durées par étape (en secondes),
+            avec une clé 'error' si la parole n'a pas pu être reconnue
+    """
+    if timings is None:
+        timings = metrics.start_request()
+    summarizer = IncrementalSummarizer(num_sentences)
+    segments = list(iter_processed_segments(audio_source, summarizer, **options))
+
+    transcription = join_segments(segments)
+    result = {'transcription': transcription, 'summary': None, 'segments': segments}
+    if transcription:
+        result['summary'] = finish_summary(summarizer)
+    else:
+        errors = [segment['error'] for segment in segments if 'error' in segment]
+        result['error'] = errors[0] if errors else "La parole n'a pas pu être reconnue."
+
+    result['timings'] = {stage: round(seconds, 4) for stage, seconds in timings.stages.items()}
+    result['timings']['total'] = round(time.perf_counter() - timings.started_at, 4)
+    return result
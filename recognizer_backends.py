@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import threading
+import urllib.error
+import urllib.request
+import speech_recognition as sr
+
+# Backend utilisé par défaut (peut être changé via la variable d'environnement STT_BACKEND)
+DEFAULT_BACKEND = os.environ.get('STT_BACKEND', 'google')
+
+# Chemin du modèle Vosk pour le backend hors ligne
+VOSK_MODEL_PATH = os.environ.get('VOSK_MODEL_PATH', 'models/vosk-model-small-fr')
+
+# Service de reconnaissance HTTP (par exemple fake_recognizer_server.py pour les tests)
+HTTP_RECOGNIZER_URL = os.environ.get('STT_HTTP_URL', 'http://127.0.0.1:8765/recognize')
+HTTP_RECOGNIZER_TIMEOUT = float(os.environ.get('STT_HTTP_TIMEOUT', '30'))
+
+class RecognizerBackend:
+    """
+    Interface commune des moteurs de reconnaissance vocale.
+    Les sous-classes lèvent sr.UnknownValueError si aucune parole n'est reconnue
+    et sr.RequestError si le moteur est indisponible.
+    Les moteurs distants (`remote`) sont appelés à travers recognizer_client.ResilientBackend.
+    """
+    name = None
+    remote = False
+
+    def recognize(self, audio_data, language="fr-FR"):
+        """
+        Transcrit un objet sr.AudioData et retourne le texte reconnu.
+        """
+        raise NotImplementedError
+
+class GoogleBackend(RecognizerBackend):
+    """
+    Reconnaissance via l'API Google Speech Recognition (nécessite Internet).
+    """
+    name = 'google'
+    remote = True
+
+    def recognize(self, audio_data, language="fr-FR"):
+        return sr.Recognizer().recognize_google(audio_data, language=language)
+
+class VoskBackend(RecognizerBackend):
+    """
+    Reconnaissance hors ligne avec un modèle Vosk local.
+    Le modèle est chargé une seule fois par processus puis réutilisé.
+    """
+    name = 'vosk'
+    _models = {}
+    _lock = threading.Lock()
+
+    def __init__(self, model_path=None):
+        self.model_path = model_path or VOSK_MODEL_PATH
+
+    def _get_model(self):
+        with self._lock:
+            model = self._models.get(self.model_path)
+            if model is None:
+                try:
+                    from vosk import Model
+                except ImportError as e:
+                    raise sr.RequestError(f"le paquet vosk n'est pas installé ({e})")
+                if not os.path.isdir(self.model_path):
+                    raise sr.RequestError(f"modèle Vosk introuvable: {self.model_path}")
+                model = Model(self.model_path)
+                self._models[self.model_path] = model
+            return model
+
+    def recognize(self, audio_data, language="fr-FR"):
+        # Le modèle est chargé d'abord : un paquet vosk absent devient une sr.RequestError
+        model = self._get_model()
+        from vosk import KaldiRecognizer
+
+        # Vosk attend du PCM 16 bits mono à la fréquence annoncée
+        raw_data = audio_data.get_raw_data(convert_rate=16000, convert_width=2)
+        recognizer = KaldiRecognizer(model, 16000)
+        recognizer.AcceptWaveform(raw_data)
+        text = json.loads(recognizer.FinalResult()).get('text', '')
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+class FakeBackend(RecognizerBackend):
+    """
+    Backend déterministe pour les tests de charge et les benchmarks :
+    simule une latence configurable et retourne un texte dépendant de la durée audio.
+    """
+    name = 'fake'
+
+    def __init__(self, latency=None, text=None):
+        if latency is None:
+            latency = float(os.environ.get('STT_FAKE_LATENCY', '0'))
+        self.latency = latency
+        self.text = text
+
+    def recognize(self, audio_data, language="fr-FR"):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.text is not None:
+            return self.text
+        duration = len(audio_data.frame_data) / (audio_data.sample_rate * audio_data.sample_width)
+        return f"segment de {duration:.2f} secondes"
+
+class HttpBackend(RecognizerBackend):
+    """
+    Reconnaissance par un service HTTP : le WAV est envoyé en POST et le service
+    répond en JSON {"text": ...}. Les réponses 429 et 5xx sont des erreurs du service.
+    """
+    name = 'http'
+    remote = True
+
+    def __init__(self, url=None, timeout=None):
+        self.url = url or HTTP_RECOGNIZER_URL
+        self.timeout = timeout or HTTP_RECOGNIZER_TIMEOUT
+
+    def recognize(self, audio_data, language="fr-FR"):
+        request = urllib.request.Request(f"{self.url}?lang={language}", data=audio_data.get_wav_data(),
+                                         headers={'Content-Type': 'audio/wav'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                text = json.loads(response.read().decode('utf-8')).get('text', '')
+        except urllib.error.HTTPError as e:
+            raise sr.RequestError(f"le service a répondu {e.code}")
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            raise sr.RequestError(f"service injoignable ({e})")
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+BACKENDS = {
+    GoogleBackend.name: GoogleBackend,
+    HttpBackend.name: HttpBackend,
+    VoskBackend.name: VoskBackend,
+    FakeBackend.name: FakeBackend,
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+def get_backend(backend=None):
+    """
+    Retourne le backend demandé : une instance de RecognizerBackend est utilisée telle quelle,
+    un nom ('google', 'http', 'vosk', 'fake') donne une instance partagée par le processus.
+    Les moteurs distants sont enveloppés dans un client avec limites, nouvelles tentatives
+    et disjoncteur (voir recognizer_client.ResilientBackend).
+    Sans argument, le backend configuré par STT_BACKEND est utilisé.
+    """
+    if isinstance(backend, RecognizerBackend):
+        return backend
+
+    name = (backend or DEFAULT_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Backend de reconnaissance inconnu: {name}")
+
+    with _instances_lock:
+        if name not in _instances:
+            instance = BACKENDS[name]()
+            if instance.remote:
+                from recognizer_client import ResilientBackend
+                instance = ResilientBackend(instance)
+            _instances[name] = instance
+        return _instances[name]
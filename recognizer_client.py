@@ -0,0 +1,252 @@
+import os
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import speech_recognition as sr
+import metrics
+from recognizer_backends import RecognizerBackend
+
+# Configuration par défaut du client (modifiable via les variables d'environnement)
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get('STT_RECOGNIZER_MAX_CONCURRENCY', '8'))
+DEFAULT_RATE = float(os.environ.get('STT_RECOGNIZER_RATE', '0'))            # Requêtes par seconde (0 : illimité)
+DEFAULT_BURST = int(os.environ.get('STT_RECOGNIZER_BURST', '10'))
+DEFAULT_MAX_RETRIES = int(os.environ.get('STT_RECOGNIZER_RETRIES', '3'))
+DEFAULT_BACKOFF_BASE = float(os.environ.get('STT_RECOGNIZER_BACKOFF', '0.5'))  # Secondes
+DEFAULT_BACKOFF_MAX = float(os.environ.get('STT_RECOGNIZER_BACKOFF_MAX', '10'))
+DEFAULT_FAILURE_THRESHOLD = int(os.environ.get('STT_RECOGNIZER_FAILURE_THRESHOLD', '5'))
+DEFAULT_RESET_TIMEOUT = float(os.environ.get('STT_RECOGNIZER_RESET_TIMEOUT', '30'))
+DEFAULT_HEDGE_PERCENTILE = float(os.environ.get('STT_RECOGNIZER_HEDGE_PERCENTILE', '0'))  # 0 : désactivé
+DEFAULT_HEDGE_MIN_SAMPLES = 20   # Nombre de latences mesurées avant d'envoyer des requêtes dupliquées
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        """
+        Limiteur de débit à seau de jetons : `rate` jetons par seconde, au plus `burst` d'avance.
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """
+        Prend un jeton, en attendant qu'il soit disponible.
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+    def try_acquire(self):
+        """
+        Prend un jeton s'il est disponible immédiatement, sans attendre.
+
+        Returns:
+            bool: True si un jeton a été pris
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+class CircuitBreaker:
+    # États du disjoncteur
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_RESET_TIMEOUT):
+        """
+        Disjoncteur : après `failure_threshold` échecs consécutifs, les appels échouent
+        immédiatement pendant `reset_timeout` secondes, puis un seul appel d'essai est
+        autorisé ; son succès referme le circuit.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Indique si un appel peut être tenté.
+        """
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    metrics.increment('stt_recognizer_circuit_open_total')
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_running = False
+
+class LatencyTracker:
+    def __init__(self, size=200):
+        """
+        Latences des derniers appels réussis, pour estimer un percentile.
+        """
+        self._latencies = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def percentile(self, percentile, min_samples=DEFAULT_HEDGE_MIN_SAMPLES):
+        """
+        Retourne le percentile des latences récentes, ou None s'il y a trop peu de mesures.
+        """
+        with self._lock:
+            if len(self._latencies) < min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        index = min(len(latencies) - 1, int(len(latencies) * percentile / 100))
+        return latencies[index]
+
+class ResilientBackend(RecognizerBackend):
+    def __init__(self, backend, max_concurrency=DEFAULT_MAX_CONCURRENCY, rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                 max_retries=DEFAULT_MAX_RETRIES, backoff_base=DEFAULT_BACKOFF_BASE, backoff_max=DEFAULT_BACKOFF_MAX,
+                 breaker=None, hedge_percentile=DEFAULT_HEDGE_PERCENTILE):
+        """
+        Client d'un moteur de reconnaissance distant : limite le nombre d'appels simultanés
+        et le débit, réessaie les erreurs (sr.RequestError) avec un délai exponentiel aléatoire,
+        coupe les appels lorsque le service est en panne (disjoncteur) et, si `hedge_percentile`
+        est donné, envoie une requête dupliquée lorsqu'un appel dépasse ce percentile de latence.
+
+        La limite d'appels simultanés est fixe, volontairement : elle reflète le quota du service,
+        et l'adaptation à la charge passe par le délai entre tentatives et par le disjoncteur
+        plutôt que par une limite qui varierait avec les latences observées.
+
+        Args:
+            backend (RecognizerBackend): Moteur appelé
+            max_concurrency (int): Nombre maximal d'appels simultanés
+            rate (float): Nombre maximal d'appels par seconde (0 pour illimité)
+            burst (int): Nombre d'appels pouvant partir d'un coup au-delà du débit
+            max_retries (int): Nombre de nouvelles tentatives après une erreur
+            backoff_base (float): Délai de base avant la première nouvelle tentative, en secondes
+            backoff_max (float): Délai maximal entre deux tentatives, en secondes
+            breaker (CircuitBreaker): Disjoncteur (un disjoncteur par défaut est créé sinon)
+            hedge_percentile (float): Percentile de latence déclenchant une requête dupliquée (0 pour désactiver)
+        """
+        self.backend = backend
+        self.name = backend.name
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge_percentile = hedge_percentile
+        self.latencies = LatencyTracker()
+        self._bucket = TokenBucket(rate, burst) if rate else None
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._hedge_pool = ThreadPoolExecutor(max_workers=2 * max_concurrency) if hedge_percentile else None
+
+    def recognize(self, audio_data, language="fr-FR"):
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                # Délai exponentiel avec gigue complète : les clients ne réessaient pas ensemble
+                metrics.increment('stt_recognizer_retries_total')
+                time.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))))
+            if not self.breaker.allow():
+                raise sr.RequestError("service de reconnaissance indisponible (circuit ouvert)")
+            try:
+                text = self._hedged_call(audio_data, language)
+            except sr.UnknownValueError:
+                # Le service a répondu : pas de parole reconnue n'est pas une panne
+                self.breaker.record_success()
+                raise
+            except sr.RequestError as e:
+                self.breaker.record_failure()
+                error = e
+                continue
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            self.breaker.record_success()
+            return text
+        raise error
+
+    def _call(self, audio_data, language, started=None, token_acquired=False, slot_acquired=False):
+        if not token_acquired and self._bucket is not None:
+            self._bucket.acquire()
+        if not slot_acquired:
+            self._slots.acquire()
+        try:
+            if started is not None:
+                started.set()
+            start = time.perf_counter()
+            text = self.backend.recognize(audio_data, language=language)
+            self.latencies.add(time.perf_counter() - start)
+            return text
+        finally:
+            self._slots.release()
+
+    def _hedged_call(self, audio_data, language):
+        """
+        Appelle le moteur ; si la réponse tarde au-delà du percentile de latence,
+        envoie une seconde requête identique et garde la première réponse obtenue.
+        """
+        delay = self.latencies.percentile(self.hedge_percentile) if self._hedge_pool else None
+        if delay is None:
+            return self._call(audio_data, language)
+
+        # Le délai court à partir du début effectif de l'appel, pas de l'attente d'un créneau
+        started = threading.Event()
+        futures = [self._hedge_pool.submit(self._call, audio_data, language, started)]
+        while not started.wait(0.05) and not futures[0].done():
+            pass
+        done, _ = wait(futures, timeout=delay)
+        # Requête dupliquée seulement si un créneau et un jeton du limiteur de débit sont libres
+        # immédiatement : pas de surcharge quand le service sature, et le débit maximal est respecté
+        if not done and self._slots.acquire(blocking=False):
+            if self._bucket is None or self._bucket.try_acquire():
+                metrics.increment('stt_recognizer_hedges_total')
+                futures.append(self._hedge_pool.submit(self._call, audio_data, language,
+                                                       token_acquired=True, slot_acquired=True))
+            else:
+                self._slots.release()
+
+        pending = set(futures)
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                # Une réponse sans parole reconnue est aussi une réponse définitive
+                if future.exception() is None or isinstance(future.exception(), sr.UnknownValueError):
+                    return future.result()
+            if not pending:
+                # Les deux requêtes ont échoué : l'erreur de la première est propagée
+                return futures[0].result()
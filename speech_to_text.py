@@ -1,64 +1,114 @@
 import os
+import glob
+import json
+import time
+import argparse
+import contextvars
+from collections import deque
 import speech_recognition as sr
 from pydub import AudioSegment
-import tempfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+import metrics
+from audio_preprocessing import preprocess_audio, detect_silences, to_original_time
+from audio_windows import iter_audio_blocks, DEFAULT_BLOCK_MS
+from audio_decoding import decode_audio
+from recognizer_backends import get_backend
+from transcription_cache import TranscriptionCache, get_default_cache
 
-def convert_audio_to_wav(audio_file_path):
+# Paramètres du mode segmenté
+DEFAULT_MAX_CHUNK_MS = 30000      # Durée maximale d'un segment envoyé au recognizer
+DEFAULT_OVERLAP_MS = 500          # Chevauchement lorsqu'on coupe hors d'un silence
+DEFAULT_MIN_SILENCE_MS = 250      # Durée minimale d'un silence pour y couper (< silences gardés au prétraitement)
+DEFAULT_MAX_WORKERS = 4           # Nombre de segments reconnus en parallèle
+
+def load_audio(audio_source, format=None):
     """
-    Convertit un fichier audio en format WAV pour le traitement par SpeechRecognition.
-    Prend en charge différents formats d'entrée (mp3, m4a, ogg, etc.)
+    Décode un fichier audio en mémoire, directement en mono 16 kHz 16 bits, sans fichier
+    intermédiaire (voir audio_decoding : décodeurs natifs ou pool de processus décodeurs).
+    `audio_source` peut être un chemin, des octets, un objet fichier (upload Flask ou
+    Streamlit) ou un AudioSegment déjà décodé. Le format est déduit du nom si possible.
     """
-    try:
-        # Obtenir l'extension du fichier
-        file_ext = os.path.splitext(audio_file_path)[1].lower()
-        
-        # Si c'est déjà un fichier WAV, retourner le chemin directement
-        if file_ext == '.wav':
-            return audio_file_path
-        
-        # Créer un fichier temporaire pour la sortie WAV
-        temp_wav = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-        temp_wav_path = temp_wav.name
-        temp_wav.close()
-        
-        # Convertir le fichier audio en WAV
-        audio = AudioSegment.from_file(audio_file_path)
-        audio.export(temp_wav_path, format="wav")
-        
-        return temp_wav_path
-    
-    except Exception as e:
-        print(f"Erreur lors de la conversion audio: {e}")
-        return None
+    if isinstance(audio_source, AudioSegment):
+        return audio_source
+
+    if format is None:
+        name = audio_source if isinstance(audio_source, str) else getattr(audio_source, 'name', None)
+        if isinstance(name, str):
+            format = os.path.splitext(name)[1][1:].lower() or None
+
+    with metrics.timed('decode'):
+        audio = decode_audio(audio_source, format)
+    metrics.increment('stt_decoded_bytes_total', len(audio.raw_data))
+    metrics.increment('stt_audio_seconds_total', len(audio) / 1000)
+    return audio
+
+def audio_to_audio_data(audio):
+    """
+    Convertit un AudioSegment en sr.AudioData mono, directement à partir du PCM brut.
+    """
+    audio = audio.set_channels(1)
+    return sr.AudioData(audio.raw_data, audio.frame_rate, audio.sample_width)
 
-def transcribe_audio(audio_file_path):
+def transcribe_audio(audio_file_path, segmented=False, language="fr-FR", backend=None, use_cache=True,
+                     format=None, preprocess=True, windowed=False, **segment_options):
     """
     Transcrit un fichier audio en texte.
-    Prend en charge différents formats d'entrée grâce à la conversion préalable.
+    Accepte un chemin, des octets ou un objet fichier : le décodage se fait en mémoire
+    (voir load_audio), puis le PCM est transmis directement au recognizer.
+    `backend` choisit le moteur de reconnaissance (voir recognizer_backends.get_backend).
+    Avec `preprocess`, l'audio est converti en mono 16 kHz et ses silences sont
+    compressés avant la reconnaissance (voir audio_preprocessing.preprocess_audio).
+    Les transcriptions réussies sont mises en cache (empreinte du PCM, langue et backend).
+    En mode segmenté, l'audio est découpé et les segments sont reconnus en parallèle
+    (voir transcribe_audio_segments pour les options).
+    Avec `windowed` (fichiers volumineux), l'audio est décodé et transcrit par fenêtres
+    sans être chargé en entier (voir iter_windowed_segments).
     """
     try:
-        # Convertir le fichier audio en WAV si nécessaire
-        wav_file_path = convert_audio_to_wav(audio_file_path)
+        if windowed:
+            segments = transcribe_audio_segments(audio_file_path, windowed=True, language=language,
+                                                 backend=backend, format=format, preprocess=preprocess,
+                                                 **segment_options)
+            return _segments_to_text(segments)
         
-        if not wav_file_path:
+        try:
+            audio = load_audio(audio_file_path, format)
+        except Exception as e:
+            print(f"Erreur lors de la conversion audio: {e}")
             return "Erreur: Impossible de convertir le fichier audio."
+
+        if segmented:
+            segments = transcribe_audio_segments(audio, language=language,
+                                                 backend=backend, use_cache=use_cache,
+                                                 preprocess=preprocess, **segment_options)
+            return _segments_to_text(segments)
+
+        backend = get_backend(backend)
+        if use_cache:
+            cache = get_default_cache()
+            cache_key = TranscriptionCache.make_key(audio.raw_data, language, backend.name,
+                                                    audio.frame_rate, audio.sample_width, audio.channels,
+                                                    preprocess)
+            cached = _cache_lookup(cache, cache_key)
+            if cached is not None:
+                return cached
         
-        # Initialiser le recognizer
-        recognizer = sr.Recognizer()
-        
-        # Charger le fichier audio
-        with sr.AudioFile(wav_file_path) as source:
-            # Ajuster pour le bruit ambiant
-            recognizer.adjust_for_ambient_noise(source)
-            # Enregistrer l'audio
-            audio_data = recognizer.record(source)
+        # Mono 16 kHz sans les silences superflus : moins de données à envoyer
+        if preprocess:
+            with metrics.timed('preprocess'):
+                audio, _ = preprocess_audio(audio)
+            if len(audio) == 0:
+                metrics.increment('stt_no_speech_total')
+                raise sr.UnknownValueError()
         
-        # Supprimer le fichier temporaire si ce n'est pas le fichier original
-        if wav_file_path != audio_file_path:
-            os.unlink(wav_file_path)
+        # Passer le PCM décodé directement au recognizer
+        audio_data = audio_to_audio_data(audio)
         
-        # Utiliser Google Speech Recognition pour la transcription
-        text = recognizer.recognize_google(audio_data, language="fr-FR")
+        # Utiliser le backend configuré pour la transcription
+        with metrics.timed('recognize', expected=sr.UnknownValueError):
+            text = backend.recognize(audio_data, language=language)
+        if use_cache:
+            cache.set(cache_key, text)
         return text
     
     except sr.UnknownValueError:
@@ -68,6 +118,424 @@ def transcribe_audio(audio_file_path):
     except Exception as e:
         return f"Erreur lors de la transcription: {e}"
 
+def _segments_to_text(segments):
+    """
+    Assemble le texte des segments, ou retourne le message d'erreur si aucun n'a été reconnu.
+    """
+    text = join_segments(segments)
+    if text:
+        return text
+    errors = [segment['error'] for segment in segments if 'error' in segment]
+    if errors:
+        return f"Erreur: {errors[0]}"
+    return "Erreur: La parole n'a pas pu être reconnue."
+
+def _cache_lookup(cache, cache_key):
+    """
+    Consulte le cache en comptabilisant les succès et les échecs.
+    """
+    cached = cache.get(cache_key)
+    metrics.increment('stt_cache_hits_total' if cached is not None else 'stt_cache_misses_total')
+    return cached
+
+def compute_segment_bounds(duration_ms, silences, max_chunk_ms=DEFAULT_MAX_CHUNK_MS,
+                           overlap_ms=DEFAULT_OVERLAP_MS):
+    """
+    Calcule les bornes (début, fin) en millisecondes des segments à transcrire.
+    On coupe de préférence au milieu du dernier silence de la fenêtre; à défaut,
+    on coupe à la durée maximale en gardant un chevauchement pour ne pas tronquer un mot.
+    """
+    if overlap_ms >= max_chunk_ms:
+        raise ValueError("Le chevauchement doit être inférieur à la durée maximale d'un segment.")
+
+    cut_points = [(start + end) // 2 for start, end in silences]
+    bounds = []
+    start = 0
+    while start < duration_ms:
+        limit = start + max_chunk_ms
+        if limit >= duration_ms:
+            bounds.append((start, duration_ms))
+            break
+
+        # Dernier silence dans la fenêtre courante
+        cut = None
+        for point in cut_points:
+            if point > limit:
+                break
+            if point > start:
+                cut = point
+
+        if cut is not None:
+            bounds.append((start, cut))
+            start = cut
+        else:
+            bounds.append((start, limit))
+            start = limit - overlap_ms
+
+    return bounds
+
+def split_audio(audio, max_chunk_ms=DEFAULT_MAX_CHUNK_MS, overlap_ms=DEFAULT_OVERLAP_MS,
+                min_silence_ms=DEFAULT_MIN_SILENCE_MS):
+    """
+    Découpe un AudioSegment aux silences (ou à la durée maximale).
+    Retourne une liste de tuples (début_ms, fin_ms, AudioSegment).
+    """
+    silences = []
+    if len(audio) > max_chunk_ms:
+        silences = detect_silences(audio, min_silence_ms)
+
+    bounds = compute_segment_bounds(len(audio), silences, max_chunk_ms, overlap_ms)
+    return [(start, end, audio[start:end]) for start, end in bounds]
+
+def _recognize_chunk(chunk, language, backend):
+    """
+    Reconnaît un segment audio avec le backend donné. Retourne un tuple (texte, erreur).
+    Un segment sans parole reconnue donne un texte vide.
+    """
+    audio_data = audio_to_audio_data(chunk)
+    try:
+        with metrics.timed('recognize', expected=sr.UnknownValueError):
+            return backend.recognize(audio_data, language=language), None
+    except sr.UnknownValueError:
+        return "", None
+    except sr.RequestError as e:
+        return "", f"Impossible d'accéder au service de reconnaissance vocale; {e}"
+
+def _strip_overlap(previous_text, text, max_words=8):
+    """
+    Retire du début de `text` les mots déjà présents à la fin de `previous_text`
+    (doublons dus au chevauchement entre deux segments).
+    """
+    previous_words = previous_text.lower().split()
+    words = text.split()
+    lowered = [word.lower() for word in words]
+    for n in range(min(max_words, len(previous_words), len(words)), 0, -1):
+        if previous_words[-n:] == lowered[:n]:
+            return ' '.join(words[n:])
+    return text
+
+def iter_transcribed_segments(audio_file_path, language="fr-FR", backend=None,
+                              max_chunk_ms=DEFAULT_MAX_CHUNK_MS, overlap_ms=DEFAULT_OVERLAP_MS,
+                              max_workers=DEFAULT_MAX_WORKERS, use_cache=True, format=None, preprocess=True,
+                              windowed=False):
+    """
+    Transcrit un fichier audio (chemin, octets, objet fichier ou AudioSegment)
+    par segments reconnus en parallèle, et produit chaque segment dans l'ordre
+    dès qu'il est reconnu.
+    `backend` est un nom ('google', 'vosk', 'fake') ou une instance de RecognizerBackend.
+    Chaque segment est un dictionnaire {'start', 'end', 'text'} (en secondes, par
+    rapport à l'audio d'origine même si les silences ont été compressés),
+    avec une clé 'error' si sa reconnaissance a échoué.
+    Avec `windowed`, le fichier est traité par fenêtres à mémoire constante (voir iter_windowed_segments).
+    """
+    if windowed:
+        yield from iter_windowed_segments(audio_file_path, language=language, backend=backend,
+                                          max_chunk_ms=max_chunk_ms, overlap_ms=overlap_ms,
+                                          max_workers=max_workers, format=format, preprocess=preprocess)
+        return
+
+    backend = get_backend(backend)
+    audio = load_audio(audio_file_path, format)
+
+    # Un fichier déjà transcrit est servi par le cache sans appeler le recognizer
+    if use_cache:
+        cache = get_default_cache()
+        cache_key = TranscriptionCache.make_key(audio.raw_data, language, backend.name, 'segments',
+                                                audio.frame_rate, audio.sample_width, audio.channels,
+                                                max_chunk_ms, overlap_ms, preprocess)
+        cached = _cache_lookup(cache, cache_key)
+        if cached is not None:
+            yield from cached
+            return
+
+    spans = [(0, len(audio))]
+    if preprocess:
+        with metrics.timed('preprocess'):
+            audio, spans = preprocess_audio(audio)
+        if not spans:
+            metrics.increment('stt_no_speech_total')
+
+    chunks = split_audio(audio, max_chunk_ms, overlap_ms) if len(audio) else []
+
+    # Pool borné : le temps total dépend du nombre de workers, pas de la durée
+    segments = []
+    previous_end = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Chaque tâche s'exécute dans une copie du contexte courant (durées de la requête)
+        futures = [executor.submit(contextvars.copy_context().run, _recognize_chunk, chunk, language, backend)
+                   for _, _, chunk in chunks]
+        results = (future.result() for future in futures)
+        for (start, end, _), (text, error) in zip(chunks, results):
+            if segments and text and previous_end > start:
+                text = _strip_overlap(segments[-1]['text'], text)
+            previous_end = end
+            segment = {
+                'start': to_original_time(start, spans) / 1000,
+                'end': to_original_time(end, spans) / 1000,
+                'text': text,
+            }
+            if error:
+                segment['error'] = error
+            segments.append(segment)
+            yield segment
+
+    # Les résultats partiels (erreur réseau sur un segment) ne sont pas mis en cache
+    if use_cache and not any('error' in segment for segment in segments):
+        cache.set(cache_key, segments)
+
+def _decoded_windows(audio_source, format, max_chunk_ms, overlap_ms, block_ms):
+    """
+    Décode l'audio par blocs et le redécoupe en fenêtres d'au plus `max_chunk_ms`,
+    coupées aux silences comme dans split_audio. Seuls le bloc courant et le reste
+    de la fenêtre précédente sont gardés en mémoire.
+    Produit des tuples (début_ms dans l'audio d'origine, AudioSegment).
+    """
+    blocks = iter_audio_blocks(audio_source, format, block_ms)
+    buffer = None
+    offset = 0
+    while True:
+        with metrics.timed('decode'):
+            block = next(blocks, None)
+        if block is None:
+            break
+        metrics.increment('stt_decoded_bytes_total', len(block.raw_data))
+        metrics.increment('stt_audio_seconds_total', len(block) / 1000)
+
+        buffer = block if buffer is None else buffer + block
+        while len(buffer) > max_chunk_ms:
+            silences = detect_silences(buffer, DEFAULT_MIN_SILENCE_MS)
+            bounds = compute_segment_bounds(len(buffer), silences, max_chunk_ms, overlap_ms)
+            yield offset, buffer[:bounds[0][1]]
+            next_start = bounds[1][0]
+            buffer = buffer[next_start:]
+            offset += next_start
+
+    if buffer is not None and len(buffer):
+        yield offset, buffer
+
+def _recognize_window(window, language, backend, preprocess):
+    """
+    Prépare (si demandé) puis reconnaît une fenêtre. Retourne un tuple (texte, erreur, portions),
+    les portions (début_ms, fin_ms) de la fenêtre étant celles transmises au recognizer.
+    Une fenêtre sans parole n'est pas transmise.
+    """
+    spans = [(0, len(window))]
+    if preprocess:
+        with metrics.timed('preprocess'):
+            window, spans = preprocess_audio(window)
+        if len(window) == 0:
+            return "", None, spans
+    return _recognize_chunk(window, language, backend) + (spans,)
+
+def iter_windowed_segments(audio_source, language="fr-FR", backend=None,
+                           max_chunk_ms=DEFAULT_MAX_CHUNK_MS, overlap_ms=DEFAULT_OVERLAP_MS,
+                           max_workers=DEFAULT_MAX_WORKERS, format=None, preprocess=True,
+                           block_ms=DEFAULT_BLOCK_MS):
+    """
+    Transcrit un fichier volumineux (chemin ou objet fichier) à mémoire constante :
+    l'audio est décodé par blocs (voir audio_windows.iter_audio_blocks), découpé en
+    fenêtres aux silences, et au plus 2 x `max_workers` fenêtres sont en mémoire à la fois.
+    Produit les segments dans l'ordre, au même format que iter_transcribed_segments.
+    Le cache n'est pas utilisé : son empreinte exigerait de décoder tout le fichier avant de commencer.
+    """
+    backend = get_backend(backend)
+    previous = None
+    previous_end = 0
+    # Au moins une fenêtre contenait de la parole (sinon le fichier compte comme sans parole)
+    heard = False
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = deque()
+
+        def next_segment():
+            nonlocal previous, previous_end, heard
+            start, end, future = in_flight.popleft()
+            text, error, spans = future.result()
+            heard = heard or bool(spans)
+            if previous and text and previous_end > start:
+                text = _strip_overlap(previous['text'], text)
+            previous_end = end
+            # Horodatages de la parole transmise au recognizer, dans l'audio d'origine
+            if spans:
+                start, end = start + spans[0][0], start + spans[-1][1]
+            segment = {'start': start / 1000, 'end': end / 1000, 'text': text}
+            if error:
+                segment['error'] = error
+            previous = segment
+            return segment
+
+        for start, window in _decoded_windows(audio_source, format, max_chunk_ms, overlap_ms, block_ms):
+            future = executor.submit(contextvars.copy_context().run, _recognize_window,
+                                     window, language, backend, preprocess)
+            in_flight.append((start, start + len(window), future))
+            del window
+            while len(in_flight) >= 2 * max_workers:
+                yield next_segment()
+        while in_flight:
+            yield next_segment()
+    if not heard:
+        metrics.increment('stt_no_speech_total')
+
+def transcribe_audio_segments(audio_file_path, **options):
+    """
+    Transcrit un fichier audio par segments reconnus en parallèle.
+    Retourne la liste ordonnée des segments (voir iter_transcribed_segments pour les options).
+    """
+    return list(iter_transcribed_segments(audio_file_path, **options))
+
+def join_segments(segments):
+    """
+    Assemble le texte des segments transcrits.
+    """
+    return ' '.join(segment['text'] for segment in segments if segment['text'])
+
+# Extensions traitées par la transcription par lots
+AUDIO_EXTENSIONS = {'.mp3', '.wav', '.ogg', '.m4a', '.flac'}
+
+def find_audio_files(inputs):
+    """
+    Liste les fichiers audio désignés par des chemins de fichiers, des dossiers
+    (parcourus récursivement) ou des motifs glob. Retourne une liste triée sans doublons.
+    """
+    files = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, names in os.walk(item):
+                files.update(os.path.join(root, name) for name in names
+                             if os.path.splitext(name)[1].lower() in AUDIO_EXTENSIONS)
+        elif os.path.isfile(item):
+            files.add(item)
+        else:
+            files.update(path for path in glob.glob(item, recursive=True)
+                         if os.path.isfile(path) and os.path.splitext(path)[1].lower() in AUDIO_EXTENSIONS)
+    return sorted(os.path.abspath(path) for path in files)
+
+def _is_final(result):
+    """
+    Indique si un résultat de la transcription par lots est définitif : succès, fichier sans
+    parole, ou erreur qui se reproduirait (fichier illisible). Les erreurs du service de
+    reconnaissance (réseau, quota...) sont retentées à la reprise.
+    """
+    return 'error' not in result or not result.get('retryable', True)
+
+def _read_results(output_path):
+    """
+    Parcourt un fichier JSONL de résultats. Produit (ligne, résultat), le résultat valant
+    None pour une ligne illisible (dernière ligne tronquée d'une exécution interrompue).
+    """
+    if not os.path.exists(output_path):
+        return
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                result = json.loads(line) if line.endswith('\n') else None
+            except ValueError:
+                result = None
+            yield line, result
+
+def load_processed_files(output_path):
+    """
+    Retourne les fichiers dont le résultat est définitif d'après un fichier JSONL de résultats
+    (voir _is_final). Une dernière ligne tronquée (exécution interrompue) est ignorée.
+    """
+    return {result['file'] for _, result in _read_results(output_path) if result is not None and _is_final(result)}
+
+def _prepare_results(output_path):
+    """
+    Prépare la reprise : ne garde dans le fichier de résultats qu'un résultat définitif par
+    fichier, sans les lignes des fichiers à retraiter ni une ligne tronquée, pour que chaque
+    fichier n'y figure qu'une fois. Le fichier n'est réécrit (de façon atomique) que si nécessaire.
+    Retourne les fichiers déjà traités.
+    """
+    processed = set()
+    kept = []
+    rewrite = False
+    for line, result in _read_results(output_path):
+        if result is None or not _is_final(result) or result['file'] in processed:
+            rewrite = True
+            continue
+        processed.add(result['file'])
+        kept.append(line)
+    if rewrite:
+        temporary_path = f"{output_path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as f:
+            f.writelines(kept)
+        os.replace(temporary_path, output_path)
+    return processed
+
+def transcribe_file_for_batch(path, backend=None, language="fr-FR", summarize=False, num_sentences=3):
+    """
+    Transcrit (et résume si demandé) un fichier pour la transcription par lots.
+    Retourne un dictionnaire sérialisable : fichier, transcription, segments, résumé,
+    durées par étape, ou l'erreur rencontrée. Un fichier sans parole donne une transcription
+    vide avec 'no_speech'; une erreur porte 'retryable' (False si le fichier est illisible).
+    """
+    timings = metrics.start_request()
+    result = {'file': path}
+    try:
+        try:
+            audio = load_audio(path)
+        except Exception as e:
+            # Un fichier illisible le restera : inutile de le retenter à la reprise
+            result['error'] = f"Erreur lors de la conversion audio: {e}"
+            result['retryable'] = False
+        else:
+            segments = transcribe_audio_segments(audio, language=language, backend=backend)
+            text = join_segments(segments)
+            errors = [segment['error'] for segment in segments if 'error' in segment]
+            if errors:
+                result['error'] = errors[0]
+                result['retryable'] = True
+            elif not text:
+                result['no_speech'] = True
+            result['transcription'] = text
+            result['segments'] = segments
+            if summarize and text:
+                from text_summarizer import summarize_text
+                result['summary'] = summarize_text(text, num_sentences=num_sentences)
+    except Exception as e:
+        result['error'] = f"Erreur lors de la transcription: {e}"
+        result['retryable'] = True
+    result['timings'] = {stage: round(seconds, 4) for stage, seconds in timings.stages.items()}
+    result['timings']['total'] = round(time.perf_counter() - timings.started_at, 4)
+    return result
+
+def transcribe_batch(inputs, output_path, workers=None, **options):
+    """
+    Transcrit un ensemble de fichiers sur un pool de processus et écrit chaque résultat
+    dans un fichier JSONL dès qu'il est disponible. Les fichiers dont le résultat est définitif
+    dans le fichier de sortie sont ignorés : une exécution interrompue reprend là où elle s'était
+    arrêtée, et seuls les fichiers en erreur temporaire sont retentés (leur ancienne ligne est remplacée).
+    Retourne le nombre de fichiers traités.
+    """
+    processed = _prepare_results(output_path)
+    pending = [path for path in find_audio_files(inputs) if path not in processed]
+    print(f"{len(pending)} fichier(s) à traiter, {len(processed)} déjà traité(s)")
+
+    workers = workers or os.cpu_count() or 1
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor, \
+            open(output_path, 'a', encoding='utf-8') as output:
+        # Nombre borné de fichiers en cours pour ne pas soumettre toute la liste d'un coup
+        paths = iter(pending)
+        in_flight = set()
+        while True:
+            while len(in_flight) < 2 * workers:
+                path = next(paths, None)
+                if path is None:
+                    break
+                in_flight.add(executor.submit(transcribe_file_for_batch, path, **options))
+            if not in_flight:
+                break
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                result = future.result()
+                output.write(json.dumps(result, ensure_ascii=False) + '\n')
+                output.flush()
+                done += 1
+                status = 'erreur' if 'error' in result else 'sans parole' if result.get('no_speech') else 'ok'
+                print(f"[{done}/{len(pending)}] {result['file']}: {status}")
+    return done
+
 # Fonction pour tester la transcription
 def test_transcription(audio_file_path):
     """
@@ -78,13 +546,30 @@ def test_transcription(audio_file_path):
     print(f"Résultat de la transcription: {result}")
     return result
 
+def batch_main(argv):
+    parser = argparse.ArgumentParser(description="Transcription par lots de fichiers audio")
+    parser.add_argument('inputs', nargs='+', help="Fichiers, dossiers ou motifs glob (ex. 'archives/**/*.mp3')")
+    parser.add_argument('--output', '-o', required=True, help="Fichier JSONL des résultats (reprise automatique)")
+    parser.add_argument('--workers', '-w', type=int, default=None, help="Nombre de processus")
+    parser.add_argument('--backend', default=None, help="Moteur de reconnaissance (google, vosk, fake)")
+    parser.add_argument('--language', default="fr-FR")
+    parser.add_argument('--summary', action='store_true', help="Ajouter une synthèse de chaque transcription")
+    parser.add_argument('--num-sentences', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    transcribe_batch(args.inputs, args.output, workers=args.workers, backend=args.backend,
+                     language=args.language, summarize=args.summary, num_sentences=args.num_sentences)
+
 if __name__ == "__main__":
     # Ce code s'exécute uniquement si le script est exécuté directement
     import sys
     
-    if len(sys.argv) > 1:
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        batch_main(sys.argv[2:])
+    elif len(sys.argv) > 1:
         audio_file = sys.argv[1]
         test_transcription(audio_file)
     else:
         print("Veuillez spécifier un fichier audio à transcrire.")
         print("Usage: python speech_to_text.py chemin/vers/fichier_audio")
+        print("       python speech_to_text.py batch dossier_ou_motif... --output resultats.jsonl")
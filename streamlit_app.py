@@ -1,8 +1,8 @@
+import hashlib
 import streamlit as st
-import os
-import tempfile
 from speech_to_text import transcribe_audio
-from text_summarizer import summarize_text
+from text_summarizer import TextSummarizer
+from recognizer_backends import get_backend
 
 # Configuration de la page Streamlit
 st.set_page_config(
@@ -18,43 +18,69 @@ Cette application vous permet de convertir un fichier audio (message vocal) en t
 puis d'en générer une synthèse concise mettant en évidence les points importants.
 """)
 
+# Moteur de reconnaissance et synthétiseur partagés par toutes les sessions
+@st.cache_resource
+def get_recognizer():
+    return get_backend()
+
+@st.cache_resource
+def get_summarizer():
+    return TextSummarizer()
+
+# Transcription mise en cache selon l'empreinte du fichier : un fichier n'est transcrit
+# qu'une fois, même si l'application est réexécutée (bouton, curseur...).
+# Le contenu (`_data`) n'est pas haché une seconde fois par Streamlit.
+@st.cache_data(show_spinner=False)
+def transcribe_file(file_hash, _data, audio_format):
+    transcription = transcribe_audio(_data, format=audio_format, backend=get_recognizer())
+    # Les erreurs ne sont pas mises en cache : une exception n'est jamais mémorisée
+    if transcription.startswith("Erreur"):
+        raise RuntimeError(transcription)
+    return transcription
+
+# Seule la synthèse est recalculée lorsque le nombre de phrases change
+@st.cache_data(show_spinner=False)
+def summarize_transcription(transcription, num_sentences):
+    return get_summarizer().summarize(transcription, num_sentences=num_sentences)
+
 # Fonction pour traiter le fichier audio
-def process_audio_file(uploaded_file):
-    # Créer un fichier temporaire pour stocker l'audio
-    with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{uploaded_file.name.split(".")[-1]}') as tmp_file:
-        # Écrire le contenu du fichier téléchargé dans le fichier temporaire
-        tmp_file.write(uploaded_file.getvalue())
-        tmp_file_path = tmp_file.name
-    
+def process_audio_file(uploaded_file, file_hash):
     try:
-        # Transcrire l'audio
+        # Transcrire l'audio (décodé en mémoire, sans fichier temporaire)
         with st.spinner('Transcription en cours...'):
-            transcription = transcribe_audio(tmp_file_path)
-        
-        # Afficher la transcription
-        st.subheader("Transcription")
-        st.write(transcription)
-        
-        # Ajouter un bouton pour générer la synthèse
-        if st.button("Générer une synthèse"):
-            with st.spinner('Génération de la synthèse en cours...'):
-                # Nombre de phrases pour la synthèse
-                num_sentences = st.slider("Nombre de phrases dans la synthèse", 1, 10, 3)
-                
-                # Synthétiser le texte
-                summary = summarize_text(transcription, num_sentences=num_sentences)
-                
-                # Afficher la synthèse
-                st.subheader("Synthèse")
-                st.write(summary)
-    
+            transcription = transcribe_file(file_hash, uploaded_file.getvalue(),
+                                            uploaded_file.name.split(".")[-1].lower())
     except Exception as e:
         st.error(f"Erreur lors du traitement du fichier audio: {str(e)}")
+        st.session_state.transcribed_hash = None
+        return
     
-    finally:
-        # Supprimer le fichier temporaire
-        if os.path.exists(tmp_file_path):
-            os.unlink(tmp_file_path)
+    # Afficher la transcription
+    st.subheader("Transcription")
+    st.write(transcription)
+    
+    # Le bouton mémorise la demande : le curseur reste affiché lors des réexécutions
+    if st.button("Générer une synthèse"):
+        st.session_state.summary_requested = True
+    
+    if st.session_state.summary_requested:
+        # Nombre de phrases pour la synthèse
+        num_sentences = st.slider("Nombre de phrases dans la synthèse", 1, 10, 3)
+        
+        try:
+            with st.spinner('Génération de la synthèse en cours...'):
+                summary = summarize_transcription(transcription, num_sentences)
+        except Exception as e:
+            st.error(f"Erreur lors de la synthèse: {str(e)}")
+            return
+        
+        # Afficher la synthèse
+        st.subheader("Synthèse")
+        st.write(summary)
+
+# État de la session : fichier transcrit et synthèse demandée
+st.session_state.setdefault('transcribed_hash', None)
+st.session_state.setdefault('summary_requested', False)
 
 # Interface principale
 st.subheader("Téléchargez votre fichier audio")
@@ -74,9 +100,17 @@ if uploaded_file is not None:
     for key, value in file_details.items():
         st.write(f"- {key}: {value}")
     
-    # Bouton pour lancer le traitement
+    # Empreinte du contenu : identifie le fichier d'une réexécution à l'autre
+    file_hash = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+    
+    # Bouton pour lancer le traitement ; la transcription reste affichée ensuite
     if st.button("Transcrire"):
-        process_audio_file(uploaded_file)
+        if st.session_state.transcribed_hash != file_hash:
+            st.session_state.summary_requested = False
+        st.session_state.transcribed_hash = file_hash
+    
+    if st.session_state.transcribed_hash == file_hash:
+        process_audio_file(uploaded_file, file_hash)
 
 # Informations supplémentaires
 with st.expander("À propos de cette application"):
@@ -0,0 +1,47 @@
+import os
+import sys
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import audio_decoding
+from audio_decoding import DecoderPool, decode_to_pcm
+
+# Octets illisibles présentés comme un MP3 : aucun décodeur ne peut les lire
+GARBAGE_MP3 = b'ID3' + bytes(range(256)) * 4
+
+class DecoderPoolTest(unittest.TestCase):
+    def test_decoder_workers_do_not_fall_back_to_ffmpeg(self):
+        with self.assertRaises(RuntimeError) as context:
+            decode_to_pcm(GARBAGE_MP3, 'mp3', allow_ffmpeg=False)
+        # Erreur des seuls décodeurs dans le processus, ffmpeg n'a pas été essayé
+        self.assertNotIn('ffmpeg', str(context.exception))
+
+    def test_pool_falls_back_to_ffmpeg_in_the_caller(self):
+        def failing_av(data, format):
+            raise ValueError("flux illisible")
+
+        pool = DecoderPool(workers=0)
+        # Threads à la place des processus décodeurs : les décodeurs remplacés y sont visibles
+        pool._executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(pool._executor.shutdown)
+        decoders = tuple(('av', None, failing_av, True) if name == 'av' else (name, formats, decoder, available)
+                         for name, formats, decoder, available in audio_decoding.DECODERS)
+        calls = []
+
+        def ffmpeg(data, format):
+            calls.append(threading.current_thread())
+            return b'\0\0' * 160
+
+        with mock.patch.object(audio_decoding, 'DECODERS', decoders), \
+                mock.patch.object(audio_decoding, '_decode_ffmpeg', side_effect=ffmpeg):
+            pcm, decoder = pool.decode_pcm(GARBAGE_MP3, 'mp3')
+        self.assertEqual((pcm, decoder), (b'\0\0' * 160, 'ffmpeg'))
+        # ffmpeg est lancé une seule fois, par l'appelant et non par le processus décodeur
+        self.assertEqual(calls, [threading.current_thread()])
+
+if __name__ == '__main__':
+    unittest.main()
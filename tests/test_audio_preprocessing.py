@@ -0,0 +1,80 @@
+import os
+import re
+import sys
+import tempfile
+import unittest
+import numpy as np
+from pydub import AudioSegment
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+from audio_preprocessing import detect_speech, preprocess_audio, samples_to_audio
+from generate_test_audio import generate_test_audio, generate_benchmark_audio
+
+SAMPLE_RATE = 16000
+
+def tone(frequencies, duration_ms=2000, square=False):
+    t = np.arange(int(SAMPLE_RATE * duration_ms / 1000)) / SAMPLE_RATE
+    waves = [np.sin(2 * np.pi * frequency * t) for frequency in frequencies]
+    if square:
+        waves = [np.sign(wave) for wave in waves]
+    signal = np.sum(waves, axis=0)
+    return samples_to_audio(0.3 * signal / np.abs(signal).max(), SAMPLE_RATE)
+
+def with_silences(audio):
+    silence = AudioSegment.silent(duration=500, frame_rate=SAMPLE_RATE)
+    return silence + audio + silence
+
+def no_speech_count():
+    match = re.search(r'^stt_no_speech_total (\S+)$', metrics.render_prometheus(), re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+class SpeechDetectionTest(unittest.TestCase):
+    def test_dtmf_is_not_speech(self):
+        # Touche « 1 » d'un clavier téléphonique : deux fréquences simultanées
+        self.assertEqual(detect_speech(with_silences(tone([697, 1209]))), [])
+
+    def test_square_wave_is_not_speech(self):
+        self.assertEqual(detect_speech(with_silences(tone([440], square=True))), [])
+
+    def test_chord_is_not_speech(self):
+        self.assertEqual(detect_speech(with_silences(tone([261.6, 329.6, 392.0]))), [])
+
+    def test_white_noise_is_not_speech(self):
+        noise = np.random.default_rng(0).uniform(-0.3, 0.3, SAMPLE_RATE * 2)
+        self.assertEqual(detect_speech(with_silences(samples_to_audio(noise, SAMPLE_RATE))), [])
+
+    def test_generated_test_file_is_not_speech(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'test.wav')
+            generate_test_audio(path)
+            audio = AudioSegment.from_wav(path)
+        self.assertEqual(detect_speech(audio), [])
+        prepared, spans = preprocess_audio(audio)
+        self.assertEqual(len(prepared), 0)
+        self.assertEqual(spans, [])
+
+    def test_voiced_bursts_are_speech(self):
+        audio = generate_benchmark_audio(10000, SAMPLE_RATE, silence_ratio=0.3, seed=1)
+        spans = detect_speech(audio)
+        self.assertTrue(spans)
+        # L'essentiel des salves voisées (environ 70 % de l'enregistrement) est conservé
+        self.assertGreater(sum(end - start for start, end in spans), 0.5 * len(audio))
+
+class NoSpeechMetricTest(unittest.TestCase):
+    def test_preprocessing_does_not_count_no_speech(self):
+        # Le préchauffage (app.warm_up) prétraite un silence : il ne doit pas compter
+        before = no_speech_count()
+        preprocess_audio(AudioSegment.silent(duration=100, frame_rate=44100))
+        self.assertEqual(no_speech_count(), before)
+
+    def test_transcription_counts_no_speech(self):
+        from speech_to_text import transcribe_audio_segments
+        before = no_speech_count()
+        segments = transcribe_audio_segments(with_silences(tone([697, 1209])), backend='fake', use_cache=False)
+        self.assertEqual(segments, [])
+        self.assertEqual(no_speech_count(), before + 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+import numpy as np
+import speech_recognition as sr
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_preprocessing import samples_to_audio
+from generate_test_audio import generate_benchmark_audio
+from recognizer_backends import RecognizerBackend
+from speech_to_text import load_processed_files, transcribe_batch, transcribe_file_for_batch
+
+SAMPLE_RATE = 16000
+
+class UnavailableBackend(RecognizerBackend):
+    name = 'unavailable'
+
+    def recognize(self, audio_data, language="fr-FR"):
+        raise sr.RequestError("service indisponible")
+
+def read_results(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+class BatchTranscriptionTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.output = os.path.join(self.directory, 'resultats.jsonl')
+
+        self.speech = os.path.join(self.directory, 'parole.wav')
+        generate_benchmark_audio(3000, SAMPLE_RATE, silence_ratio=0.3, seed=1).export(self.speech, format='wav')
+        # Tonalité DTMF : écartée par la détection de parole
+        self.tone = os.path.join(self.directory, 'tonalite.wav')
+        t = np.arange(SAMPLE_RATE * 2) / SAMPLE_RATE
+        samples = 0.15 * (np.sin(2 * np.pi * 697 * t) + np.sin(2 * np.pi * 1209 * t))
+        samples_to_audio(samples, SAMPLE_RATE).export(self.tone, format='wav')
+        self.broken = os.path.join(self.directory, 'illisible.wav')
+        with open(self.broken, 'wb') as f:
+            f.write(b'RIFF' + os.urandom(64))
+
+    def test_file_results(self):
+        result = transcribe_file_for_batch(self.speech, backend='fake')
+        self.assertNotIn('error', result)
+        self.assertTrue(result['transcription'])
+
+        result = transcribe_file_for_batch(self.tone, backend='fake')
+        self.assertNotIn('error', result)
+        self.assertTrue(result['no_speech'])
+        self.assertEqual(result['transcription'], '')
+
+        result = transcribe_file_for_batch(self.broken, backend='fake')
+        self.assertFalse(result['retryable'])
+
+        result = transcribe_file_for_batch(self.speech, backend=UnavailableBackend())
+        self.assertTrue(result['retryable'])
+
+    def test_resume_skips_final_results(self):
+        self.assertEqual(transcribe_batch([self.directory], self.output, workers=1, backend='fake'), 3)
+        self.assertEqual(load_processed_files(self.output), {self.speech, self.tone, self.broken})
+        # Fichier sans parole et fichier illisible compris : rien n'est refait
+        self.assertEqual(transcribe_batch([self.directory], self.output, workers=1, backend='fake'), 0)
+        self.assertEqual(len(read_results(self.output)), 3)
+
+    def test_resume_replaces_retryable_errors(self):
+        with open(self.output, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'file': self.speech, 'error': "service indisponible", 'retryable': True}) + '\n')
+            f.write(json.dumps({'file': self.tone, 'transcription': '', 'no_speech': True}) + '\n')
+            # Dernière ligne tronquée par une interruption
+            f.write('{"file": "' + self.broken)
+
+        self.assertEqual(load_processed_files(self.output), {self.tone})
+        self.assertEqual(transcribe_batch([self.directory], self.output, workers=1, backend='fake'), 2)
+
+        results = read_results(self.output)
+        self.assertEqual(sorted(result['file'] for result in results), sorted([self.speech, self.tone, self.broken]))
+        speech = next(result for result in results if result['file'] == self.speech)
+        self.assertNotIn('error', speech)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import sys
+import time
+import unittest
+import speech_recognition as sr
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_recognizer_server import start_fake_server
+from recognizer_backends import HttpBackend
+from recognizer_client import ResilientBackend, CircuitBreaker, TokenBucket
+
+# 0,1 seconde de silence en PCM 16 kHz 16 bits
+AUDIO = sr.AudioData(b'\0' * 3200, 16000, 2)
+
+class RecognizerClientTest(unittest.TestCase):
+    def start_server(self, **options):
+        server = start_fake_server(latency=0.0, **options)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def client(self, server, **options):
+        options.setdefault('backoff_base', 0.01)
+        return ResilientBackend(HttpBackend(server.url, timeout=5), **options)
+
+    def warm_latencies(self, client, seconds=0.01):
+        # Assez de mesures pour que le percentile de latence (et donc la requête dupliquée) soit actif
+        for _ in range(20):
+            client.latencies.add(seconds)
+
+    def test_retries_after_service_error(self):
+        # Avec cette graine, la première requête échoue et la seconde réussit
+        server = self.start_server(error_rate=0.5, seed=2)
+        client = self.client(server, max_retries=3)
+        self.assertEqual(client.recognize(AUDIO), "segment de 0.10 secondes")
+        self.assertEqual(server.requests, 2)
+
+    def test_gives_up_after_max_retries(self):
+        server = self.start_server(error_rate=1.0)
+        client = self.client(server, max_retries=2, breaker=CircuitBreaker(failure_threshold=10))
+        with self.assertRaises(sr.RequestError):
+            client.recognize(AUDIO)
+        self.assertEqual(server.requests, 3)
+
+    def test_breaker_opens_after_consecutive_failures(self):
+        server = self.start_server(error_rate=1.0)
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        client = self.client(server, max_retries=0, breaker=breaker)
+        for _ in range(2):
+            with self.assertRaises(sr.RequestError):
+                client.recognize(AUDIO)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        # Circuit ouvert : l'appel échoue sans atteindre le service
+        with self.assertRaises(sr.RequestError):
+            client.recognize(AUDIO)
+        self.assertEqual(server.requests, 2)
+
+    def test_breaker_closes_after_successful_trial(self):
+        server = self.start_server(error_rate=1.0)
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        client = self.client(server, max_retries=0, breaker=breaker)
+        with self.assertRaises(sr.RequestError):
+            client.recognize(AUDIO)
+
+        server.error_rate = 0.0
+        time.sleep(0.1)
+        self.assertEqual(client.recognize(AUDIO), "segment de 0.10 secondes")
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_hedge_returns_the_faster_response(self):
+        # Avec cette graine, la première requête est lente et la seconde rapide
+        server = self.start_server(slow_rate=0.5, slow_latency=2.0, seed=3)
+        client = self.client(server, hedge_percentile=95)
+        self.warm_latencies(client)
+
+        start = time.perf_counter()
+        self.assertEqual(client.recognize(AUDIO), "segment de 0.10 secondes")
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(server.requests, 2)
+
+    def test_hedge_respects_rate_limit(self):
+        server = self.start_server(slow_rate=0.5, slow_latency=0.5, seed=3)
+        # Un seul jeton, pris par la première requête : la requête dupliquée n'est pas envoyée
+        client = self.client(server, hedge_percentile=95, rate=0.01, burst=1)
+        self.warm_latencies(client)
+
+        start = time.perf_counter()
+        client.recognize(AUDIO)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.5)
+        self.assertEqual(server.requests, 1)
+
+class TokenBucketTest(unittest.TestCase):
+    def test_try_acquire_does_not_wait(self):
+        bucket = TokenBucket(rate=0.01, burst=2)
+        self.assertTrue(bucket.try_acquire())
+        self.assertTrue(bucket.try_acquire())
+        start = time.perf_counter()
+        self.assertFalse(bucket.try_acquire())
+        self.assertLess(time.perf_counter() - start, 0.1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import sys
+import unittest
+from pydub import AudioSegment
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from speech_to_text import compute_segment_bounds, split_audio, _strip_overlap
+
+class SegmentBoundsTest(unittest.TestCase):
+    def test_short_audio_is_a_single_segment(self):
+        self.assertEqual(compute_segment_bounds(10000, [], max_chunk_ms=30000), [(0, 10000)])
+        self.assertEqual(compute_segment_bounds(0, []), [])
+
+    def test_cuts_in_the_middle_of_the_last_silence(self):
+        silences = [(4000, 5000), (8000, 9000), (14000, 15000)]
+        self.assertEqual(compute_segment_bounds(20000, silences, max_chunk_ms=10000, overlap_ms=500),
+                         [(0, 8500), (8500, 14500), (14500, 20000)])
+
+    def test_overlaps_when_no_silence_is_available(self):
+        self.assertEqual(compute_segment_bounds(25000, [], max_chunk_ms=10000, overlap_ms=500),
+                         [(0, 10000), (9500, 19500), (19000, 25000)])
+
+    def test_bounds_cover_the_audio_within_the_maximum_duration(self):
+        silences = [(start, start + 300) for start in range(3700, 120000, 7300)]
+        bounds = compute_segment_bounds(120000, silences, max_chunk_ms=10000, overlap_ms=500)
+        self.assertEqual(bounds[0][0], 0)
+        self.assertEqual(bounds[-1][1], 120000)
+        for (start, end), (next_start, _) in zip(bounds, bounds[1:]):
+            self.assertLessEqual(end - start, 10000)
+            # Pas de trou entre deux segments, au plus le chevauchement
+            self.assertLessEqual(next_start, end)
+            self.assertGreaterEqual(next_start, end - 500)
+
+    def test_overlap_must_be_shorter_than_a_segment(self):
+        with self.assertRaises(ValueError):
+            compute_segment_bounds(20000, [], max_chunk_ms=500, overlap_ms=500)
+
+    def test_split_audio_returns_the_chunks(self):
+        audio = AudioSegment.silent(duration=2500, frame_rate=16000)
+        chunks = split_audio(audio, max_chunk_ms=1000, overlap_ms=100)
+        self.assertEqual([(start, end) for start, end, _ in chunks][0], (0, 1000))
+        self.assertEqual(chunks[-1][1], 2500)
+        self.assertEqual([len(chunk) for start, end, chunk in chunks], [end - start for start, end, _ in chunks])
+
+class StripOverlapTest(unittest.TestCase):
+    def test_removes_words_repeated_by_the_overlap(self):
+        self.assertEqual(_strip_overlap("je vous appelle pour la facture", "La facture du mois"), "du mois")
+        self.assertEqual(_strip_overlap("bonjour madame", "merci"), "merci")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate_test_audio import generate_long_text
+from text_summarizer import summarize_batch, summarize_text, TEXT_TOO_SHORT_MESSAGE
+
+class SummarizeBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.texts = [generate_long_text(20 + index, seed=index) for index in range(7)]
+
+    def test_results_follow_the_input_order(self):
+        # Paquets de 2 textes : le lot passe par le pool de processus
+        results = summarize_batch(self.texts, num_sentences=2, chunk_size=2)
+        self.assertEqual(results, [{'summary': summarize_text(text, 2)} for text in self.texts])
+
+    def test_num_sentences_per_item(self):
+        items = [{'text': self.texts[0], 'num_sentences': 1}, {'text': self.texts[1]}, self.texts[2]]
+        results = summarize_batch(items, num_sentences=4)
+        self.assertEqual(results, [{'summary': summarize_text(self.texts[0], 1)},
+                                   {'summary': summarize_text(self.texts[1], 4)},
+                                   {'summary': summarize_text(self.texts[2], 4)}])
+
+    def test_errors_are_reported_per_item(self):
+        items = [self.texts[0], '', "Trop court.", 42, {'text': self.texts[1], 'num_sentences': 0},
+                 {'text': self.texts[2], 'num_sentences': True}, self.texts[3]]
+        results = summarize_batch(items, num_sentences=2, chunk_size=3)
+        self.assertEqual(results[0], {'summary': summarize_text(self.texts[0], 2)})
+        self.assertEqual(results[1], {'error': 'Le texte est vide'})
+        self.assertEqual(results[2], {'error': TEXT_TOO_SHORT_MESSAGE})
+        self.assertIn('error', results[3])
+        self.assertIn('error', results[4])
+        self.assertIn('error', results[5])
+        self.assertEqual(results[6], {'summary': summarize_text(self.texts[3], 2)})
+
+class SummarizeBatchRouteTest(unittest.TestCase):
+    def setUp(self):
+        from app import app
+        self.client = app.test_client()
+
+    def test_route_returns_one_result_per_item(self):
+        text = generate_long_text(10, seed=1)
+        response = self.client.post('/summarize/batch', json={'items': [text, ''], 'num_sentences': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['results'],
+                         [{'summary': summarize_text(text, 2)}, {'error': 'Le texte est vide'}])
+
+    def test_route_requires_a_list(self):
+        response = self.client.post('/summarize/batch', json={'items': 'texte'})
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
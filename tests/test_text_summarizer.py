@@ -0,0 +1,111 @@
+import os
+import random
+import sys
+import unittest
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate_test_audio import generate_long_text
+from text_summarizer import IncrementalSummarizer, TextSummarizer, TEXT_TOO_SHORT_MESSAGE, MIN_SENTENCE_WORDS
+
+def incremental_summary(text, num_sentences, rng, max_words=12):
+    summarizer = IncrementalSummarizer(num_sentences)
+    words = text.split()
+    index = 0
+    while index < len(words):
+        count = rng.randint(1, max_words)
+        summarizer.append(' '.join(words[index:index + count]))
+        index += count
+    summarizer.flush()
+    return summarizer
+
+def reference_summary(summarizer, text, num_sentences):
+    """
+    Synthèse de référence, mot par mot : score d'une phrase = somme des fréquences de ses mots
+    normalisées par la fréquence maximale, phrases trop courtes ignorées, égalités à la plus ancienne.
+    """
+    sentences = summarizer._split_into_sentences(summarizer._clean_text(text))
+    if len(sentences) <= num_sentences:
+        return text
+    words = [summarizer._split_into_words(sentence) for sentence in sentences]
+    counts = Counter(word for sentence in words for word in sentence)
+    top = max(counts.values())
+    scores = {index: sum(counts[word] for word in sentence) / top
+              for index, sentence in enumerate(words) if len(sentence) >= MIN_SENTENCE_WORDS}
+    selected = sorted(scores, key=lambda index: (-scores[index], index))[:num_sentences]
+    return ' '.join(sentences[index] for index in sorted(selected))
+
+class TextSummarizerTest(unittest.TestCase):
+    def setUp(self):
+        self.summarizer = TextSummarizer()
+
+    def test_matches_the_reference_scoring(self):
+        for seed in range(20):
+            text = generate_long_text(random.Random(seed).randint(5, 80), seed=seed)
+            for num_sentences in (1, 3, 5):
+                self.assertEqual(self.summarizer.summarize(text, num_sentences),
+                                 reference_summary(self.summarizer, text, num_sentences))
+
+    def test_duplicate_sentences_are_kept_separately(self):
+        repeated = "Le serveur de facturation est tombé en panne cette nuit."
+        text = ' '.join([repeated, "Bonjour à tous.", repeated, "Merci pour votre patience.",
+                         "Le serveur redémarre."])
+        self.assertEqual(self.summarizer.summarize(text, 2), f"{repeated} {repeated}")
+
+    def test_summary_keeps_the_text_order(self):
+        text = ' '.join(["Première phrase sans rapport avec le reste du message.",
+                         "La livraison du colis est prévue pour la livraison de demain.",
+                         "Une phrase de remplissage pour allonger le texte suffisamment.",
+                         "Le colis de la livraison est assuré pendant la livraison."])
+        summary = self.summarizer.summarize(text, 2)
+        self.assertEqual(summary, ' '.join(["La livraison du colis est prévue pour la livraison de demain.",
+                                            "Le colis de la livraison est assuré pendant la livraison."]))
+
+    def test_abbreviations_do_not_end_sentences(self):
+        sentences = self.summarizer._split_into_sentences(
+            "Rendez-vous avec M. Martin demain. Le Dr. Durand confirme. Merci")
+        self.assertEqual(sentences, ["Rendez-vous avec M. Martin demain.", "Le Dr. Durand confirme.", "Merci."])
+
+    def test_short_texts(self):
+        self.assertEqual(self.summarizer.summarize("Trop court."), TEXT_TOO_SHORT_MESSAGE)
+        text = ("Une seule phrase assez longue pour être résumée, mais il n'y a rien à retirer "
+                "de ce message vocal laissé hier soir par le service client.")
+        self.assertEqual(self.summarizer.summarize(text, 3), text)
+
+class IncrementalSummarizerTest(unittest.TestCase):
+    def test_matches_batch_summary(self):
+        summarizer = TextSummarizer()
+        for seed in range(100):
+            rng = random.Random(seed)
+            text = generate_long_text(rng.randint(5, 60), seed=seed)
+            incremental = incremental_summary(text, 3, rng)
+            for num_sentences in (1, 2, 3, 5):
+                self.assertEqual(incremental.summary(num_sentences), summarizer.summarize(text, num_sentences),
+                                 f"graine {seed}, {num_sentences} phrase(s)")
+
+    def test_ties_are_broken_like_the_batch_summary(self):
+        # Phrases de même score : la plus ancienne est retenue dans les deux cas
+        text = ' '.join(["Le client signale une panne du routeur principal.",
+                         "Le technicien confirme une panne du routeur principal.",
+                         "Le client signale une panne du routeur principal.",
+                         "Une intervention est prévue demain matin chez le client."] * 3)
+        for num_sentences in (1, 2, 4):
+            expected = TextSummarizer().summarize(text, num_sentences)
+            self.assertEqual(incremental_summary(text, num_sentences, random.Random(0), 3).summary(), expected)
+
+    def test_summary_is_updated_after_each_append(self):
+        summarizer = IncrementalSummarizer(1)
+        summarizer.append("Bonjour.")
+        self.assertEqual(summarizer.summary(), TEXT_TOO_SHORT_MESSAGE)
+
+        text = generate_long_text(20, seed=1)
+        summarizer.append(text)
+        first = summarizer.summary()
+        # La dernière phrase reste en attente jusqu'à flush
+        summarizer.flush()
+        self.assertEqual(summarizer.summary(), TextSummarizer().summarize("Bonjour. " + text, 1))
+        self.assertTrue(first)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transcript_store import TranscriptStore
+
+def segments(*texts):
+    return [{'start': 2.0 * index, 'end': 2.0 * index + 2, 'text': text} for index, text in enumerate(texts)]
+
+class TranscriptStoreTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = directory.name
+        self.store = TranscriptStore(self.path)
+
+    def add_examples(self, store):
+        store.add('facture', segments("Bonjour, je vous appelle au sujet de la facture.",
+                                      "La facture du mois dernier est incorrecte, la facture doit être corrigée."),
+                  {'filename': 'facture.wav'})
+        store.add('livraison', segments("Votre colis sera livré demain matin.",
+                                        "Merci de confirmer la livraison et la facture."),
+                  {'filename': 'livraison.wav'})
+        store.add('rendez-vous', segments("Je souhaite déplacer mon rendez-vous de jeudi."))
+
+    def test_bm25_ranks_the_most_relevant_transcript_first(self):
+        self.add_examples(self.store)
+        results = self.store.search('facture')
+        self.assertEqual([result['key'] for result in results], ['facture', 'livraison'])
+        self.assertGreater(results[0]['score'], results[1]['score'])
+        self.assertEqual(results[0]['metadata'], {'filename': 'facture.wav'})
+        # Passages contenant le mot, dans l'ordre chronologique, avec leurs horodatages
+        self.assertEqual([segment['start'] for segment in results[0]['segments']], [0.0, 2.0])
+        self.assertEqual(self.store.search('colis')[0]['segments'],
+                         [{'start': 0.0, 'end': 2.0, 'text': "Votre colis sera livré demain matin."}])
+        self.assertEqual(self.store.search('inconnu'), [])
+
+    def test_journal_is_replayed_by_another_store(self):
+        self.add_examples(self.store)
+        other = TranscriptStore(self.path)
+        self.assertEqual(other.search('facture'), self.store.search('facture'))
+
+        # Les ajouts de l'autre instance sont vus à la recherche suivante
+        other.add('devis', segments("Le devis pour la facture annuelle est prêt."))
+        self.assertIn('devis', [result['key'] for result in self.store.search('devis')])
+
+    def test_compaction_keeps_results_and_identifiers(self):
+        self.add_examples(self.store)
+        before = self.store.search('facture livraison rendez')
+        self.store.compact()
+        self.assertEqual(self.store.stats()['journal_documents'], 0)
+        self.assertEqual(self.store.search('facture livraison rendez'), before)
+        self.assertEqual(TranscriptStore(self.path).search('facture livraison rendez'), before)
+
+    def test_compaction_threshold(self):
+        store = TranscriptStore(self.path, compact_threshold=3)
+        self.add_examples(store)
+        stats = store.stats()
+        self.assertEqual(stats['documents'], 3)
+        self.assertLess(stats['journal_documents'], 3)
+
+    def test_same_key_is_indexed_once(self):
+        first = self.store.add('samekey', segments("Message vocal concernant la facture."))
+        for _ in range(2):
+            self.assertEqual(self.store.add('samekey', segments("Message vocal concernant la facture.")), first)
+        self.assertEqual(len(self.store.search('facture')), 1)
+        self.assertEqual(len(self.store), 1)
+
+        # Ni une autre instance ni la fusion ne réintroduisent de doublon
+        other = TranscriptStore(self.path)
+        self.assertEqual(other.add('samekey', segments("Message vocal concernant la facture.")), first)
+        self.store.compact()
+        self.store.add('samekey', segments("Message vocal concernant la facture."))
+        self.assertEqual(len(self.store.search('facture')), 1)
+        self.assertEqual(len(other.search('facture')), 1)
+
+    def test_duplicate_journal_entries_are_compacted_once(self):
+        # Deux instances qui ajoutent la même clé avant de relire le journal
+        other = TranscriptStore(self.path)
+        self.store.add('samekey', segments("Message vocal concernant la facture."))
+        other.add('samekey', segments("Message vocal concernant la facture."))
+        self.store.compact()
+        self.assertEqual(len(TranscriptStore(self.path).search('facture')), 1)
+
+    def test_add_async_indexes_in_background(self):
+        self.assertTrue(self.store.add_async('async', segments("Rappel du rendez-vous de demain.")))
+        self.store.wait_indexed()
+        self.assertEqual([result['key'] for result in self.store.search('rappel')], ['async'])
+
+    def test_segments_without_text_are_ignored(self):
+        self.assertIsNone(self.store.add('vide', segments('', '')))
+        self.assertEqual(len(self.store), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import transcription_cache
+from transcription_cache import TranscriptionCache
+
+class TranscriptionCacheTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def cache(self, **options):
+        return TranscriptionCache(self.directory, **options)
+
+    def test_key_depends_on_audio_language_and_backend(self):
+        key = TranscriptionCache.make_key(b'\0\1', 'fr-FR', 'fake')
+        self.assertEqual(key, TranscriptionCache.make_key(b'\0\1', 'fr-FR', 'fake'))
+        self.assertNotEqual(key, TranscriptionCache.make_key(b'\0\2', 'fr-FR', 'fake'))
+        self.assertNotEqual(key, TranscriptionCache.make_key(b'\0\1', 'en-US', 'fake'))
+        self.assertNotEqual(key, TranscriptionCache.make_key(b'\0\1', 'fr-FR', 'vosk'))
+
+    def test_memory_lru_keeps_recent_entries(self):
+        cache = TranscriptionCache(None, max_entries=2)
+        cache.set('a', 'texte a')
+        cache.set('b', 'texte b')
+        self.assertEqual(cache.get('a'), 'texte a')
+        # 'b' est la moins récemment utilisée : elle est évincée
+        cache.set('c', 'texte c')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'texte a')
+        self.assertEqual(cache.get('c'), 'texte c')
+        self.assertEqual(cache.stats(), {'hits': 3, 'misses': 1, 'memory_hits': 3, 'disk_hits': 0,
+                                         'memory_entries': 2})
+
+    def test_disk_serves_entries_evicted_from_memory(self):
+        cache = self.cache(max_entries=1)
+        cache.set('a', [{'start': 0.0, 'end': 1.0, 'text': 'bonjour'}])
+        cache.set('b', 'texte b')
+        self.assertEqual(cache.get('a'), [{'start': 0.0, 'end': 1.0, 'text': 'bonjour'}])
+        self.assertEqual(cache.stats()['disk_hits'], 1)
+        # Remise en mémoire : la lecture suivante ne passe plus par le disque
+        self.assertEqual(cache.get('a'), [{'start': 0.0, 'end': 1.0, 'text': 'bonjour'}])
+        self.assertEqual(cache.stats()['memory_hits'], 1)
+
+        # Un autre processus (nouvelle instance) retrouve les entrées sur disque
+        self.assertEqual(self.cache().get('b'), 'texte b')
+
+    def test_expired_entries_are_ignored(self):
+        cache = self.cache(ttl=60)
+        with mock.patch.object(transcription_cache.time, 'time', return_value=1000.0):
+            cache.set('a', 'texte a')
+        with mock.patch.object(transcription_cache.time, 'time', return_value=1030.0):
+            self.assertEqual(cache.get('a'), 'texte a')
+        with mock.patch.object(transcription_cache.time, 'time', return_value=1100.0):
+            self.assertIsNone(cache.get('a'))
+            self.assertIsNone(self.cache(ttl=60).get('a'))
+        # Le fichier expiré est supprimé à la lecture
+        self.assertFalse(os.path.exists(cache._path('a')))
+
+    def test_disk_size_is_bounded(self):
+        value = 'x' * 1000
+        cache = self.cache(max_disk_bytes=5000)
+        for index in range(10):
+            key = f'{index:02d}' * 32
+            cache.set(key, value)
+            # Dates de modification distinctes : les entrées les plus anciennes sont évincées
+            os.utime(cache._path(key), (index, index))
+        sizes = [size for _, size, _ in cache._disk_entries()]
+        self.assertLessEqual(sum(sizes), 5000)
+        self.assertTrue(sizes)
+        disk = self.cache(max_entries=0)
+        self.assertEqual(disk.get('09' * 32), value)
+        self.assertIsNone(disk.get('00' * 32))
+
+    def test_replacing_an_entry_counts_its_size_once(self):
+        cache = self.cache(max_disk_bytes=5000)
+        for _ in range(20):
+            cache.set('a' * 64, 'x' * 1000)
+        self.assertEqual(cache.get('a' * 64), 'x' * 1000)
+        self.assertLess(cache._disk_bytes, 2000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,28 @@
+import os
 import re
-import heapq
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import filterfalse
+import numpy as np
+import metrics
+
+# Expressions régulières compilées une seule fois pour tout le module
+_NON_TEXT_PATTERN = re.compile(r'[^\w\s\.]+')
+_PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+# Fin de phrase : un point suivi d'un espace et d'une majuscule, sauf après une abréviation courante
+_SENTENCE_BOUNDARY_PATTERN = re.compile(r'\.(?<!\bM\.)(?<!\bMme\.)(?<!\bDr\.)(?<!\betc\.)(?=\s+[A-Z])')
+
+# Les phrases de 3 mots significatifs ou moins ne sont pas retenues dans le résumé
+MIN_SENTENCE_WORDS = 4
+
+# Les textes de moins de 100 caractères ne sont pas résumés
+MIN_TEXT_LENGTH = 100
+TEXT_TOO_SHORT_MESSAGE = "Le texte est trop court pour être résumé."
+
+# Synthèse par lots : nombre de textes envoyés ensemble à un processus du pool
+DEFAULT_BATCH_CHUNK_SIZE = 32
+DEFAULT_BATCH_WORKERS = int(os.environ.get('SUMMARY_BATCH_WORKERS', str(os.cpu_count() or 1)))
 
 class TextSummarizer:
     def __init__(self):
@@ -26,13 +49,10 @@ class TextSummarizer:
         Returns:
             str: Texte nettoyé
         """
-        # Remplacer les retours à la ligne par des espaces
-        text = re.sub(r'\n+', ' ', text)
-        # Supprimer les caractères spéciaux et les chiffres
-        text = re.sub(r'[^\w\s\.]', ' ', text)
-        # Supprimer les espaces multiples
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+        # Supprimer les caractères spéciaux
+        text = _NON_TEXT_PATTERN.sub(' ', text)
+        # Remplacer les retours à la ligne et les espaces multiples par un seul espace
+        return ' '.join(text.split())
     
     def _split_into_sentences(self, text):
         """
@@ -44,23 +64,13 @@ class TextSummarizer:
         Returns:
             list: Liste des phrases
         """
-        # Diviser le texte en phrases en utilisant des points comme séparateurs
-        # Mais en évitant de diviser sur les abréviations courantes
-        text = text.replace('M.', 'M_DOT_')
-        text = text.replace('Mme.', 'Mme_DOT_')
-        text = text.replace('Dr.', 'Dr_DOT_')
-        text = text.replace('etc.', 'etc_DOT_')
-        
-        # Diviser sur les points suivis d'un espace et d'une majuscule
-        sentences = re.split(r'\.(?=\s+[A-Z])', text)
-        
-        # Restaurer les abréviations
-        sentences = [s.replace('M_DOT_', 'M.').replace('Mme_DOT_', 'Mme.').replace('Dr_DOT_', 'Dr.').replace('etc_DOT_', 'etc.') for s in sentences]
+        # Diviser sur les points suivis d'un espace et d'une majuscule,
+        # en évitant de diviser sur les abréviations courantes (M., Mme., Dr., etc.)
+        sentences = _SENTENCE_BOUNDARY_PATTERN.split(text)
         
         # Nettoyer les phrases
-        sentences = [s.strip() + '.' if not s.strip().endswith('.') else s.strip() for s in sentences]
-        
-        return sentences
+        sentences = [s.strip() for s in sentences]
+        return [s if s.endswith('.') else s + '.' for s in sentences]
     
     def _split_into_words(self, sentence):
         """
@@ -72,45 +82,90 @@ class TextSummarizer:
         Returns:
             list: Liste des mots
         """
-        # Convertir en minuscules et diviser sur les espaces
-        words = sentence.lower().split()
-        
-        # Nettoyer les mots (supprimer la ponctuation)
-        words = [re.sub(r'[^\w]', '', word) for word in words]
+        # Convertir en minuscules, supprimer la ponctuation et diviser sur les espaces
+        words = _PUNCTUATION_PATTERN.sub('', sentence.lower()).split()
         
         # Filtrer les mots vides
-        words = [word for word in words if word and word not in self.stop_words]
+        stop_words = self.stop_words
+        return [word for word in words if word not in stop_words]
+    
+    def _tokenize(self, sentences):
+        """
+        Découpe toutes les phrases en mots en une seule passe et construit la
+        matrice creuse phrase x terme (format COO : une entrée par occurrence).
         
-        return words
+        Args:
+            sentences (list): Liste des phrases du texte
+            
+        Returns:
+            tuple: (indices de phrase, indices de terme, vocabulaire {mot: indice})
+        """
+        # Un mot inconnu reçoit l'indice suivant à sa première apparition
+        vocabulary = defaultdict()
+        vocabulary.default_factory = vocabulary.__len__
+        rows = []
+        cols = []
+        is_stop_word = self.stop_words.__contains__
+        
+        # Minuscules et ponctuation traitées en un seul appel pour tout le texte
+        # (les phrases nettoyées ne contiennent pas de retour à la ligne)
+        lowered = _PUNCTUATION_PATTERN.sub('', '\n'.join(sentences).lower()).split('\n')
+        if len(lowered) != len(sentences):
+            lowered = [_PUNCTUATION_PATTERN.sub('', sentence.lower()) for sentence in sentences]
+        
+        for index, sentence in enumerate(lowered):
+            words = list(filterfalse(is_stop_word, sentence.split()))
+            rows.extend([index] * len(words))
+            cols.extend(map(vocabulary.__getitem__, words))
+        return np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp), dict(vocabulary)
     
-    def _calculate_sentence_scores(self, sentences, word_frequencies):
+    def _calculate_sentence_scores(self, rows, cols, num_sentences):
         """
         Calcule un score pour chaque phrase basé sur la fréquence des mots.
         
         Args:
-            sentences (list): Liste des phrases du texte
-            word_frequencies (dict): Dictionnaire des fréquences de mots
+            rows (numpy.ndarray): Indice de phrase de chaque occurrence
+            cols (numpy.ndarray): Indice de terme de chaque occurrence
+            num_sentences (int): Nombre de phrases du texte
+            
+        Returns:
+            numpy.ndarray: Score de chaque phrase (-inf pour les phrases trop courtes)
+        """
+        scores = np.full(num_sentences, -np.inf)
+        if cols.size == 0:
+            return scores
+        
+        # Score d'une phrase : somme des fréquences de ses mots, normalisées par la fréquence
+        # maximale. La somme des occurrences est entière (donc exacte) et divisée une seule fois :
+        # des phrases de même score restent à égalité, départagées par leur ordre dans le texte
+        term_counts = np.bincount(cols)
+        word_counts = np.bincount(rows, minlength=num_sentences)
+        sums = np.bincount(rows, weights=term_counts[cols], minlength=num_sentences) / term_counts.max()
+        
+        # Ignorer les phrases trop courtes
+        long_enough = word_counts >= MIN_SENTENCE_WORDS
+        scores[long_enough] = sums[long_enough]
+        return scores
+    
+    def _select_top_sentences(self, scores, num_sentences):
+        """
+        Sélectionne les indices des phrases les mieux notées, dans l'ordre du texte.
+        
+        Args:
+            scores (numpy.ndarray): Score de chaque phrase
+            num_sentences (int): Nombre de phrases à retenir
             
         Returns:
-            dict: Dictionnaire des scores de phrases
-        """
-        sentence_scores = {}
-        
-        for sentence in sentences:
-            # Ignorer les phrases trop courtes
-            words = self._split_into_words(sentence)
-            if len(words) <= 3:
-                continue
-                
-            # Calculer le score de la phrase
-            for word in words:
-                if word in word_frequencies:
-                    if sentence not in sentence_scores:
-                        sentence_scores[sentence] = word_frequencies[word]
-                    else:
-                        sentence_scores[sentence] += word_frequencies[word]
-        
-        return sentence_scores
+            numpy.ndarray: Indices triés des phrases retenues
+        """
+        candidates = np.flatnonzero(np.isfinite(scores))
+        if len(candidates) > num_sentences:
+            # Seules les phrases au moins aussi bien notées que la k-ième sont à trier
+            threshold = np.partition(scores[candidates], len(candidates) - num_sentences)[len(candidates) - num_sentences]
+            candidates = candidates[scores[candidates] >= threshold]
+        # Tri stable : à score égal, la phrase la plus ancienne l'emporte
+        order = np.argsort(-scores[candidates], kind='stable')
+        return np.sort(candidates[order[:num_sentences]])
     
     def summarize(self, text, num_sentences=3):
         """
@@ -123,50 +178,198 @@ class TextSummarizer:
         Returns:
             str: Texte résumé
         """
-        if not text or len(text.strip()) < 100:
-            return "Le texte est trop court pour être résumé."
+        if not text or len(text.strip()) < MIN_TEXT_LENGTH:
+            return TEXT_TOO_SHORT_MESSAGE
         
         try:
-            # Nettoyer le texte
-            cleaned_text = self._clean_text(text)
-            
-            # Diviser le texte en phrases
-            sentences = self._split_into_sentences(cleaned_text)
-            
-            # Si le nombre de phrases est inférieur ou égal au nombre demandé, retourner le texte original
-            if len(sentences) <= num_sentences:
-                return text
-            
-            # Calculer la fréquence des mots
-            word_frequencies = {}
-            for sentence in sentences:
-                for word in self._split_into_words(sentence):
-                    if word not in word_frequencies:
-                        word_frequencies[word] = 1
-                    else:
-                        word_frequencies[word] += 1
-            
-            # Normaliser les fréquences
-            max_frequency = max(word_frequencies.values()) if word_frequencies else 1
-            for word in word_frequencies:
-                word_frequencies[word] = word_frequencies[word] / max_frequency
-            
-            # Calculer les scores des phrases
-            sentence_scores = self._calculate_sentence_scores(sentences, word_frequencies)
-            
-            # Obtenir les phrases avec les scores les plus élevés
-            summary_sentences = heapq.nlargest(num_sentences, sentence_scores, key=sentence_scores.get)
-            
-            # Réorganiser les phrases dans l'ordre original
-            ordered_summary = [sentence for sentence in sentences if sentence in summary_sentences]
-            
-            # Joindre les phrases pour former le résumé
-            summary = ' '.join(ordered_summary)
-            
-            return summary
+            with metrics.timed('summarize'):
+                return self._summarize(text, num_sentences)
         
         except Exception as e:
             return f"Erreur lors de la synthèse: {e}"
+    
+    def _summarize(self, text, num_sentences):
+        """
+        Étapes de la synthèse, mesurées ensemble par summarize.
+        """
+        # Nettoyer le texte
+        cleaned_text = self._clean_text(text)
+        
+        # Diviser le texte en phrases
+        sentences = self._split_into_sentences(cleaned_text)
+        
+        # Si le nombre de phrases est inférieur ou égal au nombre demandé, retourner le texte original
+        if len(sentences) <= num_sentences:
+            return text
+        
+        # Tokeniser une seule fois toutes les phrases
+        rows, cols, _ = self._tokenize(sentences)
+        
+        # Calculer les scores des phrases
+        scores = self._calculate_sentence_scores(rows, cols, len(sentences))
+        
+        # Obtenir les phrases avec les scores les plus élevés, dans l'ordre original
+        selected = self._select_top_sentences(scores, num_sentences)
+        
+        # Joindre les phrases pour former le résumé
+        summary = ' '.join(sentences[index] for index in selected)
+        
+        return summary
+
+# Instance partagée : le résumeur est sans état et peut être réutilisé entre les appels
+_default_summarizer = TextSummarizer()
+
+def _grow(array, size):
+    """
+    Agrandit un tableau par doublement (au moins jusqu'à size), en complétant par des zéros.
+    """
+    grown = np.zeros(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+class IncrementalSummarizer:
+    def __init__(self, num_sentences=3, summarizer=None):
+        """
+        Résumeur mis à jour au fil de l'arrivée des segments d'une transcription.
+        
+        Chaque ajout ne tokenise que le nouveau texte et tient à jour les fréquences des mots
+        et la somme des fréquences de chaque phrase (score avant normalisation) : seules les
+        phrases contenant un mot du nouveau texte sont modifiées, sans repasser sur tout le document.
+        Le top-k est recalculé lorsque le résumé est lu après un ajout, puis conservé jusqu'à
+        l'ajout suivant. Les sommes sont entières et les scores calculés comme dans
+        TextSummarizer.summarize, égalités comprises : le résumé est le même que celui du texte complet.
+        
+        Args:
+            num_sentences (int): Nombre de phrases du résumé
+            summarizer (TextSummarizer): Résumeur fournissant le nettoyage et la tokenisation
+        """
+        self.num_sentences = num_sentences
+        self.summarizer = summarizer or _default_summarizer
+        self.sentences = []
+        self.vocabulary = defaultdict()
+        self.vocabulary.default_factory = self.vocabulary.__len__
+        self._term_counts = np.zeros(256, dtype=np.int64)
+        self._max_count = 0
+        # Phrases contenant chaque terme (une entrée par occurrence), par indice de terme :
+        # tableaux agrandis par doublement et nombre d'entrées utilisées
+        self._term_sentences = []
+        self._term_lengths = []
+        # Somme des fréquences (non normalisées) des mots de chaque phrase
+        self._sums = np.zeros(64)
+        self._word_counts = np.zeros(64, dtype=np.int64)
+        self._pending = ''
+        self._length = 0
+        self._cache = {}
+    
+    def append(self, text):
+        """
+        Ajoute un morceau de texte (par exemple un segment de transcription).
+        La dernière phrase reste en attente tant que sa fin n'est pas confirmée
+        par le texte suivant (voir flush).
+        
+        Args:
+            text (str): Texte à ajouter
+        """
+        self._length += len(text.strip())
+        buffer = f"{self._pending} {self.summarizer._clean_text(text)}".strip()
+        pieces = _SENTENCE_BOUNDARY_PATTERN.split(buffer)
+        self._pending = pieces.pop()
+        self._add_sentences(pieces)
+    
+    def flush(self):
+        """
+        Intègre la phrase en attente (à appeler à la fin de la transcription).
+        """
+        if self._pending:
+            pending, self._pending = self._pending, ''
+            self._add_sentences([pending])
+    
+    def _add_sentences(self, pieces):
+        if not pieces:
+            return
+        
+        start = len(self.sentences)
+        for piece in pieces:
+            piece = piece.strip()
+            self.sentences.append(piece if piece.endswith('.') else piece + '.')
+        
+        # Tokeniser uniquement les nouvelles phrases
+        rows, cols, vocabulary = self.summarizer._tokenize(self.sentences[start:])
+        local_to_global = np.array([self.vocabulary[word] for word in vocabulary], dtype=np.intp)
+        cols = local_to_global[cols] if cols.size else cols
+        
+        # Tableaux agrandis par doublement
+        if len(self.vocabulary) > len(self._term_counts):
+            self._term_counts = _grow(self._term_counts, len(self.vocabulary))
+        missing = len(self.vocabulary) - len(self._term_sentences)
+        self._term_sentences.extend(np.empty(4, dtype=np.intp) for _ in range(missing))
+        self._term_lengths.extend([0] * missing)
+        if len(self.sentences) > len(self._sums):
+            self._sums = _grow(self._sums, len(self.sentences))
+            self._word_counts = _grow(self._word_counts, len(self.sentences))
+        
+        # Les phrases déjà vues gagnent, pour chaque occurrence d'un mot du nouveau texte,
+        # l'augmentation de la fréquence de ce mot (seules les phrases concernées sont touchées)
+        added_terms, added = np.unique(cols, return_counts=True)
+        seen = np.array([self._term_lengths[term] > 0 for term in added_terms.tolist()], dtype=bool)
+        if seen.any():
+            postings = [self._term_sentences[term][:self._term_lengths[term]] for term in added_terms[seen].tolist()]
+            indices = np.concatenate(postings)
+            weights = np.repeat(added[seen], [len(posting) for posting in postings]).astype(self._sums.dtype)
+            if len(indices) < start // 4:
+                np.add.at(self._sums, indices, weights)
+            else:
+                # Mots présents dans une grande partie du document : un cumul sur toutes les phrases est plus rapide
+                self._sums[:start] += np.bincount(indices, weights=weights, minlength=start)
+        self._term_counts[added_terms] += added
+        if added_terms.size:
+            self._max_count = max(self._max_count, int(self._term_counts[added_terms].max()))
+        
+        # Sommes des nouvelles phrases, avec les fréquences à jour
+        self._sums[start:len(self.sentences)] = np.bincount(rows, weights=self._term_counts[cols],
+                                                            minlength=len(pieces))
+        self._word_counts[start:len(self.sentences)] = np.bincount(rows, minlength=len(pieces))
+        
+        # Ajouter les nouvelles phrases aux listes des termes (regroupées par terme)
+        order = np.argsort(cols, kind='stable')
+        sorted_terms, sorted_rows = cols[order], rows[order] + start
+        bounds = np.flatnonzero(np.diff(sorted_terms)) + 1
+        for term, sentences in zip(sorted_terms[np.r_[0, bounds]].tolist() if cols.size else [],
+                                   np.split(sorted_rows, bounds)):
+            length = self._term_lengths[term]
+            if length + len(sentences) > len(self._term_sentences[term]):
+                self._term_sentences[term] = _grow(self._term_sentences[term], length + len(sentences))
+            self._term_sentences[term][length:length + len(sentences)] = sentences
+            self._term_lengths[term] = length + len(sentences)
+        self._cache.clear()
+    
+    def summary(self, num_sentences=None):
+        """
+        Retourne le résumé courant (la phrase en attente n'est pas prise en compte).
+        
+        Args:
+            num_sentences (int): Nombre de phrases, par défaut celui donné à la création
+            
+        Returns:
+            str: Texte résumé
+        """
+        num_sentences = num_sentences or self.num_sentences
+        if self._length < MIN_TEXT_LENGTH:
+            return TEXT_TOO_SHORT_MESSAGE
+        if len(self.sentences) <= num_sentences:
+            return ' '.join(self.sentences)
+        
+        if num_sentences not in self._cache:
+            scores = np.full(len(self.sentences), -np.inf)
+            if self._max_count:
+                # Même score que TextSummarizer : somme entière des fréquences des mots de la phrase,
+                # divisée une seule fois par la fréquence maximale
+                sums = self._sums[:len(self.sentences)] / self._max_count
+                long_enough = self._word_counts[:len(self.sentences)] >= MIN_SENTENCE_WORDS
+                scores[long_enough] = sums[long_enough]
+            self._cache[num_sentences] = self.summarizer._select_top_sentences(scores, num_sentences)
+        
+        return ' '.join(self.sentences[index] for index in self._cache[num_sentences])
 
 def summarize_text(text, num_sentences=3):
     """
@@ -179,8 +382,88 @@ def summarize_text(text, num_sentences=3):
     Returns:
         str: Texte résumé
     """
-    summarizer = TextSummarizer()
-    return summarizer.summarize(text, num_sentences)
+    return _default_summarizer.summarize(text, num_sentences)
+
+def split_words(text):
+    """
+    Découpe un texte en mots significatifs (minuscules, sans ponctuation ni mots vides),
+    avec les mêmes règles que la synthèse. Utilisé par l'index des transcriptions.
+
+    Args:
+        text (str): Texte à découper
+
+    Returns:
+        list: Liste des mots
+    """
+    return _default_summarizer._split_into_words(text)
+
+def _summarize_item(item, default_num_sentences):
+    """
+    Résume un élément d'un lot. Retourne {'summary': ...} ou {'error': ...}.
+    """
+    if isinstance(item, str):
+        text, num_sentences = item, default_num_sentences
+    elif isinstance(item, dict):
+        text = item.get('text')
+        num_sentences = item.get('num_sentences', default_num_sentences)
+    else:
+        return {'error': "Élément invalide: un texte ou un objet {'text', 'num_sentences'} est attendu"}
+
+    if not isinstance(text, str) or not text.strip():
+        return {'error': 'Le texte est vide'}
+    if isinstance(num_sentences, bool) or not isinstance(num_sentences, int) or num_sentences < 1:
+        return {'error': 'Le nombre de phrases doit être un entier positif'}
+
+    # summarize retourne ses échecs sous forme de texte : ils sont signalés ici en erreur
+    if len(text.strip()) < MIN_TEXT_LENGTH:
+        return {'error': TEXT_TOO_SHORT_MESSAGE}
+    try:
+        with metrics.timed('summarize'):
+            return {'summary': _default_summarizer._summarize(text, num_sentences)}
+    except Exception as e:
+        return {'error': f"Erreur lors de la synthèse: {e}"}
+
+def _summarize_chunk(items, default_num_sentences):
+    """
+    Résume un paquet d'éléments dans un processus du pool.
+    """
+    return [_summarize_item(item, default_num_sentences) for item in items]
+
+_batch_pool = None
+_batch_pool_lock = threading.Lock()
+
+def _get_batch_pool():
+    global _batch_pool
+    with _batch_pool_lock:
+        if _batch_pool is None:
+            _batch_pool = ProcessPoolExecutor(max_workers=DEFAULT_BATCH_WORKERS)
+        return _batch_pool
+
+def summarize_batch(items, num_sentences=3, chunk_size=DEFAULT_BATCH_CHUNK_SIZE):
+    """
+    Résume un lot de textes en répartissant le travail sur un pool de processus.
+    Les textes sont envoyés par paquets pour amortir le coût des échanges entre processus.
+    
+    Args:
+        items (list): Textes, ou objets {'text': ..., 'num_sentences': ...}
+        num_sentences (int): Nombre de phrases par défaut pour chaque résumé
+        chunk_size (int): Nombre de textes par paquet envoyé à un processus
+        
+    Returns:
+        list: Un résultat par élément, dans l'ordre du lot :
+            {'summary': ...} en cas de succès, {'error': ...} sinon
+    """
+    items = list(items)
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    
+    # Un seul paquet : inutile de passer par le pool
+    if len(chunks) <= 1:
+        return _summarize_chunk(items, num_sentences)
+    
+    results = []
+    for chunk_results in _get_batch_pool().map(_summarize_chunk, chunks, [num_sentences] * len(chunks)):
+        results.extend(chunk_results)
+    return results
 
 # Fonction pour tester la synthèse
 def test_summarization():
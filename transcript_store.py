@@ -0,0 +1,637 @@
+import os
+import json
+import mmap
+import fcntl
+import queue
+import struct
+import argparse
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+import numpy as np
+import metrics
+from text_summarizer import split_words
+
+# Dossier de l'index des transcriptions (modifiable via la variable d'environnement STT_STORE_DIR)
+DEFAULT_STORE_DIR = os.environ.get('STT_STORE_DIR', '/tmp/stt_transcripts')
+# Nombre de segments en mémoire au-delà duquel le journal est fusionné dans le fichier d'index
+DEFAULT_COMPACT_THRESHOLD = int(os.environ.get('STT_STORE_COMPACT_SEGMENTS', '50000'))
+# Nombre maximal de transcriptions en attente d'indexation (voir TranscriptStore.add_async)
+DEFAULT_INDEX_QUEUE_SIZE = int(os.environ.get('STT_STORE_QUEUE', '1000'))
+
+# Paramètres du classement BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+INDEX_FILE = 'index.bin'
+JOURNAL_FILE = 'journal.jsonl'
+LOCK_FILE = 'store.lock'
+
+# Sections du fichier d'index, dans l'ordre : (nom, type des éléments)
+_SECTIONS = (
+    ('term_offsets', np.uint64),        # Début de chaque terme dans term_blob (un de plus que de termes)
+    ('term_blob', np.uint8),            # Termes triés, en UTF-8, chacun suivi de '\n'
+    ('posting_offsets', np.uint64),     # Début de la liste de segments de chaque terme
+    ('posting_segments', np.uint32),    # Segments contenant le terme, par terme puis par segment croissant
+    ('posting_counts', np.uint16),      # Occurrences du terme dans le segment
+    ('segment_documents', np.uint32),
+    ('segment_starts', np.float32),     # En secondes (NaN si inconnu)
+    ('segment_ends', np.float32),
+    ('text_offsets', np.uint64),
+    ('text_blob', np.uint8),
+    ('document_lengths', np.uint32),    # Nombre de mots significatifs de chaque transcription
+    ('info_offsets', np.uint64),
+    ('info_blob', np.uint8),            # {'key', 'metadata'} de chaque transcription, en JSON
+)
+_MAGIC = b'STTIDX01'
+# En-tête : signature puis (position, nombre d'éléments) de chaque section
+_HEADER = struct.Struct('<8s' + 'QQ' * len(_SECTIONS))
+
+def _offsets(lengths):
+    return np.concatenate(([0], np.cumsum(lengths, dtype=np.uint64))).astype(np.uint64)
+
+def _file_stat(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+class _Column:
+    def __init__(self, dtype, capacity=16):
+        """
+        Tableau NumPy agrandi par doublement : ajouts en temps amorti constant, lecture sans copie.
+        Les valeurs déjà ajoutées ne sont jamais modifiées, une vue reste donc valable après des ajouts.
+        """
+        self._data = np.empty(capacity, dtype=dtype)
+        self._size = 0
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        end = self._size + len(values)
+        if end > len(self._data):
+            data = np.empty(max(end, 2 * len(self._data)), dtype=self._data.dtype)
+            data[:self._size] = self._data[:self._size]
+            self._data = data
+        self._data[self._size:end] = values
+        self._size = end
+
+    def view(self):
+        return self._data[:self._size]
+
+    def __len__(self):
+        return self._size
+
+class _IndexFile:
+    def __init__(self, path):
+        """
+        Fichier d'index compact en lecture seule : chaque section est un tableau NumPy
+        projeté directement sur le fichier (mmap), sans copie ni désérialisation.
+        Un fichier absent donne un index vide.
+        """
+        self.stat = None
+        arrays = {name: np.zeros(1 if name.endswith('_offsets') else 0, dtype=dtype) for name, dtype in _SECTIONS}
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            pass
+        else:
+            with f:
+                stat = os.fstat(f.fileno())
+                self.stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            fields = _HEADER.unpack_from(buffer, 0)
+            if fields[0] != _MAGIC:
+                raise ValueError(f"Fichier d'index invalide: {path}")
+            for index, (name, dtype) in enumerate(_SECTIONS):
+                offset, count = fields[1 + 2 * index], fields[2 + 2 * index]
+                arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+        self.__dict__.update(arrays)
+
+        self.n_terms = len(self.term_offsets) - 1
+        self.n_segments = len(self.segment_documents)
+        self.n_documents = len(self.document_lengths)
+        self.total_length = int(self.document_lengths.sum())
+
+    def terms(self):
+        return self.term_blob.tobytes().decode('utf-8').split('\n')[:-1]
+
+    def postings(self, term):
+        """
+        Retourne (segments, occurrences) d'un terme, par recherche dichotomique dans les termes triés
+        (l'ordre des octets UTF-8 est celui des caractères).
+        """
+        key = term.encode('utf-8')
+        offsets, blob = self.term_offsets, self.term_blob
+        low, high = 0, self.n_terms
+        while low < high:
+            middle = (low + high) // 2
+            if blob[offsets[middle]:offsets[middle + 1] - 1].tobytes() < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.n_terms or blob[offsets[low]:offsets[low + 1] - 1].tobytes() != key:
+            return self.posting_segments[:0], self.posting_counts[:0]
+        start, end = self.posting_offsets[low], self.posting_offsets[low + 1]
+        return self.posting_segments[start:end], self.posting_counts[start:end]
+
+    def segment(self, index):
+        text = self.text_blob[self.text_offsets[index]:self.text_offsets[index + 1]].tobytes().decode('utf-8')
+        return float(self.segment_starts[index]), float(self.segment_ends[index]), text
+
+    def info(self, index):
+        return json.loads(self.info_blob[self.info_offsets[index]:self.info_offsets[index + 1]].tobytes())
+
+class TranscriptStore:
+    def __init__(self, path=DEFAULT_STORE_DIR, compact_threshold=DEFAULT_COMPACT_THRESHOLD):
+        """
+        Index inversé des transcriptions, pour retrouver les enregistrements qui mentionnent
+        un sujet. Les mots sont découpés comme pour la synthèse (text_summarizer.split_words,
+        mêmes mots vides) et chaque terme renvoie aux segments qui le contiennent : les
+        résultats, classés par BM25, donnent les passages concernés avec leurs horodatages.
+
+        Les ajouts sont écrits dans un journal JSONL et indexés en mémoire ; au-delà de
+        `compact_threshold` segments, le journal est fusionné dans un fichier d'index compact
+        lu par mmap. Plusieurs processus peuvent partager le même dossier (verrou fcntl) :
+        chacun relit le journal et recharge l'index lorsqu'un autre les a modifiés.
+        Depuis les requêtes, add_async confie l'indexation (et la fusion) à un thread dédié.
+
+        Args:
+            path (str): Dossier de l'index (créé s'il n'existe pas)
+            compact_threshold (int): Nombre de segments du journal déclenchant la fusion
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.compact_threshold = compact_threshold
+        self._index_path = os.path.join(path, INDEX_FILE)
+        self._journal_path = os.path.join(path, JOURNAL_FILE)
+        self._lock_file = open(os.path.join(path, LOCK_FILE), 'a+')
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._base = None
+        self._pending = queue.Queue(maxsize=DEFAULT_INDEX_QUEUE_SIZE)
+        self._indexer = None
+        self._indexer_lock = threading.Lock()
+
+    @contextmanager
+    def _file_lock(self, exclusive):
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _load(self):
+        """
+        Projette le fichier d'index et vide la partie en mémoire (le journal est relu ensuite).
+        """
+        self._base = _IndexFile(self._index_path)
+        self._documents = []
+        self._document_lengths = _Column(np.uint32)
+        self._memory_length = 0
+        self._segment_documents = _Column(np.uint32)
+        self._segment_starts = _Column(np.float32)
+        self._segment_ends = _Column(np.float32)
+        self._segment_texts = []
+        # Par terme : (segments, occurrences) du journal, complétés à chaque ajout
+        self._postings = {}
+        self._journal_offset = 0
+        # Identifiant de la transcription de chaque clé : une clé n'est indexée qu'une fois
+        self._keys = {}
+        for document_id in range(self._base.n_documents):
+            self._keys.setdefault(self._base.info(document_id)['key'], document_id)
+
+    def _refresh(self):
+        """
+        Prend en compte les modifications des autres processus : nouvel index après une fusion,
+        transcriptions ajoutées au journal. À appeler avec le verrou du dossier.
+        """
+        index_stat = _file_stat(self._index_path)
+        try:
+            journal = open(self._journal_path, 'rb')
+        except FileNotFoundError:
+            journal = None
+
+        if self._base is None or index_stat != self._base.stat or (
+                journal is not None and os.fstat(journal.fileno()).st_size < self._journal_offset):
+            self._load()
+        if journal is None:
+            return
+        with journal:
+            journal.seek(self._journal_offset)
+            for line in journal:
+                # Une ligne incomplète (écriture interrompue) est ignorée
+                if not line.endswith(b'\n'):
+                    break
+                self._journal_offset += len(line)
+                self._index_document(json.loads(line))
+
+    def _index_document(self, entry):
+        """
+        Indexe une entrée du journal et retourne son identifiant. Une clé déjà indexée
+        (transcription ajoutée deux fois, par exemple par deux processus) est ignorée.
+        """
+        if entry['key'] in self._keys:
+            return self._keys[entry['key']]
+        base = self._base
+        document_id = base.n_documents + len(self._documents)
+        self._keys[entry['key']] = document_id
+        first_segment = base.n_segments + len(self._segment_texts)
+        segments = entry['segments']
+
+        # Listes de la transcription regroupées par terme, puis ajoutées en une fois aux tableaux du journal
+        postings = defaultdict(lambda: ([], []))
+        length = 0
+        for offset, segment in enumerate(segments):
+            counts = Counter(split_words(segment['text']))
+            for term, count in counts.items():
+                term_segments, term_counts = postings[term]
+                term_segments.append(first_segment + offset)
+                term_counts.append(min(count, 0xFFFF))
+            length += sum(counts.values())
+            self._segment_texts.append(segment['text'])
+        for term, (term_segments, term_counts) in postings.items():
+            if term not in self._postings:
+                self._postings[term] = (_Column(np.uint32, 4), _Column(np.uint16, 4))
+            columns = self._postings[term]
+            columns[0].extend(term_segments)
+            columns[1].extend(term_counts)
+
+        self._segment_documents.extend(np.full(len(segments), document_id))
+        self._segment_starts.extend([np.nan if segment['start'] is None else segment['start'] for segment in segments])
+        self._segment_ends.extend([np.nan if segment['end'] is None else segment['end'] for segment in segments])
+        self._documents.append({'key': entry['key'], 'metadata': entry['metadata']})
+        self._document_lengths.extend((length,))
+        self._memory_length += length
+        return document_id
+
+    def add(self, key, segments, metadata=None):
+        """
+        Ajoute une transcription à l'index. Si la clé est déjà indexée (même fichier envoyé
+        à nouveau), rien n'est ajouté et l'identifiant existant est retourné.
+
+        Args:
+            key (str): Identifiant de l'enregistrement (empreinte du fichier, identifiant de job...)
+            segments (list): Segments {'start', 'end', 'text'} (voir iter_transcribed_segments) ;
+                les segments sans texte sont ignorés
+            metadata (dict): Informations retournées avec les résultats de recherche
+
+        Returns:
+            int: Identifiant de la transcription dans l'index, ou None si aucun segment n'a de texte
+        """
+        segments = [{'start': segment.get('start'), 'end': segment.get('end'), 'text': segment['text']}
+                    for segment in segments if segment.get('text')]
+        if not segments:
+            return None
+        entry = {'key': key, 'metadata': metadata or {}, 'segments': segments}
+        line = (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+
+        with metrics.timed('index'), self._lock:
+            with self._file_lock(exclusive=True):
+                # Le journal des autres processus est indexé d'abord : les identifiants restent communs
+                self._refresh()
+                if key in self._keys:
+                    return self._keys[key]
+                with open(self._journal_path, 'ab') as journal:
+                    journal.write(line)
+                self._journal_offset += len(line)
+                document_id = self._index_document(entry)
+            compact = len(self._segment_texts) >= self.compact_threshold
+        if compact:
+            self.compact()
+        return document_id
+
+    def add_async(self, key, segments, metadata=None):
+        """
+        Confie une transcription au thread d'indexation et retourne immédiatement :
+        l'écriture du journal, l'indexation et la fusion se font hors de la requête.
+        Les erreurs d'indexation sont comptées dans stt_errors_total (étape 'index').
+
+        Returns:
+            bool: False si la file d'attente est pleine (transcription non indexée)
+        """
+        with self._indexer_lock:
+            # Le thread n'existe plus dans un processus issu d'un fork
+            if self._indexer is None or not self._indexer.is_alive():
+                self._indexer = threading.Thread(target=self._index_pending, daemon=True)
+                self._indexer.start()
+        try:
+            self._pending.put_nowait((key, segments, metadata))
+        except queue.Full:
+            metrics.increment('stt_index_dropped_total')
+            return False
+        return True
+
+    def _index_pending(self):
+        while True:
+            key, segments, metadata = self._pending.get()
+            try:
+                self.add(key, segments, metadata)
+            except Exception:
+                # Déjà comptée par metrics.timed('index') ou ('compact')
+                pass
+            finally:
+                self._pending.task_done()
+
+    def wait_indexed(self):
+        """
+        Attend que les transcriptions confiées à add_async soient indexées.
+        """
+        self._pending.join()
+
+    def _postings_of(self, term):
+        segments, counts = self._base.postings(term)
+        memory = self._postings.get(term)
+        if memory is None:
+            return segments.astype(np.int64), counts.astype(np.float64)
+        return (np.concatenate((segments, memory[0].view())).astype(np.int64),
+                np.concatenate((counts, memory[1].view())).astype(np.float64))
+
+    def _documents_of(self, segments):
+        base = self._base
+        in_base = segments < base.n_segments
+        documents = np.empty(len(segments), dtype=np.int64)
+        documents[in_base] = base.segment_documents[segments[in_base]]
+        documents[~in_base] = self._segment_documents.view()[segments[~in_base] - base.n_segments]
+        return documents
+
+    def _lengths_of(self, documents):
+        base = self._base
+        in_base = documents < base.n_documents
+        lengths = np.empty(len(documents), dtype=np.float64)
+        lengths[in_base] = base.document_lengths[documents[in_base]]
+        lengths[~in_base] = self._document_lengths.view()[documents[~in_base] - base.n_documents]
+        return lengths
+
+    def _segment(self, segment_id):
+        base = self._base
+        if segment_id < base.n_segments:
+            start, end, text = base.segment(segment_id)
+        else:
+            index = segment_id - base.n_segments
+            start, end = self._segment_starts.view()[index], self._segment_ends.view()[index]
+            text = self._segment_texts[index]
+        return {'start': None if np.isnan(start) else round(float(start), 3),
+                'end': None if np.isnan(end) else round(float(end), 3), 'text': text}
+
+    def _info(self, document_id):
+        base = self._base
+        if document_id < base.n_documents:
+            return base.info(document_id)
+        return self._documents[document_id - base.n_documents]
+
+    def search(self, query, limit=10, max_segments=3):
+        """
+        Recherche les transcriptions contenant les mots de `query`, classées par BM25.
+
+        Args:
+            query (str): Mots recherchés (découpés comme les transcriptions)
+            limit (int): Nombre maximal de transcriptions retournées
+            max_segments (int): Nombre maximal de passages retournés par transcription
+
+        Returns:
+            list: Résultats {'id', 'key', 'metadata', 'score', 'segments'} par score décroissant ;
+                les passages {'start', 'end', 'text'} sont ceux qui contiennent le plus de mots
+                rares de la requête, dans l'ordre chronologique
+        """
+        terms = list(dict.fromkeys(split_words(query)))
+        with metrics.timed('search'), self._lock:
+            with self._file_lock(exclusive=False):
+                self._refresh()
+            n_documents = self._base.n_documents + len(self._documents)
+            if not terms or not n_documents:
+                return []
+            average_length = max(1.0, (self._base.total_length + self._memory_length) / n_documents)
+
+            # Scores BM25 par terme, calculés sur tous les segments qui le contiennent à la fois
+            matched_documents, matched_scores = [], []
+            matched_segments, segment_documents, segment_weights = [], [], []
+            for term in terms:
+                segments, counts = self._postings_of(term)
+                if not len(segments):
+                    continue
+                documents = self._documents_of(segments)
+                unique, inverse = np.unique(documents, return_inverse=True)
+                frequencies = np.bincount(inverse, weights=counts)
+                idf = np.log(1 + (n_documents - len(unique) + 0.5) / (len(unique) + 0.5))
+                lengths = self._lengths_of(unique)
+                matched_documents.append(unique)
+                matched_scores.append(idf * frequencies * (BM25_K1 + 1)
+                                      / (frequencies + BM25_K1 * (1 - BM25_B + BM25_B * lengths / average_length)))
+                matched_segments.append(segments)
+                segment_documents.append(documents)
+                segment_weights.append(np.full(len(segments), idf))
+            if not matched_documents:
+                return []
+
+            documents, inverse = np.unique(np.concatenate(matched_documents), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate(matched_scores))
+            if len(scores) > limit:
+                top = np.argpartition(-scores, limit - 1)[:limit]
+            else:
+                top = np.arange(len(scores))
+            top = top[np.lexsort((documents[top], -scores[top]))]
+
+            # Passages des transcriptions retenues, pondérés par la rareté des mots trouvés
+            segment_documents = np.concatenate(segment_documents)
+            selected = np.isin(segment_documents, documents[top])
+            weights = defaultdict(lambda: defaultdict(float))
+            for document, segment, weight in zip(segment_documents[selected].tolist(),
+                                                 np.concatenate(matched_segments)[selected].tolist(),
+                                                 np.concatenate(segment_weights)[selected].tolist()):
+                weights[document][segment] += weight
+
+            results = []
+            for index in top.tolist():
+                document = int(documents[index])
+                passages = sorted(weights[document], key=weights[document].get, reverse=True)[:max_segments]
+                results.append(dict(id=document, **self._info(document), score=round(float(scores[index]), 4),
+                                    segments=[self._segment(segment) for segment in sorted(passages)]))
+            return results
+
+    def compact(self):
+        """
+        Fusionne le journal dans un nouveau fichier d'index (remplacé de façon atomique).
+        Le nouvel index est construit à partir d'un instantané, sans bloquer les recherches
+        ni les ajouts ; le verrou exclusif n'est pris que pour remplacer les fichiers. Les
+        transcriptions ajoutées pendant la construction restent dans le journal.
+        Les identifiants des transcriptions ne changent pas.
+        """
+        # Une seule fusion à la fois dans le processus
+        if not self._compact_lock.acquire(blocking=False):
+            return
+        try:
+            with metrics.timed('compact'):
+                self._compact()
+        finally:
+            self._compact_lock.release()
+
+    def _compact(self):
+        # Instantané : les tableaux du journal ne font que grandir, des vues suffisent
+        with self._lock:
+            with self._file_lock(exclusive=False):
+                self._refresh()
+            if not self._documents:
+                return
+            base = self._base
+            journal_offset = self._journal_offset
+            documents = list(self._documents)
+            texts = list(self._segment_texts)
+            postings = {term: (segments.view(), counts.view()) for term, (segments, counts) in self._postings.items()}
+            segment_documents = self._segment_documents.view()
+            segment_starts = self._segment_starts.view()
+            segment_ends = self._segment_ends.view()
+            document_lengths = self._document_lengths.view()
+
+        # Vocabulaire fusionné et trié
+        base_terms = base.terms()
+        terms = sorted(set(base_terms).union(postings))
+        term_ids = {term: index for index, term in enumerate(terms)}
+
+        # Listes de segments regroupées par terme : tri stable, les segments de l'index
+        # précèdent ceux du journal et restent donc croissants
+        posting_terms = [np.repeat(np.array([term_ids[term] for term in base_terms], dtype=np.int64),
+                                   np.diff(base.posting_offsets).astype(np.int64))]
+        posting_segments = [base.posting_segments]
+        posting_counts = [base.posting_counts]
+        for term, (segments, counts) in postings.items():
+            posting_terms.append(np.full(len(segments), term_ids[term], dtype=np.int64))
+            posting_segments.append(segments)
+            posting_counts.append(counts)
+        posting_terms = np.concatenate(posting_terms)
+        order = np.argsort(posting_terms, kind='stable')
+
+        encoded_terms = [term.encode('utf-8') + b'\n' for term in terms]
+        texts = [text.encode('utf-8') for text in texts]
+        infos = [json.dumps(info, ensure_ascii=False).encode('utf-8') for info in documents]
+        sections = {
+            'term_offsets': _offsets([len(term) for term in encoded_terms]),
+            'term_blob': np.frombuffer(b''.join(encoded_terms), dtype=np.uint8),
+            'posting_offsets': _offsets(np.bincount(posting_terms, minlength=len(terms))),
+            'posting_segments': np.concatenate(posting_segments)[order],
+            'posting_counts': np.concatenate(posting_counts)[order],
+            'segment_documents': np.concatenate((base.segment_documents, segment_documents)),
+            'segment_starts': np.concatenate((base.segment_starts, segment_starts)),
+            'segment_ends': np.concatenate((base.segment_ends, segment_ends)),
+            'text_offsets': np.concatenate((base.text_offsets[:-1],
+                                            base.text_offsets[-1] + _offsets([len(text) for text in texts]))),
+            'text_blob': np.concatenate((base.text_blob, np.frombuffer(b''.join(texts), dtype=np.uint8))),
+            'document_lengths': np.concatenate((base.document_lengths, document_lengths)),
+            'info_offsets': np.concatenate((base.info_offsets[:-1],
+                                            base.info_offsets[-1] + _offsets([len(info) for info in infos]))),
+            'info_blob': np.concatenate((base.info_blob, np.frombuffer(b''.join(infos), dtype=np.uint8))),
+        }
+        temporary_path = self._write_index(sections)
+
+        with self._lock, self._file_lock(exclusive=True):
+            if _file_stat(self._index_path) != base.stat:
+                # Un autre processus a fusionné le journal entre-temps : ce résultat est périmé
+                os.remove(temporary_path)
+                return
+            os.replace(temporary_path, self._index_path)
+            # Seules les transcriptions ajoutées depuis l'instantané restent dans le journal
+            with open(self._journal_path, 'rb') as journal:
+                journal.seek(journal_offset)
+                tail = journal.read()
+            temporary_journal = f"{self._journal_path}.{os.getpid()}.tmp"
+            with open(temporary_journal, 'wb') as journal:
+                journal.write(tail)
+            os.replace(temporary_journal, self._journal_path)
+            self._load()
+
+    def _write_index(self, sections):
+        """
+        Écrit le fichier d'index dans un fichier temporaire et retourne son chemin.
+        """
+        temporary_path = f"{self._index_path}.{os.getpid()}.tmp"
+        fields = []
+        with open(temporary_path, 'wb') as f:
+            f.write(bytes(_HEADER.size))
+            for name, dtype in _SECTIONS:
+                # Sections alignées sur 8 octets pour être projetées directement en tableaux
+                f.write(bytes(-f.tell() % 8))
+                array = np.ascontiguousarray(sections[name], dtype=dtype)
+                fields += [f.tell(), len(array)]
+                f.write(array.tobytes())
+            f.seek(0)
+            f.write(_HEADER.pack(_MAGIC, *fields))
+            f.flush()
+            os.fsync(f.fileno())
+        return temporary_path
+
+    def stats(self):
+        """
+        Retourne le nombre de transcriptions, de segments et de termes indexés.
+        """
+        with self._lock:
+            with self._file_lock(exclusive=False):
+                self._refresh()
+            base = self._base
+            return {
+                'documents': base.n_documents + len(self._documents),
+                'segments': base.n_segments + len(self._segment_texts),
+                'indexed_terms': base.n_terms,
+                'journal_documents': len(self._documents),
+            }
+
+    def __len__(self):
+        return self.stats()['documents']
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def get_store():
+    """
+    Retourne l'index des transcriptions partagé par le processus (dossier STT_STORE_DIR).
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = TranscriptStore()
+        return _default_store
+
+def index_batch_results(results_path, store):
+    """
+    Indexe les transcriptions réussies d'un fichier JSONL produit par la transcription par lots.
+    Retourne le nombre de transcriptions ajoutées (les fichiers déjà indexés ne comptent pas).
+    """
+    before = len(store)
+    with open(results_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            if 'error' in result or not result.get('segments'):
+                continue
+            metadata = {'filename': os.path.basename(result['file'])}
+            if result.get('summary'):
+                metadata['summary'] = result['summary']
+            store.add(result['file'], result['segments'], metadata)
+    return len(store) - before
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index de recherche des transcriptions")
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR, help="Dossier de l'index")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    index_parser = subparsers.add_parser('index', help="Indexer les résultats de la transcription par lots")
+    index_parser.add_argument('results', nargs='+', help="Fichiers JSONL de speech_to_text.py batch")
+    search_parser = subparsers.add_parser('search', help="Rechercher dans les transcriptions")
+    search_parser.add_argument('query')
+    search_parser.add_argument('--limit', type=int, default=10)
+    subparsers.add_parser('compact', help="Fusionner le journal dans le fichier d'index")
+    args = parser.parse_args()
+
+    store = TranscriptStore(args.store)
+    if args.command == 'index':
+        for path in args.results:
+            print(f"{path}: {index_batch_results(path, store)} transcription(s) indexée(s)")
+        store.compact()
+    elif args.command == 'search':
+        for result in store.search(args.query, limit=args.limit):
+            print(f"{result['score']:8.3f}  {result['key']}")
+            for segment in result['segments']:
+                print(f"          [{segment['start']} - {segment['end']}] {segment['text']}")
+    else:
+        store.compact()
+    print(store.stats())
@@ -0,0 +1,226 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Configuration par défaut du cache (modifiable via les variables d'environnement)
+DEFAULT_CACHE_DIR = os.environ.get('STT_CACHE_DIR', '/tmp/stt_cache')
+DEFAULT_MAX_ENTRIES = int(os.environ.get('STT_CACHE_MAX_ENTRIES', '256'))
+DEFAULT_TTL = int(os.environ.get('STT_CACHE_TTL', str(7 * 24 * 3600)))  # 7 jours
+DEFAULT_MAX_DISK_BYTES = int(os.environ.get('STT_CACHE_MAX_DISK_BYTES', str(512 * 1024 * 1024)))
+
+class TranscriptionCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_entries=DEFAULT_MAX_ENTRIES,
+                 ttl=DEFAULT_TTL, max_disk_bytes=DEFAULT_MAX_DISK_BYTES):
+        """
+        Cache des transcriptions adressé par contenu : un LRU borné en mémoire
+        devant un stockage persistant sur disque (un fichier JSON par entrée).
+
+        Args:
+            cache_dir (str): Dossier du stockage sur disque (None pour un cache uniquement en mémoire)
+            max_entries (int): Nombre maximal d'entrées gardées en mémoire
+            ttl (int): Durée de validité d'une entrée en secondes (0 pour illimitée)
+            max_disk_bytes (int): Taille maximale du stockage sur disque
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        # Les lectures et écritures de fichiers se font hors de self._lock : seul le compte
+        # de la taille sur disque (et l'éviction) est protégé par ce second verrou
+        self._disk_lock = threading.Lock()
+        self._disk_bytes = None
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(pcm_data, language, backend_name, *extra):
+        """
+        Calcule la clé d'une transcription : empreinte du PCM décodé, de la langue,
+        du backend et des éventuels paramètres supplémentaires.
+
+        Args:
+            pcm_data (bytes): Données audio PCM décodées
+            language (str): Langue de reconnaissance
+            backend_name (str): Nom du backend de reconnaissance
+
+        Returns:
+            str: Clé hexadécimale SHA-256
+        """
+        digest = hashlib.sha256(pcm_data)
+        for part in (language, backend_name) + extra:
+            digest.update(b'\0' + str(part).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f'{key}.json')
+
+    def _expired(self, created):
+        return bool(self.ttl) and time.time() - created > self.ttl
+
+    def get(self, key):
+        """
+        Retourne la valeur associée à la clé, ou None si elle est absente ou expirée.
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created, value = entry
+                if not self._expired(created):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is not None:
+                created, value = entry
+                self._remember(key, created, value)
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        """
+        Enregistre une valeur (sérialisable en JSON) en mémoire et sur disque.
+        """
+        created = time.time()
+        with self._lock:
+            self._remember(key, created, value)
+        self._write_disk(key, created, value)
+
+    def _remember(self, key, created, value):
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self._expired(entry['created']):
+            self._remove_file(path)
+            return None
+        return entry['created'], entry['value']
+
+    def _write_disk(self, key, created, value):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps({'created': created, 'value': value}, ensure_ascii=False).encode('utf-8')
+
+        # Écriture atomique pour ne jamais lire une entrée partielle
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+
+        with self._disk_lock:
+            # Une entrée remplacée ne compte plus dans la taille sur disque
+            try:
+                replaced_size = os.path.getsize(path)
+            except OSError:
+                replaced_size = 0
+            os.replace(tmp_path, path)
+
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+            else:
+                self._disk_bytes += len(data) - replaced_size
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _disk_entries(self):
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict_disk(self):
+        """
+        Supprime les entrées expirées puis les plus anciennes jusqu'à repasser
+        sous 90 % de la taille maximale.
+        """
+        entries = sorted(self._disk_entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_disk_bytes * 0.9
+        for mtime, size, path in entries:
+            if total <= target and not self._expired(mtime):
+                continue
+            self._remove_file(path)
+            total -= size
+        self._disk_bytes = total
+
+    def _remove_file(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        """
+        Vide le cache en mémoire et sur disque.
+        """
+        with self._lock:
+            self._memory.clear()
+        with self._disk_lock:
+            if self.cache_dir:
+                for _, _, path in self._disk_entries():
+                    self._remove_file(path)
+            self._disk_bytes = 0
+
+    def stats(self):
+        """
+        Retourne les compteurs du cache.
+
+        Returns:
+            dict: Succès, échecs et nombre d'entrées en mémoire
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'memory_entries': len(self._memory),
+            }
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_default_cache():
+    """
+    Retourne le cache partagé par le processus (créé à la première utilisation).
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = TranscriptionCache()
+        return _default_cache
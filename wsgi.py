@@ -0,0 +1,13 @@
+import os
+import time
+
+# Point d'entrée de production : gunicorn -c gunicorn.conf.py wsgi:app
+# Avec STT_PRELOAD=1 (par défaut), les modules de traitement, le backend et ffmpeg sont
+# préparés ici, dans le processus maître (preload_app), puis hérités par chaque worker créé par fork.
+from app import app, warm_up
+
+if os.environ.get('STT_PRELOAD', '1') == '1':
+    start = time.perf_counter()
+    timings = warm_up()
+    details = ', '.join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in timings.items())
+    print(f"Préchargement terminé en {(time.perf_counter() - start) * 1000:.0f} ms ({details})", flush=True)